@@ -0,0 +1,363 @@
+#!/usr/bin/env python3
+"""
+DeckDock Crawler Bench — Micro-benchmarks for the crawler engine.
+
+Loads crawler-gui.py as a module and times its hot paths against synthetic
+input. Nothing touches the network or your staging directory; every run
+works in a throwaway temp dir.
+
+Benchmarks:
+  discovery   Per-link cost of registering links from a huge listing page.
+              A flat us/link column means discovery is O(1) per link.
+  parse       Pages/sec of each page-extraction backend (stream,
+              html.parser, lxml) on synthetic or saved pages.
+  transport   Request latency through a fresh connection per request, a
+              default requests.Session, and the crawler's tuned session
+              (plus HTTP/2 with httpx[http2] and an https --url).
+  history     Start-up time, memory and lookup latency of the download
+              history, as a plain set of URLs and as a CrawlJob loads
+              it (Bloom-filtered, on disk), at 1M URLs.
+
+Usage:
+  python3 crawler-bench.py discovery                 # 100k-link listing
+  python3 crawler-bench.py discovery --links 250000  # bigger listing
+  python3 crawler-bench.py parse                     # synthetic pages
+  python3 crawler-bench.py parse --html saved.html   # your own pages
+  python3 crawler-bench.py transport                 # local test server
+  python3 crawler-bench.py transport --url https://myrient.erista.me/files/
+  python3 crawler-bench.py history                   # 1M downloaded URLs
+"""
+
+import argparse
+import concurrent.futures
+import http.server
+import importlib.util
+import multiprocessing
+import os
+import tempfile
+import time
+from pathlib import Path
+
+# Keep the crawler from picking up (and complaining about) a real config
+os.environ.setdefault("DECKDOCK_CONFIG", os.devnull)
+
+
+def load_crawler():
+    """Import crawler-gui.py (hyphenated, so not importable by name)."""
+    path = Path(__file__).resolve().parent / "crawler-gui.py"
+    spec = importlib.util.spec_from_file_location("crawler_gui", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def make_job(crawler, base_url="https://roms.example.com/files"):
+    """Build a CrawlJob that writes its state into a temp dir."""
+    out = tempfile.mkdtemp(prefix="crawler_bench_")
+    return crawler.CrawlJob(base_url, out, max_depth=3, delay=0)
+
+
+# ============================================================================
+# DISCOVERY
+# ============================================================================
+
+def bench_discovery(args):
+    crawler = load_crawler()
+    job = make_job(crawler)
+    page_url = f"{job.base_url}/listing"
+    chunk = args.chunk
+    chunks = max(1, args.links // chunk)
+
+    print(f"Discovery: {chunks * chunk} links in {chunks} chunks of {chunk}")
+    print(f"{'chunk':>6} {'indexed':>10} {'ms':>9} {'us/link':>9}")
+
+    for n in range(chunks):
+        # One listing slice per chunk, built outside the timed region so
+        # only link registration is measured
+        start = n * chunk
+        page = crawler.PageExtract(links=[
+            f"/files/system/Game {i:07d} (USA).zip"
+            for i in range(start, start + chunk)
+        ])
+
+        t0 = time.perf_counter()
+        job._scan_links(page, page_url)
+        elapsed = time.perf_counter() - t0
+
+        print(f"{n + 1:>6} {len(job.discovered_files):>10} "
+              f"{elapsed * 1000:>9.1f} {elapsed / chunk * 1e6:>9.2f}")
+
+
+# ============================================================================
+# PARSE
+# ============================================================================
+
+def _synthetic_pages():
+    """An autoindex-style listing and a Vimm-style detail page."""
+    rows = "".join(
+        f'<a href="Game%20{i:05d}%20(USA).zip">Game {i:05d} (USA).zip</a>'
+        f'{" " * 20}2024-01-{i % 28 + 1:02d} 12:00  {i * 37 % 900 + 100}M\n'
+        for i in range(2000)
+    )
+    listing = (
+        "<html><head><title>Index of /files/snes</title></head><body>"
+        "<h1>Index of /files/snes</h1><hr><pre>"
+        f'<a href="../">../</a>\n{rows}</pre><hr></body></html>'
+    )
+    nav = "".join(f'<li><a href="/vault/{i}">Game {i}</a></li>' for i in range(300))
+    detail = (
+        "<html><head><title>The Vault: Final Fantasy VII (PS1)</title>"
+        "<script>var ga=1;</script>"
+        '<script>const media=[{"ID":5122,"Label":"Disc 1"},'
+        '{"ID":13604,"Label":"Disc 2"},{"ID":13605,"Label":"Disc 3"}];</script>'
+        f"</head><body><ul>{nav}</ul><h1>Final Fantasy VII (PS1)</h1>"
+        '<form id="dl_form" action="//download.vimm.net/" method="POST">'
+        '<input type="hidden" name="mediaId" value="5122">'
+        '<button type="submit">Download</button></form>'
+        "</body></html>"
+    )
+    return [("listing", listing), ("detail", detail)]
+
+
+def bench_parse(args):
+    crawler = load_crawler()
+
+    if args.html:
+        pages = [(Path(p).name, Path(p).read_text(errors="replace")) for p in args.html]
+    else:
+        pages = _synthetic_pages()
+
+    backends = list(crawler.PARSER_BACKENDS)
+    if not crawler.HAS_LXML:
+        backends.remove("lxml")
+        print("lxml not installed — skipping the lxml backend")
+
+    print(f"{'page':<16} {'KB':>7} " + " ".join(f"{b:>12}" for b in backends)
+          + "   (pages/sec)")
+    for name, html in pages:
+        rates = []
+        for backend in backends:
+            crawler._extract_page(html, backend)  # warm-up
+            t0 = time.perf_counter()
+            for _ in range(args.repeat):
+                crawler._extract_page(html, backend)
+            elapsed = time.perf_counter() - t0
+            rates.append(args.repeat / elapsed if elapsed else float("inf"))
+        print(f"{name[:16]:<16} {len(html) / 1024:>7.0f} "
+              + " ".join(f"{r:>12.1f}" for r in rates))
+
+
+# ============================================================================
+# TRANSPORT
+# ============================================================================
+
+def _serve(connect_ms, opened, ports):
+    """Run a keep-alive HTTP/1.1 server (see _local_server) until killed."""
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+        wbufsize = 65536  # headers and body in one send
+
+        def setup(self):
+            super().setup()
+            with opened.get_lock():
+                opened.value += 1
+            time.sleep(connect_ms / 1000)
+
+        def do_GET(self):
+            body = b"<html>" + b"x" * 4096 + b"</html>"
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    ports.put(server.server_port)
+    server.serve_forever()
+
+
+def _local_server(connect_ms):
+    """A keep-alive HTTP/1.1 server on localhost, in its own process so it
+    doesn't compete with the client threads for the GIL. Each new
+    connection costs connect_ms, standing in for the TCP+TLS handshakes to
+    a remote host. Returns (process, port, connection counter)."""
+    opened = multiprocessing.Value("i", 0)
+    ports = multiprocessing.Queue()
+    proc = multiprocessing.Process(target=_serve, args=(connect_ms, opened, ports),
+                                   daemon=True)
+    proc.start()
+    return proc, ports.get(timeout=10), opened
+
+
+def bench_transport(args):
+    crawler = load_crawler()
+    import requests
+
+    server = None
+    if args.url:
+        url = args.url
+    else:
+        server, port, opened = _local_server(args.connect_ms)
+        url = f"http://localhost:{port}/"
+        print(f"Local server, {args.connect_ms} ms per new connection")
+
+    modes = [
+        ("new connection", None),
+        ("default Session", requests.Session()),
+        ("tuned session", crawler._make_session(args.threads)),
+    ]
+    if crawler.HAS_HTTPX and url.startswith("https://"):
+        modes.append(("tuned + HTTP/2", crawler._make_session(args.threads, http2=True)))
+    elif url.startswith("https://"):
+        print("httpx[http2] not installed — skipping HTTP/2")
+
+    print(f"{args.requests} GETs, {args.threads} threads: {url}")
+    print(f"{'transport':<16} {'p50 ms':>8} {'p95 ms':>8} {'req/s':>8} {'conns':>6}")
+    for name, session in modes:
+        get = session.get if session else requests.get
+
+        def timed(_):
+            t0 = time.perf_counter()
+            get(url, timeout=30).content
+            return time.perf_counter() - t0
+
+        before = opened.value if server else 0
+        t0 = time.perf_counter()
+        with concurrent.futures.ThreadPoolExecutor(args.threads) as pool:
+            times = sorted(pool.map(timed, range(args.requests)))
+        elapsed = time.perf_counter() - t0
+        conns = str(opened.value - before) if server else "-"
+        print(f"{name:<16} {times[len(times) // 2] * 1000:>8.1f} "
+              f"{times[int(len(times) * 0.95)] * 1000:>8.1f} "
+              f"{args.requests / elapsed:>8.1f} {conns:>6}")
+        if session:
+            session.close()
+
+    if server:
+        server.terminate()
+
+
+# ============================================================================
+# HISTORY
+# ============================================================================
+
+def _history_url(i):
+    """A realistic downloaded URL: mostly file links, some Vimm-style
+    synthetic POST URLs."""
+    if i % 5 == 0:
+        return (f"POST|https://download.vimm.net/|mediaId={i}"
+                f"|https://vimm.net/vault/{i}")
+    return (f"https://myrient.erista.me/files/No-Intro/Nintendo%20-%20Game%20Boy/"
+            f"Game%20{i:07d}%20%28USA%29.zip")
+
+
+def _rss():
+    """Resident set size of this process in bytes (Linux)."""
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+def _measure_history(db, mode, urls, lookups, results):
+    """Open the history one way and time lookups; runs in its own process so
+    each mode starts from the same memory baseline. The job modes time a
+    CrawlJob's whole state load; its first start after an upgrade also
+    builds the filters and indexes the history's pages and mediaIds."""
+    crawler = load_crawler()
+    if mode == "job, first start":
+        for bloom in db.parent.glob(".crawler-state.*.bloom"):
+            bloom.unlink()
+    before = _rss()
+    t0 = time.perf_counter()
+    if mode == "set":
+        history = set(crawler._StateStore(db).load(("downloaded",))["downloaded"])
+    else:
+        job = crawler.CrawlJob("https://roms.example.com/files", db.parent, delay=0)
+        history = job.downloaded_files
+    opened = time.perf_counter() - t0
+    rss = _rss() - before
+
+    step = max(1, urls // lookups)
+    hits = [_history_url(i) for i in range(0, step * lookups, step)]
+    misses = [_history_url(i) for i in range(urls, urls + lookups)]
+    timings = []
+    for probe in (hits, misses):
+        t0 = time.perf_counter()
+        found = sum(url in history for url in probe)
+        timings.append(((time.perf_counter() - t0) / len(probe), found))
+    # Misses the filter let through to the database
+    false_positives = ("-" if mode == "set" else
+                       f"{sum(map(history._maybe, misses)) / len(misses):.2%}")
+    results.put((opened, rss, timings, false_positives))
+
+
+def bench_history(args):
+    crawler = load_crawler()
+    db = Path(tempfile.mkdtemp(prefix="crawler_bench_")) / ".crawler-state.db"
+
+    t0 = time.perf_counter()
+    store = crawler._StateStore(db)
+    for i in range(args.urls):
+        store.put("downloaded", _history_url(i))
+        if i % 100000 == 99999:
+            store.commit()
+    store.commit()
+    store.close()
+    print(f"History: {args.urls} URLs ({time.perf_counter() - t0:.1f}s to write, "
+          f"database {db.stat().st_size / 1e6:.0f} MB)")
+
+    lookups = min(args.lookups, args.urls)
+    print(f"{'history':<18} {'open s':>7} {'RSS MB':>7} {'hit us':>7} {'miss us':>8} "
+          f"{'false +':>8}")
+    for mode in ("set", "job, first start", "job"):
+        results = multiprocessing.Queue()
+        proc = multiprocessing.Process(target=_measure_history,
+                                       args=(db, mode, args.urls, lookups, results))
+        proc.start()
+        opened, rss, ((hit, found), (miss, wrong)), false_positives = results.get()
+        proc.join()
+        assert found == lookups and not wrong, "history lookups are wrong"
+        print(f"{mode:<18} {opened:>7.2f} {rss / 1e6:>7.1f} {hit * 1e6:>7.2f} "
+              f"{miss * 1e6:>8.2f} {false_positives:>8}")
+    bloom = db.parent / ".crawler-state.downloaded.bloom"
+    print(f"Bloom filter file: {bloom.stat().st_size / 1e6:.1f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="DeckDock crawler micro-benchmarks")
+    sub = parser.add_subparsers(dest="bench", required=True)
+
+    p = sub.add_parser("discovery", help="per-link discovery cost on a big listing")
+    p.add_argument("--links", type=int, default=100000, help="total links (default 100000)")
+    p.add_argument("--chunk", type=int, default=10000, help="links per timed chunk")
+    p.set_defaults(func=bench_discovery)
+
+    p = sub.add_parser("parse", help="pages/sec per page-extraction backend")
+    p.add_argument("--html", action="append", help="saved HTML page (repeatable)")
+    p.add_argument("--repeat", type=int, default=20, help="parses per page per backend")
+    p.set_defaults(func=bench_parse)
+
+    p = sub.add_parser("transport", help="request latency per HTTP transport")
+    p.add_argument("--url", help="page to fetch (default: a local test server)")
+    p.add_argument("--requests", type=int, default=400, help="GETs per transport")
+    p.add_argument("--threads", type=int, default=16, help="concurrent requests")
+    p.add_argument("--connect-ms", type=int, default=30,
+                   help="local server: simulated cost of a new connection")
+    p.set_defaults(func=bench_transport)
+
+    p = sub.add_parser("history", help="memory and lookup cost of the download history")
+    p.add_argument("--urls", type=int, default=1000000, help="URLs in the history")
+    p.add_argument("--lookups", type=int, default=20000, help="lookups per hit/miss run")
+    p.set_defaults(func=bench_history)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -7,18 +7,33 @@ Configuration is read from ../config.env (relative to this script)
 or from the path specified in the DECKDOCK_CONFIG environment variable.
 """
 
+import array
+import asyncio
+import bisect
+import concurrent.futures
+import contextlib
+import email.utils
+import inspect
 import hashlib
+import heapq
+import http.client
 import http.server
 import json
 import lzma
+import mmap
 import os
+import queue
 import re
+import shlex
+import socket
+import sqlite3
 import struct
 import subprocess
 import sys
 import threading
 import time
 import urllib.parse
+import xml.etree.ElementTree as ET
 import zipfile
 import zlib
 from pathlib import Path
@@ -26,10 +41,12 @@ from pathlib import Path
 import requests
 import urllib3
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, NavigableString
+from html.parser import HTMLParser
 
 # 7z archive peeking
 import py7zr
+import py7zr.exceptions
 import shutil
 import tempfile
 
@@ -38,6 +55,13 @@ import rarfile
 rarfile.UNRAR_TOOL = "/usr/bin/7z"
 rarfile.ALT_TOOL = "/usr/bin/7z"
 
+# py7zr 1.0+ can decompress into writers of our own (extract(factory=));
+# older releases only extract to disk
+HAS_PY7ZR_FACTORY = "factory" in inspect.signature(py7zr.SevenZipFile.extract).parameters
+# What reading a damaged or unsupported archive can raise
+_ARCHIVE_ERRORS = (OSError, EOFError, zipfile.BadZipFile, lzma.LZMAError,
+                  py7zr.exceptions.ArchiveError, rarfile.Error)
+
 
 # ============================================================================
 # CONFIGURATION LOADER
@@ -107,6 +131,38 @@ def cfg(key, default=None):
     return _CONFIG.get(key, default)
 
 
+def _minute_of_day(hhmm):
+    hours, _, minutes = hhmm.strip().partition(":")
+    hour, minute = int(hours), int(minutes or 0)
+    if not (0 <= hour <= 24 and 0 <= minute < 60):
+        raise ValueError(f"bad time {hhmm!r}")
+    return hour * 60 + minute
+
+
+def _parse_schedule(text):
+    """Parse a bandwidth schedule like "07:00-23:00=30%,23:00-07:00=100%".
+
+    Returns [(start_minute, end_minute, amount, is_percent, spec)]. A window
+    may wrap past midnight; amount is a percentage of the configured cap, or
+    KB/s without the % sign (0 = unlimited). Raises ValueError.
+    """
+    windows = []
+    for spec in (item.strip() for item in (text or "").split(",")):
+        if not spec:
+            continue
+        span, eq, amount = spec.partition("=")
+        start, dash, end = span.partition("-")
+        if not eq or not dash:
+            raise ValueError(f"bad bandwidth window {spec!r} (want HH:MM-HH:MM=N or N%)")
+        amount = amount.strip()
+        is_percent = amount.endswith("%")
+        value = int(amount.rstrip("%"))
+        if value < 0:
+            raise ValueError(f"bad bandwidth window {spec!r}")
+        windows.append((_minute_of_day(start), _minute_of_day(end), value, is_percent, spec))
+    return windows
+
+
 # ============================================================================
 # DERIVED CONFIGURATION
 # ============================================================================
@@ -129,38 +185,68 @@ CARTRIDGE_EXTENSIONS = None  # set at module load
 # Optional: Playwright for JS-rendered sites
 try:
     from playwright.sync_api import sync_playwright
+    from playwright.async_api import async_playwright
     HAS_PLAYWRIGHT = True
 except ImportError:
     HAS_PLAYWRIGHT = False
 
+# Optional: aiohttp for the asyncio crawl engine
+try:
+    import aiohttp
+    HAS_AIOHTTP = True
+except ImportError:
+    HAS_AIOHTTP = False
+
+# Optional: httpx with h2 for HTTP/2 page fetches
+try:
+    import httpx
+    import h2  # noqa: F401 -- httpx needs it for http2=True
+    HAS_HTTPX = True
+except ImportError:
+    HAS_HTTPX = False
+
 
 class _FileResponse:
-    """Wraps a local file to look like a requests.Response for uniform handling."""
+    """Wraps a finished browser download to look like a requests.Response
+    for uniform handling. The file already sits on the staging filesystem
+    (see _incoming_dir), so download_file() renames it into place with
+    move_to() instead of streaming it through a .part file."""
     def __init__(self, filepath):
         self._path = filepath
         self._size = os.path.getsize(filepath)
+        self._hashes = None
         self.headers = {
             "content-length": str(self._size),
             "content-type": "application/octet-stream",
         }
         self.status_code = 200
 
-    def iter_content(self, chunk_size=65536):
-        with open(self._path, "rb") as f:
-            while True:
-                chunk = f.read(chunk_size)
-                if not chunk:
-                    break
-                yield chunk
-        # Clean up the temp file after reading
+    def digests(self):
+        """_MultiHasher digests of the file, from one read pass."""
+        if self._hashes is None:
+            self._hashes = _MultiHasher.of_file(self._path)
+        return self._hashes
+
+    def move_to(self, filepath):
+        """Rename the file to filepath. Returns (size, hashes)."""
+        hashes = self.digests()
+        os.replace(self._path, filepath)
+        self._cleanup()
+        return self._size, hashes
+
+    def _cleanup(self):
         try:
             os.unlink(self._path)
+        except OSError:
+            pass
+        try:
             os.rmdir(os.path.dirname(self._path))
         except OSError:
             pass
 
     def close(self):
-        pass
+        """Discard the download (e.g. it turned out to be a duplicate)."""
+        self._cleanup()
 
     def raise_for_status(self):
         pass
@@ -172,6 +258,80 @@ STAGING_BASE = cfg("STAGING_DIR", os.path.expanduser("~/nas-staging"))
 DEFAULT_DELAY = int(cfg("DEFAULT_DELAY", "5"))
 DEFAULT_DEPTH = int(cfg("DEFAULT_DEPTH", "3"))
 
+# Page-fetch worker pool: total workers per crawl, and how many of them may
+# hit the same host at once
+CRAWL_WORKERS = int(cfg("CRAWL_WORKERS", "4"))
+CRAWL_HOST_CONCURRENCY = int(cfg("CRAWL_HOST_CONCURRENCY", "2"))
+# Crawl engine: "threads" (requests + page-worker threads) or "asyncio"
+# (aiohttp, needs `pip install aiohttp`; falls back to threads without it)
+CRAWL_ENGINE = cfg("CRAWL_ENGINE", "threads")
+# asyncio engine only: page fetches / file downloads in flight at once
+CRAWL_ASYNC_FETCHES = int(cfg("CRAWL_ASYNC_FETCHES", "64"))
+CRAWL_ASYNC_DOWNLOADS = int(cfg("CRAWL_ASYNC_DOWNLOADS", "3"))
+# Job manager: crawls running at once, the page-worker budget they share,
+# and total bandwidth caps in KB/s for downloads and for pushes to the NAS
+# (0 = unlimited). Jobs beyond either limit wait in a queue and start as
+# running ones finish.
+MAX_JOBS = int(cfg("MAX_JOBS", "2"))
+CRAWL_TOTAL_WORKERS = int(cfg("CRAWL_TOTAL_WORKERS", "8"))
+MAX_BANDWIDTH_KBPS = int(cfg("MAX_BANDWIDTH_KBPS", "0"))
+MAX_PUSH_KBPS = int(cfg("MAX_PUSH_KBPS", "0"))
+# Time-of-day bandwidth windows (local time), e.g. full speed overnight and
+# 30% of the caps during the day: "07:00-23:00=30%,23:00-07:00=100%".
+# A plain number is KB/s. Outside every window the caps apply as-is.
+BANDWIDTH_SCHEDULE = cfg("BANDWIDTH_SCHEDULE", "")
+# Download pipeline: worker threads per stage. Downloads keep the network
+# busy, post-processing (CHD/7z conversion, hashing) the CPU, and pushes the
+# NAS link; PIPELINE_QUEUE bounds the backlog in front of each stage.
+PIPELINE_DOWNLOADS = int(cfg("PIPELINE_DOWNLOADS", "1"))
+PIPELINE_POSTPROCESS = int(cfg("PIPELINE_POSTPROCESS", "1"))
+PIPELINE_PUSH = int(cfg("PIPELINE_PUSH", "1"))
+PIPELINE_QUEUE = int(cfg("PIPELINE_QUEUE", "16"))
+# Segmented downloads: files of at least DOWNLOAD_SEGMENT_MIN_MB from servers
+# that accept Range requests download as DOWNLOAD_SEGMENTS parallel byte
+# ranges. DOWNLOAD_SEGMENTS_PER_HOST overrides the count for specific hosts,
+# e.g. "myrient.erista.me=8,archive.org=2" (1 = never split)
+DOWNLOAD_SEGMENTS = int(cfg("DOWNLOAD_SEGMENTS", "4"))
+DOWNLOAD_SEGMENT_MIN_MB = int(cfg("DOWNLOAD_SEGMENT_MIN_MB", "64"))
+DOWNLOAD_SEGMENTS_PER_HOST = {
+    host.strip().lower(): int(count)
+    for host, _, count in (item.partition("=") for item in
+                           cfg("DOWNLOAD_SEGMENTS_PER_HOST", "").split(","))
+    if host.strip() and count.strip().isdigit()
+}
+# HTTP transport: kept-alive connections per host (0 = enough for the page
+# workers plus every download segment), retries for failed connections,
+# seconds a DNS answer is reused, and HTTP/2 page fetches ("auto" uses it
+# when httpx[http2] is installed, "false" never)
+HTTP_POOL_PER_HOST = int(cfg("HTTP_POOL_PER_HOST", "0"))
+HTTP_RETRIES = int(cfg("HTTP_RETRIES", "2"))
+DNS_CACHE_TTL = int(cfg("DNS_CACHE_TTL", "300"))
+HTTP2 = cfg("HTTP2", "auto").lower()
+# Mirror failover: a file found at several URLs (same name and size, on any
+# site or job) downloads from the fastest healthy one, and moves to another,
+# resuming its .part, when its source runs slower than MIRROR_SLOW_KBPS
+MIRROR_FAILOVER = cfg("MIRROR_FAILOVER", "true").lower() == "true"
+MIRROR_SLOW_KBPS = int(cfg("MIRROR_SLOW_KBPS", "1024"))
+# Content dedup: a download whose bytes match a file already in the dedup
+# registry under another name is skipped, hardlinked to that file ("link"),
+# or kept as a second copy ("keep"). The size plus the first DEDUP_HEAD_KB
+# identify it early enough to stop the download (0 = wait for the full hash)
+DEDUP_IDENTICAL = cfg("DEDUP_IDENTICAL", "skip").lower()
+DEDUP_HEAD_KB = int(cfg("DEDUP_HEAD_KB", "1024"))
+# NAS dedup: a file already in the NAS ROM tree (same name and size, or the
+# .zip/.chd post-processing would turn it into) isn't downloaded again. The
+# tree is listed over SSH at most every NAS_MANIFEST_TTL seconds
+NAS_DEDUP = cfg("NAS_DEDUP", "true").lower() == "true"
+NAS_MANIFEST_TTL = int(cfg("NAS_MANIFEST_TTL", "600"))
+# DAT verification: No-Intro/Redump DATs (.dat/.xml, or zips of them) in
+# DAT_DIR identify downloads by CRC32, size and SHA-1. A match decides the
+# system and, with DAT_RENAME, the file's canonical name; a known bad dump,
+# or a file named like a DAT game whose contents differ, is held in staging
+# instead of trickle-pushed while DAT_HOLD_BAD is on
+DAT_DIR = cfg("DAT_DIR", str(Path(__file__).resolve().parent / "dats"))
+DAT_RENAME = cfg("DAT_RENAME", "true").lower() == "true"
+DAT_HOLD_BAD = cfg("DAT_HOLD_BAD", "true").lower() == "true"
+
 # Network targets from config
 DEVICE_HOST = cfg("DEVICE_HOST", "")
 NAS_HOST = cfg("NAS_HOST", "")
@@ -194,6 +354,15 @@ def _validate_config():
         issues.append("TRICKLE_PUSH=true but NAS_EXPORT is empty — pushes will silently fail")
     if NAS_HOST and not NAS_EXPORT:
         issues.append("NAS_HOST set but NAS_EXPORT is empty — NAS push won't know where to write")
+    try:
+        _parse_schedule(BANDWIDTH_SCHEDULE)
+    except ValueError as e:
+        issues.append(f"BANDWIDTH_SCHEDULE ignored — {e}")
+    if HTTP2 == "true" and not HAS_HTTPX:
+        issues.append("HTTP2=true but httpx[http2] is not installed — using HTTP/1.1")
+    if DEDUP_IDENTICAL not in ("skip", "link", "keep"):
+        issues.append(f"DEDUP_IDENTICAL={DEDUP_IDENTICAL} is not skip, link or keep "
+                      f"— keeping identical files")
     if issues:
         banner = f"\n{'='*60}\n  CONFIG PROBLEMS:\n"
         for issue in issues:
@@ -212,6 +381,181 @@ IGDB_CLIENT_ID = cfg("IGDB_CLIENT_ID", "")
 IGDB_CLIENT_SECRET = cfg("IGDB_CLIENT_SECRET", "")
 
 
+# ============================================================================
+# HTTP TRANSPORT
+# ============================================================================
+
+class _DNSCache:
+    """TTL cache in front of socket.getaddrinfo.
+
+    urllib3 resolves the host again for every new connection (each download
+    segment, each reconnect after a keep-alive timeout), so a slow resolver
+    adds its latency to all of them. install() wraps getaddrinfo for the
+    whole process; aiohttp has its own cache (ttl_dns_cache).
+    """
+
+    MAX_ENTRIES = 1024
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self._resolve = socket.getaddrinfo
+        self._entries = {}  # args -> (expires, result)
+        self._lock = threading.Lock()
+
+    def getaddrinfo(self, host, port, family=0, type=0, proto=0, flags=0):
+        key = (host, port, family, type, proto, flags)
+        entry = self._entries.get(key)
+        now = time.monotonic()
+        if entry is not None and entry[0] > now:
+            return entry[1]
+        result = self._resolve(host, port, family, type, proto, flags)
+        with self._lock:
+            if len(self._entries) >= self.MAX_ENTRIES:
+                self._entries.clear()
+            self._entries[key] = (now + self.ttl, result)
+        return result
+
+    def install(self):
+        socket.getaddrinfo = self.getaddrinfo
+
+
+if DNS_CACHE_TTL > 0:
+    _DNSCache(DNS_CACHE_TTL).install()
+
+
+def _use_http2():
+    return HAS_HTTPX and HTTP2 != "false"
+
+
+def _download_pool_size():
+    """Connections one job may hold open to a host: its page workers, the
+    parallel dedup HEADs, and every segment of every download at once.
+    requests' default of 10 discards (and later reopens) the rest."""
+    if HTTP_POOL_PER_HOST:
+        return HTTP_POOL_PER_HOST
+    segments = max([DOWNLOAD_SEGMENTS, *DOWNLOAD_SEGMENTS_PER_HOST.values()])
+    return CRAWL_HOST_CONCURRENCY * 2 + PIPELINE_DOWNLOADS * max(1, segments)
+
+
+def _make_session(pool_size=4, http2=False):
+    """A requests.Session that keeps pool_size connections per host alive
+    and retries requests whose connection failed.
+
+    Only connect errors, and read errors on idempotent methods, are retried
+    here; rate-limit statuses are left to the callers, which back off per
+    host. With http2, https goes through _HTTP2Adapter instead.
+    """
+    retry = urllib3.util.Retry(
+        total=HTTP_RETRIES, connect=HTTP_RETRIES, read=HTTP_RETRIES,
+        status=0, redirect=None, backoff_factor=0.5, raise_on_status=False,
+        respect_retry_after_header=False)
+    adapter = requests.adapters.HTTPAdapter(
+        pool_connections=16, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", _HTTP2Adapter(pool_size) if http2 else adapter)
+    return session
+
+
+class _HTTPXRaw:
+    """Stands in for urllib3's HTTPResponse as requests.Response.raw."""
+
+    def __init__(self, resp):
+        self._resp = resp
+        self.status = resp.status_code
+        self.reason = resp.reason_phrase
+        # requests reads Set-Cookie from raw._original_response.msg
+        self.msg = http.client.HTTPMessage()
+        for key, value in resp.headers.multi_items():
+            self.msg[key] = value
+        self._original_response = self
+
+    def stream(self, chunk_size=65536, decode_content=True):
+        try:
+            yield from self._resp.iter_bytes(chunk_size)
+        except httpx.HTTPError as e:
+            raise requests.exceptions.ChunkedEncodingError(e)
+        finally:
+            self._resp.close()
+
+    def read(self, amt=None, decode_content=True):
+        """The rest of the body (amt is ignored)."""
+        return b"".join(self.stream())
+
+    def close(self):
+        self._resp.close()
+
+    release_conn = close
+
+
+class _HTTP2Adapter(requests.adapters.BaseAdapter):
+    """requests transport adapter that sends over an httpx HTTP/2 client.
+
+    Page workers hitting one host multiplex over a single connection instead
+    of each holding its own; servers without h2 are negotiated down to
+    HTTP/1.1. Redirects, cookies and hooks stay with requests.Session, and
+    responses come back as ordinary requests.Response objects.
+    """
+
+    # Connection-specific headers are illegal in HTTP/2
+    _HOP_HEADERS = {"connection", "keep-alive", "proxy-connection",
+                    "transfer-encoding", "upgrade"}
+
+    def __init__(self, pool_size=4):
+        super().__init__()
+        self._pool_size = pool_size
+        self._clients = {}  # verify -> httpx.Client
+        self._lock = threading.Lock()
+
+    def _client(self, verify):
+        with self._lock:
+            client = self._clients.get(verify)
+            if client is None:
+                transport = httpx.HTTPTransport(
+                    http2=True, verify=verify, retries=HTTP_RETRIES,
+                    limits=httpx.Limits(max_keepalive_connections=self._pool_size))
+                client = self._clients[verify] = httpx.Client(
+                    transport=transport, follow_redirects=False)
+            return client
+
+    def send(self, request, stream=False, timeout=None, verify=True,
+             cert=None, proxies=None):
+        connect = read = timeout
+        if isinstance(timeout, tuple):
+            connect, read = timeout
+        headers = [(k, v) for k, v in request.headers.items()
+                   if k.lower() not in self._HOP_HEADERS]
+        client = self._client(verify)
+        try:
+            resp = client.send(client.build_request(
+                request.method, request.url, headers=headers, content=request.body,
+                timeout=httpx.Timeout(read, connect=connect)), stream=True)
+        except httpx.ConnectTimeout as e:
+            raise requests.exceptions.ConnectTimeout(e, request=request)
+        except httpx.TimeoutException as e:
+            raise requests.exceptions.ReadTimeout(e, request=request)
+        except httpx.HTTPError as e:
+            raise requests.exceptions.ConnectionError(e, request=request)
+
+        response = requests.Response()
+        response.status_code = resp.status_code
+        response.headers = requests.structures.CaseInsensitiveDict(resp.headers.items())
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        response.reason = resp.reason_phrase
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        response.raw = _HTTPXRaw(resp)
+        requests.cookies.extract_cookies_to_jar(response.cookies, request, response.raw)
+        return response
+
+    def close(self):
+        with self._lock:
+            clients, self._clients = self._clients, {}
+        for client in clients.values():
+            client.close()
+
+
 # ============================================================================
 # TITLE-BASED CLASSIFICATION (Layer 1: curated JSON, Layer 2: IGDB API)
 # ============================================================================
@@ -250,6 +594,8 @@ _MIN_PATTERN_LEN = 5  # Substring matching on shorter patterns causes mass false
 # In-memory IGDB OAuth token cache
 _igdb_token = None
 _igdb_token_expires = 0
+# Every IGDB call reuses one kept-alive connection
+_igdb_session = _make_session(2)
 
 
 def _load_title_database():
@@ -348,7 +694,7 @@ def _igdb_authenticate():
         return None
 
     try:
-        resp = requests.post("https://id.twitch.tv/oauth2/token", data={
+        resp = _igdb_session.post("https://id.twitch.tv/oauth2/token", data={
             "client_id": IGDB_CLIENT_ID,
             "client_secret": IGDB_CLIENT_SECRET,
             "grant_type": "client_credentials",
@@ -380,7 +726,7 @@ def _igdb_lookup(title):
     time.sleep(0.3)
 
     try:
-        resp = requests.post(
+        resp = _igdb_session.post(
             "https://api.igdb.com/v4/games",
             headers={
                 "Client-ID": IGDB_CLIENT_ID,
@@ -733,158 +1079,3197 @@ def _system_from_file_header(filepath):
     else:
         return None
 
-    if not data:
-        return None
+    if not data:
+        return None
+
+    return _system_from_header_bytes(data)
+
+
+# ============================================================================
+# DAT VERIFICATION (No-Intro / Redump: system and canonical name by hash)
+# ============================================================================
+
+# DAT header names (any "(...)" suffix dropped, lowercased) -> system slug.
+# A DAT kept in a DAT_DIR subfolder named after a slug needn't be listed.
+_DAT_SYSTEMS = {
+    "nintendo - nintendo entertainment system": "nes",
+    "nintendo - super nintendo entertainment system": "snes",
+    "nintendo - nintendo 64": "n64",
+    "nintendo - game boy": "gb", "nintendo - game boy color": "gbc",
+    "nintendo - game boy advance": "gba",
+    "nintendo - nintendo ds": "nds", "nintendo - nintendo 3ds": "3ds",
+    "nintendo - gamecube": "gc", "nintendo - wii": "wii", "nintendo - wii u": "wiiu",
+    "sega - mega drive - genesis": "genesis", "sega - 32x": "sega32x",
+    "sega - master system - mark iii": "mastersystem", "sega - game gear": "gamegear",
+    "sega - mega-cd - sega cd": "segacd", "sega - mega cd & sega cd": "segacd",
+    "sega - saturn": "saturn", "sega - dreamcast": "dreamcast",
+    "sony - playstation": "psx", "sony - playstation 2": "ps2",
+    "sony - playstation 3": "ps3", "sony - playstation portable": "psp",
+    "sony - playstation vita": "psvita",
+    "nec - pc engine - turbografx-16": "pcengine",
+    "nec - pc engine cd & turbografx cd": "pcengine",
+    "atari - 2600": "atari2600", "atari - 5200": "atari5200",
+    "atari - 7800": "atari7800", "atari - lynx": "atarilynx",
+    "atari - jaguar": "atarijaguar",
+    "bandai - wonderswan": "wonderswan", "bandai - wonderswan color": "wonderswancolor",
+    "snk - neo geo pocket": "ngp", "snk - neo geo pocket color": "ngpc",
+    "gce - vectrex": "vectrex", "coleco - colecovision": "coleco",
+    "microsoft - xbox": "xbox", "panasonic - 3do interactive multiplayer": "3do",
+    "philips - cd-i": "cdi",
+}
+
+_DAT_EXTENSIONS = {".dat", ".xml", ".zip"}
+# Compressed or re-encoded images, whose own hashes are never a DAT's
+_DAT_UNCOMPARABLE = OPTIMAL_EXTENSIONS | {".gcz", ".wbfs", ".ecm", ".cia", ".nsp", ".xci"}
+_DAT_CACHE = ".dat-index"
+# How often DAT_DIR is re-listed for added or changed DATs (seconds)
+_DAT_RECHECK = 60
+# TOSEC/GoodTools-style bad dump flags in a game name: [b], [b1], ...
+_DAT_BAD_RE = re.compile(r"\[b\d*\]")
+
+
+def _dat_name_key(name):
+    """64-bit key of a game name, for the index's by-name table."""
+    return int.from_bytes(hashlib.blake2b(name.casefold().encode(), digest_size=8).digest(),
+                          "little")
+
+
+def _dat_roms(source, system):
+    """(system, game, rom, size, crc32, sha1, bad) for each dumped ROM in one
+    Logiqx-XML DAT. The header names the system unless the caller did."""
+    game = None
+    for event, elem in ET.iterparse(source, events=("start", "end")):
+        tag = elem.tag
+        if event == "start":
+            if tag in ("game", "machine"):
+                game = elem.get("name")
+            continue
+        if tag == "header":
+            if system is None:
+                name = re.sub(r"\s*\(.*$", "", elem.findtext("name") or "")
+                system = _DAT_SYSTEMS.get(name.strip().lower(), "")
+            elem.clear()
+        elif tag == "rom" and game:
+            status = elem.get("status", "")
+            crc, size = elem.get("crc"), elem.get("size")
+            if status != "nodump" and crc and size:
+                yield (system or "", game, elem.get("name", ""), int(size), int(crc, 16),
+                       (elem.get("sha1") or "").lower(),
+                       status == "baddump" or bool(_DAT_BAD_RE.search(game)))
+        elif tag in ("game", "machine"):
+            game = None
+            elem.clear()
+
+
+class _DatIndex:
+    """Every ROM in the DATs under DAT_DIR, by CRC32 and size or by game name.
+
+    The DATs' XML is parsed once into flat arrays -- the ROMs' CRC32s in
+    sorted order, their sizes, SHA-1s, systems and names alongside, plus
+    sorted game-name keys -- and saved as DAT_DIR/.dat-index. Loading that
+    maps the file and wraps each array in a memoryview, so it takes
+    milliseconds however many DATs there are, and lookups bisect straight
+    into the mapping. If DAT_DIR isn't writable the arrays go to an
+    unnamed temporary file instead.
+    """
+
+    _MAGIC = b"DDDATIX1"
+    # (section, array type code)
+    _SECTIONS = (("crc", "I"), ("size", "Q"), ("sha1", "B"), ("name", "I"),
+                 ("glen", "I"), ("rlen", "I"), ("system", "H"), ("bad", "B"),
+                 ("key", "Q"), ("game", "I"), ("names", "B"))
+
+    def __init__(self, f):
+        self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, header_len = struct.unpack_from("<8sI", self._map)
+        if magic != self._MAGIC:
+            raise ValueError("not a DAT index")
+        header = json.loads(self._map[12:12 + header_len])
+        self.fingerprint = header["fingerprint"]
+        self.systems = header["systems"]
+        self.count = header["count"]
+        view = memoryview(self._map)
+        for name, code in self._SECTIONS:
+            start, length = header["sections"][name]
+            setattr(self, "_" + name, view[start:start + length].cast(code))
+
+    @classmethod
+    def build(cls, dat_dir, files, fingerprint, log=print):
+        """Parse the DATs and write their index; returns it loaded."""
+        slugs = (set(EXT_TO_SYSTEM.values()) | {s for _, s in PATH_KEYWORDS}
+                 | set(_DAT_SYSTEMS.values()))
+        roms = []
+        for dat in files:
+            parts = dat.relative_to(dat_dir).parts
+            system = parts[0].lower() if len(parts) > 1 and parts[0].lower() in slugs else None
+            try:
+                if dat.suffix.lower() == ".zip":
+                    with zipfile.ZipFile(dat) as zf:
+                        for member in zf.namelist():
+                            if Path(member).suffix.lower() in (".dat", ".xml"):
+                                with zf.open(member) as f:
+                                    roms.extend(_dat_roms(f, system))
+                else:
+                    with open(dat, "rb") as f:
+                        roms.extend(_dat_roms(f, system))
+            except (ET.ParseError, zipfile.BadZipFile, OSError, ValueError) as e:
+                log(f"DAT index: skipped {dat.name} (not a readable XML DAT: {e})")
+        roms.sort(key=lambda r: (r[4], r[3]))
+
+        systems = sorted({r[0] for r in roms} | {""})
+        system_ids = {s: i for i, s in enumerate(systems)}
+        arrays = {name: array.array(code) for name, code in cls._SECTIONS}
+        sha1s, names = bytearray(), bytearray()
+        keys = {}
+        for i, (system, game, rom, size, crc, sha1, bad) in enumerate(roms):
+            arrays["crc"].append(crc)
+            arrays["size"].append(size)
+            sha1s += bytes.fromhex(sha1) if len(sha1) == 40 else bytes(20)
+            game_bytes, rom_bytes = game.encode(), rom.encode()
+            arrays["name"].append(len(names))
+            arrays["glen"].append(len(game_bytes))
+            arrays["rlen"].append(len(rom_bytes))
+            names += game_bytes + rom_bytes
+            arrays["system"].append(system_ids[system])
+            arrays["bad"].append(bad)
+            keys.setdefault((game.casefold(), system), i)
+        for key, i in sorted((_dat_name_key(game), i) for (game, _), i in keys.items()):
+            arrays["key"].append(key)
+            arrays["game"].append(i)
+        arrays["sha1"].frombytes(sha1s)
+        arrays["names"].frombytes(names)
+
+        layout, offset = {}, 0
+        for name, _ in cls._SECTIONS:
+            length = len(arrays[name]) * arrays[name].itemsize
+            layout[name] = offset, length
+            offset += (length + 7) & ~7
+        # The sections start at the first 8-aligned byte past the header,
+        # whose length depends on the offsets it lists
+        header = {"fingerprint": fingerprint, "systems": systems, "count": len(roms)}
+        start = 0
+        while True:
+            sections = {name: (offset + start, length)
+                        for name, (offset, length) in layout.items()}
+            encoded = json.dumps({**header, "sections": sections}).encode()
+            if 12 + len(encoded) <= start:
+                break
+            start = (12 + len(encoded) + 7) & ~7
+
+        def write(f):
+            f.write(struct.pack("<8sI", cls._MAGIC, len(encoded)) + encoded)
+            for name, _ in cls._SECTIONS:
+                f.write(bytes(sections[name][0] - f.tell()))
+                arrays[name].tofile(f)
+            f.flush()
+
+        path = Path(dat_dir) / _DAT_CACHE
+        tmp = path.with_name(path.name + ".tmp")
+        try:
+            with open(tmp, "wb") as f:
+                write(f)
+            os.replace(tmp, path)
+            with open(path, "rb") as f:
+                return cls(f)
+        except OSError as e:
+            log(f"DAT index: can't save {path} ({e}), keeping it in a temporary file")
+            with contextlib.suppress(OSError):
+                tmp.unlink()
+        with tempfile.TemporaryFile() as f:
+            write(f)
+            return cls(f)
+
+    def _record(self, i):
+        start, game_len = self._name[i], self._glen[i]
+        game = bytes(self._names[start:start + game_len]).decode()
+        rom = bytes(self._names[start + game_len:start + game_len + self._rlen[i]]).decode()
+        return {"system": self.systems[self._system[i]], "game": game, "rom": rom,
+                "bad": bool(self._bad[i])}
+
+    def find(self, size, crc32, sha1=None):
+        """DAT ROMs with this CRC32 and size (and SHA-1, where both have one):
+        [{"system", "game", "rom", "bad"}]."""
+        crcs, found = self._crc, []
+        i = bisect.bisect_left(crcs, crc32)
+        while i < len(crcs) and crcs[i] == crc32:
+            if self._size[i] == size:
+                known = self._sha1[i * 20:i * 20 + 20]
+                if not sha1 or not any(known) or known.hex() == sha1:
+                    found.append(self._record(i))
+            i += 1
+        return found
+
+    def systems_named(self, name):
+        """Systems with a DAT game of exactly this name (case-insensitive)."""
+        folded, key = name.casefold(), _dat_name_key(name)
+        keys, systems = self._key, set()
+        i = bisect.bisect_left(keys, key)
+        while i < len(keys) and keys[i] == key:
+            record = self._record(self._game[i])
+            if record["game"].casefold() == folded:
+                systems.add(record["system"])
+            i += 1
+        return systems
+
+
+_dat = {"index": None, "fingerprint": None, "checked": 0.0}
+_dat_lock = threading.Lock()
+
+
+def _dat_index(log=print):
+    """The _DatIndex for DAT_DIR, or None without DATs.
+
+    The directory listing is fingerprinted at most every _DAT_RECHECK
+    seconds; the saved index is used while the fingerprint matches and
+    rebuilt when a DAT is added, removed or replaced.
+    """
+    with _dat_lock:
+        now = time.monotonic()
+        if _dat["checked"] and now - _dat["checked"] < _DAT_RECHECK:
+            return _dat["index"]
+        _dat["checked"] = now
+        dat_dir = Path(DAT_DIR)
+        files = sorted(p for p in dat_dir.rglob("*")
+                       if p.suffix.lower() in _DAT_EXTENSIONS and p.is_file()) \
+            if dat_dir.is_dir() else []
+        if not files:
+            _dat.update(index=None, fingerprint=None)
+            return None
+        listing = hashlib.sha1()
+        for p in files:
+            st = p.stat()
+            listing.update(f"{p.relative_to(dat_dir)}:{st.st_size}:{st.st_mtime_ns}\n".encode())
+        fingerprint = listing.hexdigest()
+        if fingerprint == _dat["fingerprint"]:
+            return _dat["index"]
+
+        index = None
+        try:
+            with open(dat_dir / _DAT_CACHE, "rb") as f:
+                index = _DatIndex(f)
+            if index.fingerprint != fingerprint:
+                index = None
+        except (OSError, ValueError, KeyError, struct.error):
+            index = None
+        if index is None:
+            started = time.monotonic()
+            index = _DatIndex.build(dat_dir, files, fingerprint, log)
+            log(f"DAT index: {index.count} ROMs from {len(files)} DAT files "
+                f"({time.monotonic() - started:.1f}s)")
+        _dat.update(index=index, fingerprint=fingerprint)
+        return index
+
+
+def _rom_members(filepath, hashes=None):
+    """[(name, size, crc32, sha1 or None)] for the data in a download: a
+    zip/7z/rar's members, from its own headers without extracting, or a
+    bare file itself by the hashes streamed while it was written."""
+    ext = filepath.suffix.lower()
+    try:
+        if ext == ".zip":
+            with zipfile.ZipFile(filepath) as zf:
+                return [(Path(i.filename).name, i.file_size, i.CRC, None)
+                        for i in zf.infolist() if not i.is_dir()]
+        if ext in (".7z", ".rar"):
+            return [(Path(m["name"]).name, m["size"], m["crc"], None)
+                    for m in _archive_members(filepath) if m["crc"] is not None]
+        if hashes and hashes.get("crc32"):
+            return [(filepath.name, filepath.stat().st_size, int(hashes["crc32"], 16),
+                     hashes.get("sha1"))]
+    except Exception:
+        pass
+    return []
+
+# ============================================================================
+# PAGE EXTRACTION (single pass over each crawled page)
+# ============================================================================
+
+# Parser backend for crawled pages: "stream" (stdlib tokenizer, no tree),
+# "html.parser" (BeautifulSoup), or "lxml" (BeautifulSoup + lxml if installed)
+PAGE_PARSER = cfg("PAGE_PARSER", "stream")
+PARSER_BACKENDS = ("stream", "html.parser", "lxml")
+
+# Optional: lxml for the faster BeautifulSoup tree builder
+try:
+    import lxml  # noqa: F401
+    HAS_LXML = True
+except ImportError:
+    HAS_LXML = False
+
+# Vimm embeds all disc data in: const media=[{"ID":5122,...},{"ID":13604,...}]
+_MEDIA_ARRAY_RE = re.compile(r'const\s+media\s*=\s*(\[.+?\]);')
+
+# Sites like CoolROM hide download URLs in JavaScript, e.g.
+# window.location.href = "https://dl.coolrom.com.au/dl/ID/TOKEN/TS/"
+_JS_DOWNLOAD_RE = re.compile(
+    r'(?:window\.(?:location\.href|open)\s*[=(]\s*["\'])'
+    r'(https?://dl\.[^"\']+)'
+)
+
+
+# Directory listing rows (Apache/nginx/lighttpd autoindex, h5ai-style
+# tables): the text after a file link is its date and size columns
+_LISTING_DATE_RE = re.compile(
+    r"(?:(?P<y1>\d{4})-(?P<m1>\d{2}|[A-Za-z]{3})-(?P<d1>\d{2})"
+    r"|(?P<d2>\d{2})-(?P<m2>[A-Za-z]{3})-(?P<y2>\d{4}))"
+    r"[ T](?P<H>\d{2}):(?P<M>\d{2})(?::\d{2})?")
+_LISTING_SIZE_RE = re.compile(r"^(?:-|(\d+(?:\.\d+)?)\s*([KMGT]i?B?|B|bytes)?)$", re.I)
+_MONTHS = {m: i for i, m in enumerate(
+    ("jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"), 1)}
+
+
+def _listing_meta(text):
+    """Parse the columns after a link in a directory listing.
+
+    Returns {"size_min", "size_max", "mtime"} or None unless the text is
+    exactly a date plus a size (or "-") — anything else is page prose, not
+    a listing row. Sizes in whole bytes are exact (min == max); "1.2M" or
+    "1.2 GiB" only bounds the size, allowing for rounding and for units of
+    1000 or 1024.
+    """
+    m = _LISTING_DATE_RE.search(text)
+    if not m:
+        return None
+    rest = (text[:m.start()] + " " + text[m.end():]).strip()
+    size = _LISTING_SIZE_RE.match(rest)
+    if not size:
+        return None
+    month = m["m1"] or m["m2"]
+    month = int(month) if month.isdigit() else _MONTHS.get(month.lower())
+    if not month:
+        return None
+    meta = {"mtime": f"{m['y1'] or m['y2']}-{month:02d}-{m['d1'] or m['d2']} "
+                     f"{m['H']}:{m['M']}"}
+    if size.group(1):
+        value, unit = size.group(1), (size.group(2) or "").upper()
+        if unit in ("", "B", "BYTES") and "." not in value:
+            meta["size_min"] = meta["size_max"] = int(value)
+        else:
+            power = "BKMGT".index(unit[0]) if unit else 0
+            decimals = len(value.partition(".")[2])
+            slack = 0.5 * 10 ** -decimals
+            meta["size_min"] = max(0, int((float(value) - slack) * 1000 ** power))
+            meta["size_max"] = int((float(value) + slack) * 1024 ** power) + 1
+    return meta
+
+
+class PageExtract:
+    """Everything the crawler needs from one page, pulled out in one pass.
+
+    links   -- raw href of every <a href>, in document order
+    forms   -- POST forms with a usable action: [(action, {input name: value})]
+    media   -- Vimm's media array (first one with more than one disc), or None
+    js_urls -- download URLs assigned to window.location.href / window.open
+    title   -- first <h1> text, else the <title> text (used as the game name)
+    text_hash -- SHA-1 of the visible text (sizes and dates in a directory
+               listing change it even when the links don't)
+    listing -- text after each link up to the end of its row/line: {href:
+               text}, the date and size columns on a directory listing
+               (parsed with _listing_meta only when needed)
+    """
+
+    __slots__ = ("links", "forms", "media", "js_urls", "title", "text_hash", "listing")
+
+    def __init__(self, links=None, forms=None, media=None, js_urls=None, title="",
+                 text_hash="", listing=None):
+        self.links = links if links is not None else []
+        self.forms = forms if forms is not None else []
+        self.media = media
+        self.js_urls = js_urls if js_urls is not None else []
+        self.title = title
+        self.text_hash = text_hash
+        self.listing = listing if listing is not None else {}
+
+    def to_dict(self):
+        return {"links": self.links, "forms": self.forms, "media": self.media,
+                "js_urls": self.js_urls, "title": self.title,
+                "text_hash": self.text_hash, "listing": self.listing}
+
+    @classmethod
+    def from_dict(cls, d):
+        return cls(links=d.get("links"),
+                   forms=[(a, i) for a, i in d.get("forms", [])],
+                   media=d.get("media"), js_urls=d.get("js_urls"),
+                   title=d.get("title", ""), text_hash=d.get("text_hash", ""),
+                   listing=d.get("listing"))
+
+    def _add_listing(self, href, text):
+        text = text.strip()
+        if text and len(text) < 120:
+            self.listing[href] = text
+
+    def _add_form(self, action, method, inputs):
+        action = (action or "").strip()
+        method = (method or "GET").upper()
+        if action and action != "#" and method == "POST":
+            self.forms.append((action, inputs))
+
+    def _add_script(self, text):
+        if not text:
+            return
+        if self.media is None:
+            m = _MEDIA_ARRAY_RE.search(text)
+            if m:
+                try:
+                    media = json.loads(m.group(1))
+                except (json.JSONDecodeError, ValueError):
+                    media = None
+                # Single disc — already handled by the form scanner
+                if isinstance(media, list) and len(media) > 1:
+                    self.media = media
+        for m in _JS_DOWNLOAD_RE.finditer(text):
+            self.js_urls.append(m.group(1))
+
+
+class _StreamExtractor(HTMLParser):
+    """Tokenizer-based extractor: fills a PageExtract without building a tree."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.page = PageExtract()
+        self._form = None       # (action, method, inputs) while inside <form>
+        self._script = None     # text chunks while inside <script>
+        self._capture = None    # "title" / "h1" while collecting heading text
+        self._text = []
+        self._title = None
+        self._h1 = None
+        self._style = False
+        self._hash = hashlib.sha1()
+        self._row = None        # (href, text chunks) after a link, for listing columns
+        self._in_link = False
+        self._pre = False
+
+    def handle_starttag(self, tag, attrs):
+        if tag in ("a", "tr"):
+            self._close_row()
+        if tag == "a":
+            for name, value in attrs:
+                if name == "href":
+                    href = (value or "").strip()
+                    self.page.links.append(href)
+                    self._row, self._in_link = (href, []), True
+                    break
+        elif tag == "pre":
+            self._pre = True
+        elif tag == "input":
+            if self._form is not None:
+                a = dict(attrs)
+                if a.get("name"):
+                    self._form[2][a["name"]] = a.get("value") or ""
+        elif tag == "form":
+            self._close_form()
+            a = dict(attrs)
+            self._form = (a.get("action"), a.get("method"), {})
+        elif tag == "script":
+            self._script = []
+        elif tag == "style":
+            self._style = True
+        elif tag == "title" and self._title is None and self._capture is None:
+            self._capture, self._text = "title", []
+        elif tag == "h1" and self._h1 is None and self._capture is None:
+            self._capture, self._text = "h1", []
+
+    def handle_endtag(self, tag):
+        if tag == "a":
+            self._in_link = False
+        elif tag in ("tr", "pre", "table"):
+            self._close_row()
+            if tag == "pre":
+                self._pre = False
+        if tag == "form":
+            self._close_form()
+        elif tag == "script" and self._script is not None:
+            self.page._add_script("".join(self._script))
+            self._script = None
+        elif tag == "style":
+            self._style = False
+        elif tag == self._capture:
+            text = "".join(self._text)
+            if tag == "title":
+                self._title = text
+            else:
+                self._h1 = text
+            self._capture = None
+
+    def handle_data(self, data):
+        if self._script is not None:
+            self._script.append(data)
+            return
+        if self._style:
+            return
+        if self._row is not None and not self._in_link:
+            if self._pre and "\n" in data:
+                # In a <pre> listing the row ends with the line
+                self._row[1].append(data.partition("\n")[0])
+                self._close_row()
+            else:
+                self._row[1].append(data)
+        words = data.split()
+        if words:
+            self._hash.update(" ".join(words).encode() + b"\n")
+        if self._capture is not None:
+            data = data.strip()
+            if data:
+                self._text.append(data)
+
+    def _close_form(self):
+        if self._form is not None:
+            self.page._add_form(*self._form)
+            self._form = None
+
+    def _close_row(self):
+        if self._row is not None:
+            href, chunks = self._row
+            self.page._add_listing(href, " ".join(chunks))
+            self._row = None
+
+    def finish(self):
+        self.close()
+        self._close_form()
+        self._close_row()
+        if self._capture == "h1" and self._h1 is None:
+            self._h1 = "".join(self._text)
+        elif self._capture == "title" and self._title is None:
+            self._title = "".join(self._text)
+        self.page.title = self._h1 if self._h1 is not None else (self._title or "")
+        self.page.text_hash = self._hash.hexdigest()
+        return self.page
+
+
+def _soup_row_text(link):
+    """The listing columns after a link: the rest of its table row, or the
+    rest of its line in a <pre> listing."""
+    cell = link.parent
+    if cell is not None and cell.name == "td":
+        return " ".join(c.get_text(" ", strip=True) for c in cell.find_next_siblings("td"))
+    parts = []
+    for sib in link.next_siblings:
+        if sib.name == "a":
+            break
+        text = str(sib) if sib.name is None else sib.get_text(" ")
+        parts.append(text.partition("\n")[0])
+        if "\n" in text:
+            break
+    return "".join(parts)
+
+
+def _extract_from_soup(soup):
+    """Fill a PageExtract from a BeautifulSoup tree in one document walk."""
+    page = PageExtract()
+    title = h1 = None
+    for tag in soup.find_all(["a", "form", "script", "title", "h1"]):
+        name = tag.name
+        if name == "a":
+            href = tag.get("href")
+            if href is not None:
+                page.links.append(href.strip())
+                page._add_listing(href.strip(), _soup_row_text(tag))
+        elif name == "form":
+            inputs = {}
+            for inp in tag.find_all("input"):
+                if inp.get("name"):
+                    inputs[inp["name"]] = inp.get("value", "")
+            page._add_form(tag.get("action", ""), tag.get("method", "GET"), inputs)
+        elif name == "script":
+            page._add_script(tag.string or "")
+        elif name == "title" and title is None:
+            title = tag.get_text(strip=True)
+        elif name == "h1" and h1 is None:
+            h1 = tag.get_text(strip=True)
+    page.title = h1 if h1 is not None else (title or "")
+
+    text = hashlib.sha1()
+    for s in soup.find_all(string=True):
+        if type(s) is not NavigableString or s.parent.name in ("script", "style"):
+            continue
+        words = s.split()
+        if words:
+            text.update(" ".join(words).encode() + b"\n")
+    page.text_hash = text.hexdigest()
+    return page
+
+
+def _extract_page(html, backend=None):
+    """Parse page HTML once and return its PageExtract."""
+    backend = backend or PAGE_PARSER
+    if backend == "html.parser" or (backend == "lxml" and not HAS_LXML):
+        return _extract_from_soup(BeautifulSoup(html, "html.parser"))
+    if backend == "lxml":
+        return _extract_from_soup(BeautifulSoup(html, "lxml"))
+    parser = _StreamExtractor()
+    parser.feed(html)
+    return parser.finish()
+
+
+# ============================================================================
+# PAGE CACHE (conditional revalidation of index pages across re-crawls)
+# ============================================================================
+
+PAGE_CACHE = cfg("PAGE_CACHE", "true").lower() == "true"
+
+
+class _PageCache:
+    """On-disk cache of crawled pages, one JSON file per normalized URL.
+
+    Each entry keeps the validators the server sent (ETag, Last-Modified),
+    a SHA-256 of the body and the page's PageExtract. Re-crawls send the
+    validators back; a 304 — or a 200 whose body hashes the same — reuses
+    the stored extraction instead of downloading and parsing the page again.
+
+    Lives in <output_dir>/.crawler-cache. Page workers fetch distinct URLs,
+    so the only concurrency concern is torn writes, handled by writing to a
+    temp file and renaming it into place.
+    """
+
+    def __init__(self, root):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, url):
+        return self.root / (hashlib.sha1(url.encode()).hexdigest() + ".json")
+
+    def get(self, url):
+        """Return the cache entry for url, or None."""
+        try:
+            entry = json.loads(self._path(url).read_text())
+        except (OSError, json.JSONDecodeError):
+            return None
+        return entry if entry.get("url") == url else None
+
+    @staticmethod
+    def conditional_headers(entry):
+        headers = {}
+        if entry:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def put(self, url, resp, digest, page):
+        entry = {
+            "url": url,
+            "etag": resp.headers.get("etag", ""),
+            "last_modified": resp.headers.get("last-modified", ""),
+            "digest": digest,
+            "fetched": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "page": page.to_dict(),
+        }
+        path = self._path(url)
+        tmp = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+        try:
+            tmp.write_text(json.dumps(entry))
+            os.replace(tmp, path)
+        except OSError:
+            tmp.unlink(missing_ok=True)
+
+
+# ============================================================================
+# STATE STORE (download history, dedup registry and resume points)
+# ============================================================================
+
+class _StateStore:
+    """The crawl state of one staging dir, in <output_dir>/.crawler-state.db.
+
+    An SQLite database in WAL mode holding one row per record: a downloaded
+    or failed URL, a dedup registry entry, a listing fingerprint, or a
+    resume point. Jobs change their in-memory state and queue the matching
+    put()/drop() here. commit() writes everything queued in one
+    transaction, so a save costs what changed since the last one, not the
+    size of the library, and a crash mid-save leaves the previous commit
+    intact.
+
+    Every commit stamps its rows with the next sequence number. Jobs that
+    share a staging dir pick up each other's rows with changes(), which
+    only reads rows past the highest sequence number it has seen, and only
+    when another connection has committed since the last call.
+
+    A .crawler-state.json left by an older crawler is imported on first
+    open and renamed to .crawler-state.json.migrated. A store isn't
+    thread-safe: jobs call theirs under _STATE_LOCK.
+    """
+
+    # Record kinds, each keyed by URL except the registry ("system/name")
+    # and the listing fingerprints (page URL). Sets store no value; "page"
+    # and "media" index the downloads by source page and Vimm mediaId. The
+    # NAS manifest keeps its own kinds (_NASManifest.KINDS) in the same table.
+    SETS = ("downloaded", "failed", "page", "media")
+    MAPS = ("registry", "fingerprint", "partial")
+    _DROP = object()
+
+    def __init__(self, path, legacy=None):
+        self.path = Path(path)
+        self.legacy = Path(legacy) if legacy else None
+        self._db = None
+        self._pending = {}  # (kind, key) -> JSON text, None, or _DROP
+        self._seen = 0      # highest sequence number read back
+        self._version = None
+        self.migrated = 0   # records imported from the legacy JSON file
+        self.set_aside = False  # an unreadable database was moved aside
+
+    def _conn(self):
+        if self._db is None:
+            try:
+                self._db = self._open()
+            except sqlite3.DatabaseError:
+                # Not a database (or damaged beyond use): keep it for a
+                # look and start over rather than refuse to crawl
+                for suffix in ("", "-wal", "-shm"):
+                    old = self.path.with_name(self.path.name + suffix)
+                    if old.exists():
+                        os.replace(old, old.with_name(old.name + ".corrupt"))
+                self.set_aside = True
+                self._db = self._open()
+            if self.legacy is not None:
+                self._migrate()
+        return self._db
+
+    def _open(self):
+        db = sqlite3.connect(self.path, timeout=30, isolation_level=None,
+                             check_same_thread=False)
+        try:
+            db.execute("PRAGMA journal_mode=WAL")
+            # WAL + NORMAL: a commit survives a crash of the crawler; only
+            # a power cut can lose the last few, never corrupt the file
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute("CREATE TABLE IF NOT EXISTS records ("
+                       "kind TEXT NOT NULL, key TEXT NOT NULL, value TEXT, "
+                       "seq INTEGER NOT NULL, PRIMARY KEY (kind, key)) WITHOUT ROWID")
+            db.execute("CREATE INDEX IF NOT EXISTS records_seq ON records (seq)")
+            db.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+            # Tells this database from one recreated in its place
+            db.execute("INSERT OR IGNORE INTO meta VALUES ('id', ?)",
+                       (str(int.from_bytes(os.urandom(4), "little")),))
+        except sqlite3.DatabaseError:
+            db.close()
+            raise
+        return db
+
+    @contextlib.contextmanager
+    def _transaction(self, db):
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        db.execute("COMMIT")
+
+    def _next_seq(self, db):
+        """Claim the next sequence number. Inside a write transaction."""
+        row = db.execute("SELECT value FROM meta WHERE key = 'seq'").fetchone()
+        seq = int(row[0]) + 1 if row else 1
+        db.execute("INSERT OR REPLACE INTO meta VALUES ('seq', ?)", (str(seq),))
+        return seq
+
+    def _migrate(self):
+        """Import the pre-SQLite JSON state file, once."""
+        legacy, self.legacy = self.legacy, None
+        try:
+            state = json.loads(legacy.read_text())
+        except FileNotFoundError:
+            return
+        except (OSError, json.JSONDecodeError):
+            return  # unreadable: left in place, as the old loader did
+        rows = [("downloaded", url, None) for url in state.get("downloaded_files", [])]
+        rows += [("failed", url, None) for url in state.get("failed_files", [])]
+        for kind, field in (("registry", "file_registry"),
+                            ("fingerprint", "listing_fingerprints"),
+                            ("partial", "partial_downloads")):
+            rows += [(kind, key, json.dumps(value))
+                     for key, value in state.get(field, {}).items()]
+        db = self._db
+        with self._transaction(db):
+            # Another job sharing the staging dir may have got here first
+            if db.execute("SELECT 1 FROM meta WHERE key = 'migrated'").fetchone():
+                return
+            seq = self._next_seq(db)
+            db.executemany("INSERT OR IGNORE INTO records VALUES (?, ?, ?, ?)",
+                           [row + (seq,) for row in rows])
+            db.executemany("INSERT OR REPLACE INTO meta VALUES (?, ?)", [
+                ("migrated", time.strftime("%Y-%m-%d %H:%M:%S")),
+                ("base_url", state.get("base_url", "")),
+                ("last_run", state.get("last_run", "")),
+            ])
+        self.migrated = len(rows)
+        try:
+            os.replace(legacy, legacy.with_name(legacy.name + ".migrated"))
+        except OSError:
+            pass
+
+    def load(self, kinds=None):
+        """Every record of the crawl state's kinds (or of `kinds`), as
+        {kind: {key: value}} (value None for sets)."""
+        db = self._conn()
+        query = "SELECT key, value FROM records WHERE kind = ?"
+        loads = json.loads
+        db.execute("BEGIN")
+        try:
+            state = {kind: dict.fromkeys(key for key, _ in db.execute(query, (kind,)))
+                     for kind in self.SETS if kinds is None or kind in kinds}
+            state.update({kind: {key: loads(value) for key, value in db.execute(query, (kind,))}
+                          for kind in (kinds or self.MAPS) if kind not in self.SETS})
+            row = db.execute("SELECT value FROM meta WHERE key = 'seq'").fetchone()
+            self._seen = int(row[0]) if row else 0
+            self._version = db.execute("PRAGMA data_version").fetchone()[0]
+        finally:
+            db.execute("COMMIT")
+        return state
+
+    def changes(self):
+        """[(kind, key, value)] committed since the last load()/changes()
+        by other jobs (and by this one, since then — merging is idempotent).
+        Free when no other connection has committed."""
+        db = self._conn()
+        version = db.execute("PRAGMA data_version").fetchone()[0]
+        if version == self._version:
+            return []
+        self._version = version
+        kinds = self.SETS + self.MAPS
+        rows = db.execute("SELECT kind, key, value, seq FROM records WHERE seq > ? "
+                          f"AND kind IN ({', '.join('?' * len(kinds))})",
+                          (self._seen, *kinds)).fetchall()
+        changed = []
+        for kind, key, value, seq in rows:
+            self._seen = max(self._seen, seq)
+            changed.append((kind, key, json.loads(value) if value is not None else None))
+        return changed
+
+    def has(self, kind, key):
+        """Whether a record exists, counting queued changes."""
+        value = self._pending.get((kind, key))
+        if value is not None or (kind, key) in self._pending:
+            return value is not self._DROP
+        return self._conn().execute("SELECT 1 FROM records WHERE kind = ? AND key = ?",
+                                    (kind, key)).fetchone() is not None
+
+    def meta(self, key):
+        """A meta value (see commit()), or None."""
+        row = self._conn().execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, key, value):
+        """Write one meta value now, whatever is queued."""
+        db = self._conn()
+        with self._transaction(db):
+            db.execute("INSERT OR REPLACE INTO meta VALUES (?, ?)", (key, value))
+
+    def identity(self):
+        """A number that changes when the database is recreated."""
+        row = self._conn().execute("SELECT value FROM meta WHERE key = 'id'").fetchone()
+        return int(row[0]) if row else 0
+
+    def count(self, kind):
+        return self._conn().execute("SELECT COUNT(*) FROM records WHERE kind = ?",
+                                    (kind,)).fetchone()[0]
+
+    def each_key(self, kind, fn, since=0):
+        """Call fn(key) for every record of `kind` written after sequence
+        number `since`, streaming them from one snapshot. Returns the
+        snapshot's sequence number."""
+        db = self._conn()
+        db.execute("BEGIN")
+        try:
+            row = db.execute("SELECT value FROM meta WHERE key = 'seq'").fetchone()
+            if since:
+                rows = db.execute("SELECT key FROM records WHERE seq > ? AND kind = ?",
+                                  (since, kind))
+            else:
+                rows = db.execute("SELECT key FROM records WHERE kind = ?", (kind,))
+            for key, in rows:
+                fn(key)
+        finally:
+            db.execute("COMMIT")
+        return int(row[0]) if row else 0
+
+    def keys_after(self, kind, after, limit=1000):
+        """Up to `limit` keys of `kind` that sort after `after`, in order."""
+        return [key for key, in self._conn().execute(
+            "SELECT key FROM records WHERE kind = ? AND key > ? ORDER BY key LIMIT ?",
+            (kind, after, limit))]
+
+    def put(self, kind, key, value=None):
+        """Queue an upsert of one record (sets: value None)."""
+        self._pending[(kind, key)] = None if value is None else json.dumps(value)
+
+    def drop(self, kind, key):
+        """Queue the removal of one record."""
+        self._pending[(kind, key)] = self._DROP
+
+    def commit(self, **meta):
+        """Write every queued change in one transaction, plus meta values
+        (e.g. base_url). Nothing queued, nothing written."""
+        if not self._pending:
+            return
+        db = self._conn()
+        pending, self._pending = self._pending, {}
+        puts = [(kind, key, value) for (kind, key), value in pending.items()
+                if value is not self._DROP]
+        drops = [key for key, value in pending.items() if value is self._DROP]
+        meta["last_run"] = time.strftime("%Y-%m-%d %H:%M:%S")
+        try:
+            with self._transaction(db):
+                seq = self._next_seq(db)
+                db.executemany("INSERT OR REPLACE INTO records VALUES (?, ?, ?, ?)",
+                               [row + (seq,) for row in puts])
+                db.executemany("DELETE FROM records WHERE kind = ? AND key = ?", drops)
+                db.executemany("INSERT OR REPLACE INTO meta VALUES (?, ?)", meta.items())
+        except sqlite3.Error:
+            # Keep the changes for the next save; newer ones win
+            pending.update(self._pending)
+            self._pending = pending
+            raise
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+
+def _bloom_mask(i):
+    """7 bits of a 64-bit word, fixed for i (so a filter file reads the
+    same in every process)."""
+    mask = 0
+    for b in hashlib.blake2b(i.to_bytes(2, "little"), digest_size=32).digest():
+        if bin(mask).count("1") == 7:
+            break
+        mask |= 1 << (b & 63)
+    return mask
+
+
+# _URLHistory picks one of these per URL rather than building a mask per lookup
+_BLOOM_MASKS = [_bloom_mask(i) for i in range(4096)]
+
+
+class _URLHistory:
+    """The downloaded (or failed) URLs of a staging dir, as a set that
+    stays small however many URLs it holds.
+
+    The exact set is the state store's records of that kind. In front of
+    it is a Bloom filter in <output_dir>/.crawler-state.<kind>.bloom,
+    memory-mapped, 1.5-3 MB per million URLs. The filter is blocked: all of
+    a URL's bits fall in one 64-bit word, so a lookup is one hash and one
+    read. Opening it only reads the rows written since it was last brought
+    up to date. A URL the filter has never seen is answered without
+    touching the database; the rest, plus about 1% false positives, are
+    looked up there. URLs added or discarded this session are also kept in
+    memory, which covers changes the job hasn't committed yet.
+
+    Supports what the crawler does with its URL sets: in, add(), discard(),
+    len() and iteration. len() is the records at open plus this session's
+    additions.
+    """
+
+    _MAGIC = b"DDBLOOM1"
+    # magic, bits per URL, database identity, filter bits, items, sequence number synced
+    _HEADER = struct.Struct("<8sIIQQQ")
+    _ITEMS_AT = 24
+    _OFFSET = 64
+    _BITS_PER_ITEM = 12  # ~1% false positives with 7 bits in a 64-bit block
+    _MIN_ITEMS = 1 << 16
+
+    def __init__(self, db_path, kind):
+        self.kind = kind
+        self.path = Path(db_path).with_name(f".crawler-state.{kind}.bloom")
+        self.store = _StateStore(db_path)
+        self._lock = threading.RLock()
+        self._recent = set()   # added this session
+        self._dropped = set()  # discarded this session
+        with self._lock:
+            self._count = self.store.count(kind)
+            self._db_id = self.store.identity()
+            # (mmap, its words past the header), swapped whole on a rebuild
+            self._filter = None
+            self._items = 0
+            self._open()
+
+    @staticmethod
+    def _map(f):
+        bits = mmap.mmap(f.fileno(), 0)
+        # Native byte order: the file stays on the machine that wrote it
+        return bits, memoryview(bits)[_URLHistory._OFFSET:].cast("Q")
+
+    def _maybe(self, url):
+        words = self._filter[1]
+        d = hashlib.blake2b(url.encode(), digest_size=10).digest()
+        mask = _BLOOM_MASKS[(d[8] << 4 | d[9]) & 0xFFF]
+        return words[int.from_bytes(d[:8], "little") % len(words)] & mask == mask
+
+    def _set(self, url, filt):
+        """Set url's bits in filt. Counts it if any bit was new."""
+        bits, words = filt
+        d = hashlib.blake2b(url.encode(), digest_size=10).digest()
+        mask = _BLOOM_MASKS[(d[8] << 4 | d[9]) & 0xFFF]
+        i = int.from_bytes(d[:8], "little") % len(words)
+        if words[i] & mask != mask:
+            words[i] |= mask
+            self._items += 1
+            struct.pack_into("<Q", bits, self._ITEMS_AT, self._items)
+
+    def _synced(self, filt, seq):
+        """Stamp filt as holding every record up to sequence number seq."""
+        bits, words = filt
+        bits.flush()  # the bits are on disk before the stamp that vouches for them
+        self._HEADER.pack_into(bits, 0, self._MAGIC, self._BITS_PER_ITEM, self._db_id,
+                               len(words) * 64, self._items, seq)
+        bits.flush()
+
+    def _open(self):
+        try:
+            with open(self.path, "r+b") as f:
+                filt = self._map(f)
+            magic, per_item, db_id, nbits, items, synced = self._HEADER.unpack_from(filt[0])
+        except (OSError, ValueError, TypeError, struct.error):
+            filt = None  # missing, empty or truncated
+        if (filt is not None and magic == self._MAGIC and per_item == self._BITS_PER_ITEM
+                and db_id == self._db_id and len(filt[1]) * 64 == nbits):
+            self._items = items
+            seq = self.store.each_key(self.kind, lambda url: self._set(url, filt), since=synced)
+            if seq >= synced and self._items <= nbits // self._BITS_PER_ITEM:
+                self._filter = filt
+                self._synced(filt, seq)
+                return
+        self._rebuild()
+
+    def _rebuild(self):
+        """Build a filter with room for twice the current URLs from the
+        store, then swap it in. Lookups use the old one meanwhile."""
+        nbits = max(self._MIN_ITEMS, 2 * max(self._count, self._items)) * self._BITS_PER_ITEM
+        nbits += -nbits % 64  # whole words
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp, "w+b") as f:
+            f.truncate(self._OFFSET + nbits // 8)
+            filt = self._map(f)
+        self._items = 0
+        seq = self.store.each_key(self.kind, lambda url: self._set(url, filt))
+        for url in self._recent:
+            self._set(url, filt)
+        self._synced(filt, seq)
+        os.replace(tmp, self.path)
+        self._filter = filt
+
+    def __contains__(self, url):
+        if url in self._recent:
+            return True
+        if url in self._dropped or not self._maybe(url):
+            return False
+        with self._lock:
+            return self.store.has(self.kind, url)
+
+    def __len__(self):
+        return self._count
+
+    def __iter__(self):
+        recent = set(self._recent)
+        yield from recent
+        after = ""
+        while True:
+            with self._lock:
+                keys = self.store.keys_after(self.kind, after)
+            for url in keys:
+                if url not in recent and url not in self._dropped:
+                    yield url
+            if len(keys) < 1000:
+                return
+            after = keys[-1]
+
+    def add(self, url):
+        with self._lock:
+            if url in self._recent:
+                return
+            if url not in self:
+                self._count += 1
+            self._dropped.discard(url)
+            self._recent.add(url)
+            self._set(url, self._filter)
+            if self._items > len(self._filter[1]) * 64 // self._BITS_PER_ITEM:
+                self._rebuild()
+
+    def discard(self, url):
+        with self._lock:
+            if url in self:
+                self._count -= 1
+                self._recent.discard(url)
+                self._dropped.add(url)
+
+    def close(self):
+        with self._lock:
+            self.store.close()
+
+
+# How often the NAS manifest re-lists every file instead of only the
+# directories whose mtime moved, to catch files replaced in place (seconds)
+_NAS_FULL_LIST = 24 * 3600
+
+
+def _nas_run(command, timeout=120):
+    """Run a shell command on the NAS over SSH. Returns its stdout, or None
+    if it couldn't run or failed without output."""
+    try:
+        result = subprocess.run(
+            ["ssh", "-i", os.path.expanduser("~/.ssh/id_ed25519"),
+             "-o", "ConnectTimeout=5", "-o", "BatchMode=yes",
+             "-o", "StrictHostKeyChecking=accept-new",
+             f"{NAS_USER}@{NAS_HOST}", command],
+            capture_output=True, text=True, timeout=timeout,
+        )
+    except (subprocess.TimeoutExpired, OSError):
+        return None
+    # find exits 1 after an unreadable directory but still lists the rest
+    if result.returncode != 0 and not result.stdout:
+        return None
+    return result.stdout
+
+
+class _NASManifest:
+    """What the NAS ROM tree (NAS_EXPORT/NAS_ROM_SUBDIR) holds, so a job can
+    tell a file is already there without asking the NAS each time.
+
+    Files are {system: {name: {"size": bytes}}}, plus "sha256" for files
+    this crawler pushed. The manifest lives in the staging dir's state
+    store and is refreshed at most every NAS_MANIFEST_TTL seconds, on the
+    next lookup: one SSH round trip lists every directory with its mtime,
+    and a second lists the files of only the directories whose mtime moved
+    (a file was added, removed or renamed in them). Without a cached
+    manifest, and once a day, every file is listed instead. When the NAS
+    can't be reached the cached manifest is used as it is.
+
+    Shared by every job through the job manager. Needs GNU find on the NAS.
+    """
+
+    KINDS = ("nas_dir", "nas_file")
+
+    def __init__(self, db_path, ttl=NAS_MANIFEST_TTL):
+        self.store = _StateStore(db_path)
+        self.ttl = ttl
+        self._dirs = None    # {dir: mtime}; None until loaded from the store
+        self._files = {}     # {dir: {name: entry}}
+        self._checked = None  # monotonic time of the last refresh attempt
+        self._full_at = None  # ... and of the last full listing
+        self._lock = threading.Lock()
+
+    def get(self, system, name, log=None):
+        """The entry for system/name, or None if it isn't on the NAS."""
+        with self._lock:
+            if self._checked is None or time.monotonic() - self._checked >= self.ttl:
+                self._checked = time.monotonic()
+                try:
+                    self._refresh(log)
+                except sqlite3.Error as e:
+                    if log:
+                        log(f"  NAS manifest not saved: {e}")
+            return self._files.get(system, {}).get(name)
+
+    def note(self, system, name, size, sha256=None):
+        """Record a file just pushed to the NAS."""
+        entry = {"size": size}
+        if sha256:
+            entry["sha256"] = sha256
+        with self._lock:
+            self._files.setdefault(system, {})[name] = entry
+            self.store.put("nas_file", f"{system}/{name}", entry)
+            try:
+                self.store.commit()
+            except sqlite3.Error:
+                pass  # stays queued for the next commit
+
+    def _refresh(self, log):
+        if self._dirs is None:
+            state = self.store.load(self.KINDS)
+            self._dirs = state["nas_dir"]
+            for key, entry in state["nas_file"].items():
+                system, _, name = key.rpartition("/")
+                self._files.setdefault(system, {})[name] = entry
+            if self._dirs:
+                self._full_at = time.monotonic()
+
+        root = shlex.quote(f"{NAS_EXPORT}/{NAS_ROM_SUBDIR}")
+        listing = _nas_run(f"find {root} -type d -printf '%T@\\t%P\\n'")
+        if listing is None:
+            return
+        dirs = {}
+        for line in listing.splitlines():
+            mtime, _, path = line.partition("\t")
+            try:
+                dirs[path] = float(mtime)
+            except ValueError:
+                continue
+        if not dirs:
+            return
+
+        full = self._full_at is None or time.monotonic() - self._full_at >= _NAS_FULL_LIST
+        changed = [d for d, mtime in dirs.items() if full or self._dirs.get(d) != mtime]
+        if changed:
+            # A long list of directories is cheaper listed whole
+            if full or len(changed) > 100:
+                scope, changed = ".", list(dirs)
+            else:
+                scope = " ".join(shlex.quote(f"./{d}" if d else ".")
+                                 for d in changed) + " -maxdepth 1"
+            listing = _nas_run(f"cd {root} && find {scope} -type f -printf '%h\\t%f\\t%s\\n'")
+            if listing is None:
+                return
+            found = {d: {} for d in changed}
+            for line in listing.splitlines():
+                parts = line.split("\t")
+                if len(parts) != 3 or not parts[2].isdigit():
+                    continue
+                parent, name, size = parts
+                parent = "" if parent == "." else parent.removeprefix("./")
+                found.setdefault(parent, {})[name] = int(size)
+            if full:
+                self._full_at = time.monotonic()
+        else:
+            found = {}
+        for d in set(self._files) - set(dirs):
+            found[d] = {}  # directory gone from the NAS
+
+        added = removed = 0
+        for d, names in found.items():
+            old = self._files.pop(d, {})
+            new = {}
+            for name, size in names.items():
+                entry = old.get(name)
+                if entry is None or entry.get("size") != size:
+                    entry = {"size": size}
+                    self.store.put("nas_file", f"{d}/{name}", entry)
+                    added += 1
+                new[name] = entry
+            for name in old.keys() - names.keys():
+                self.store.drop("nas_file", f"{d}/{name}")
+                removed += 1
+            if new:
+                self._files[d] = new
+        for d in self._dirs.keys() - dirs.keys():
+            self.store.drop("nas_dir", d)
+        for d in changed:
+            self.store.put("nas_dir", d, dirs[d])
+        self._dirs = dirs
+        self.store.commit()
+        if log and (added or removed):
+            total = sum(len(names) for names in self._files.values())
+            log(f"  NAS manifest: {total} files ({added} new or changed, {removed} gone)")
+
+
+# ============================================================================
+# BROWSER POOL (JS rendering)
+# ============================================================================
+
+# Upper bound on how long a JS page may take to become ready (seconds)
+JS_RENDER_TIMEOUT = float(cfg("JS_RENDER_TIMEOUT", "15"))
+# Optional CSS selector that marks a page as rendered (e.g. "#game-list a").
+# Default: ready once the page has more than two links or any form.
+JS_READY_SELECTOR = cfg("JS_READY_SELECTOR", "")
+
+# Same threshold the static fetch uses to decide a page is JS-rendered
+_JS_READY_CHECK = ("() => document.querySelectorAll('a[href]').length > 2"
+                   " || document.forms.length > 0")
+
+
+class _BrowserPool:
+    """A pool of headless Chromium pages for rendering JS pages in parallel.
+
+    Runs the async Playwright API on its own event-loop thread, so render()
+    can be called from any page worker — the sync API is pinned to the
+    thread that started it, which is what used to serialize every render
+    on the crawl thread. Each slot gets its own browser context, created
+    on first use. A render that fails or crashes throws its context away
+    and the slot gets a fresh one next time; only a dead browser process
+    is relaunched.
+
+    A page counts as rendered once the ready selector matches or the
+    network goes idle, whichever comes first, instead of a fixed sleep.
+    """
+
+    def __init__(self, size, stealth_js, user_agent, log,
+                 ready_selector=JS_READY_SELECTOR, timeout=JS_RENDER_TIMEOUT):
+        self.size = max(1, size)
+        self._stealth_js = stealth_js
+        self._user_agent = user_agent
+        self._log = log
+        self._ready_selector = ready_selector
+        self._timeout_ms = int(timeout * 1000)
+        self._pw = None
+        self._browser = None
+        self._free = None  # asyncio.Queue of idle slots (a page, or None)
+        self._lock = None
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+        self._thread.start()
+
+    def render(self, url):
+        """Render url and return its HTML, or None on errors. Any thread."""
+        return asyncio.run_coroutine_threadsafe(self._render(url), self._loop).result()
+
+    def render_async(self, url):
+        """render() for callers on another event loop: returns an awaitable."""
+        return asyncio.wrap_future(
+            asyncio.run_coroutine_threadsafe(self._render(url), self._loop))
+
+    def close(self):
+        try:
+            asyncio.run_coroutine_threadsafe(self._shutdown(), self._loop).result(timeout=15)
+        except Exception:
+            pass
+        self._loop.call_soon_threadsafe(self._loop.stop)
+
+    async def _ensure_browser(self):
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if self._browser is not None and self._browser.is_connected():
+                return
+            if self._browser is not None:
+                self._log("  Browser process died, reinitializing...")
+            if self._pw is None:
+                self._pw = await async_playwright().start()
+            self._browser = await self._pw.chromium.launch(
+                headless=True,
+                args=[
+                    "--disable-blink-features=AutomationControlled",
+                    "--no-sandbox",
+                ],
+            )
+            # Fresh slots — pages from a dead browser go back to the old queue
+            self._free = asyncio.Queue()
+            for _ in range(self.size):
+                self._free.put_nowait(None)
+
+    async def _new_page(self):
+        context = await self._browser.new_context(user_agent=self._user_agent)
+        await context.add_init_script(self._stealth_js)
+        return await context.new_page()
+
+    async def _wait_ready(self, page):
+        if self._ready_selector:
+            ready = page.wait_for_selector(self._ready_selector, timeout=self._timeout_ms)
+        else:
+            ready = page.wait_for_function(_JS_READY_CHECK, timeout=self._timeout_ms)
+        waits = [asyncio.ensure_future(ready),
+                 asyncio.ensure_future(page.wait_for_load_state(
+                     "networkidle", timeout=self._timeout_ms))]
+        done, pending = await asyncio.wait(waits, return_when=asyncio.FIRST_COMPLETED)
+        for w in pending:
+            w.cancel()
+        await asyncio.gather(*waits, return_exceptions=True)
+        # A timeout just means "render what's there", as the old fixed wait did
+
+    async def _render(self, url):
+        await self._ensure_browser()
+        free = self._free
+        page = await free.get()
+        try:
+            if page is None or page.is_closed():
+                page = await self._new_page()
+            await page.goto(url, timeout=60000, wait_until="domcontentloaded")
+            await self._wait_ready(page)
+            return await page.content()
+        except Exception as e:
+            msg = str(e)
+            if len(msg) > 120:
+                msg = msg[:120] + "..."
+            self._log(f"  JS render error: {msg}")
+            # Recycle the context rather than reuse a crashed or wedged page
+            if page is not None:
+                try:
+                    await page.context.close()
+                except Exception:
+                    pass
+            page = None
+            return None
+        finally:
+            free.put_nowait(page)
+
+    async def _shutdown(self):
+        try:
+            if self._browser:
+                await self._browser.close()
+        except Exception:
+            pass
+        try:
+            if self._pw:
+                await self._pw.stop()
+        except Exception:
+            pass
+        self._browser = None
+        self._pw = None
+
+
+# ============================================================================
+# CRAWLER ENGINE
+# ============================================================================
+
+DOWNLOAD_EXTENSIONS = {
+    ".zip", ".7z", ".rar", ".gz", ".tar", ".bz2", ".xz",
+    ".iso", ".bin", ".cue", ".chd", ".img", ".mdf", ".mds",
+    ".nrg", ".ccd", ".sub", ".ecm", ".pbp", ".cso",
+    ".nes", ".unf", ".sfc", ".smc", ".gb", ".gbc", ".gba",
+    ".nds", ".3ds", ".cia", ".cci", ".n64", ".z64", ".v64",
+    ".gcm", ".gcz", ".rvz", ".wbfs", ".wad", ".nsp", ".xci",
+    ".md", ".smd", ".gen", ".gg", ".sms", ".32x",
+    ".cdi", ".gdi", ".a26", ".a52", ".a78", ".lnx", ".jag",
+    ".pce", ".ngp", ".ngc", ".ws", ".wsc", ".vec", ".col", ".sg",
+    ".psf", ".minipsf", ".scummvm",
+}
+
+PAGE_EXTENSIONS = {"", ".html", ".htm", ".php", ".asp", ".aspx", ".jsp", "/"}
+
+# Extension -> system slug mapping (for auto-detect)
+EXT_TO_SYSTEM = {
+    ".nes": "nes", ".unf": "nes", ".unif": "nes",
+    ".sfc": "snes", ".smc": "snes",
+    ".gb": "gb", ".gbc": "gbc", ".gba": "gba",
+    ".nds": "nds", ".3ds": "3ds", ".cia": "3ds", ".cci": "3ds",
+    ".n64": "n64", ".z64": "n64", ".v64": "n64",
+    ".gcm": "gc", ".gcz": "gc", ".rvz": "gc",
+    ".wbfs": "wii", ".wad": "wii",
+    ".nsp": "switch", ".xci": "switch",
+    ".pbp": "psx", ".ecm": "psx",
+    ".cso": "psp",
+    ".smd": "genesis", ".gen": "genesis",
+    ".gg": "gamegear", ".sms": "mastersystem",
+    ".32x": "sega32x",
+    ".cdi": "dreamcast", ".gdi": "dreamcast",
+    ".a26": "atari2600", ".a52": "atari5200", ".a78": "atari7800",
+    ".lnx": "atarilynx", ".lyx": "atarilynx", ".jag": "atarijaguar",
+    ".pce": "pcengine",
+    ".ngp": "ngp", ".ngc": "ngpc",
+    ".ws": "wonderswan", ".wsc": "wonderswancolor",
+    ".vec": "vectrex", ".col": "coleco",
+}
+
+# Now compute cartridge extensions (ROM files that should be in .zip, not disc images)
+CARTRIDGE_EXTENSIONS = set(EXT_TO_SYSTEM.keys()) - DISC_IMAGE_EXTENSIONS
+
+# URL path keywords -> system slug (for detecting system from directory structure)
+# Order matters — more specific patterns first to avoid false matches
+PATH_KEYWORDS = [
+    ("playstation-2", "ps2"), ("playstation2", "ps2"), ("ps2", "ps2"),
+    ("playstation-3", "ps3"), ("playstation3", "ps3"), ("ps3", "ps3"),
+    ("playstation", "psx"), ("psx", "psx"), ("ps1", "psx"),
+    ("psp", "psp"), ("vita", "psvita"),
+    ("super-nintendo", "snes"), ("super_nintendo", "snes"), ("snes", "snes"),
+    ("super-famicom", "snes"), ("super_famicom", "snes"),
+    ("nintendo-64", "n64"), ("nintendo64", "n64"), ("n64", "n64"),
+    ("nintendo-ds", "nds"), ("nds", "nds"), ("ds", "nds"),
+    ("nintendo-3ds", "3ds"), ("3ds", "3ds"),
+    ("gamecube", "gc"), ("game-cube", "gc"), ("game_cube", "gc"), ("ngc", "gc"),
+    ("game-boy-advance", "gba"), ("gameboy-advance", "gba"),
+    ("game_boy_advance", "gba"), ("gba", "gba"),
+    ("game-boy-color", "gbc"), ("gameboy-color", "gbc"),
+    ("game_boy_color", "gbc"), ("gbc", "gbc"),
+    ("game-boy", "gb"), ("gameboy", "gb"), ("game_boy", "gb"),
+    ("nes", "nes"), ("nintendo-entertainment", "nes"), ("famicom", "nes"),
+    ("wii-u", "wiiu"), ("wiiu", "wiiu"),
+    ("wii", "wii"),
+    ("switch", "switch"), ("nsp", "switch"),
+    ("mega-drive", "genesis"), ("megadrive", "genesis"), ("genesis", "genesis"),
+    ("sega-cd", "segacd"), ("segacd", "segacd"), ("mega-cd", "segacd"),
+    ("sega-saturn", "saturn"), ("saturn", "saturn"),
+    ("dreamcast", "dreamcast"), ("dream-cast", "dreamcast"),
+    ("master-system", "mastersystem"), ("mastersystem", "mastersystem"),
+    ("game-gear", "gamegear"), ("gamegear", "gamegear"),
+    ("sega-32x", "sega32x"), ("32x", "sega32x"),
+    ("arcade", "arcade"), ("mame", "arcade"), ("neo-geo", "arcade"), ("neogeo", "arcade"),
+    ("pc-engine", "pcengine"), ("pcengine", "pcengine"),
+    ("turbografx", "pcengine"), ("tg16", "pcengine"), ("tg-16", "pcengine"),
+    ("atari-2600", "atari2600"), ("atari2600", "atari2600"),
+    ("atari-5200", "atari5200"), ("atari5200", "atari5200"),
+    ("atari-7800", "atari7800"), ("atari7800", "atari7800"),
+    ("atari-lynx", "atarilynx"), ("lynx", "atarilynx"),
+    ("atari-jaguar", "atarijaguar"), ("jaguar", "atarijaguar"),
+    ("xbox", "xbox"),
+    ("scummvm", "scummvm"),
+    ("wonderswan-color", "wonderswancolor"), ("wonderswancolor", "wonderswancolor"),
+    ("wonderswan", "wonderswan"),
+    ("neo-geo-pocket", "ngp"), ("neogeopocket", "ngp"),
+    ("vectrex", "vectrex"), ("coleco", "coleco"),
+]
+
+# All system choices for the dropdown
+SYSTEM_CHOICES = [
+    ("auto", "Auto-detect from file type"),
+    ("psx", "PlayStation (PSX)"),
+    ("ps2", "PlayStation 2"),
+    ("ps3", "PlayStation 3"),
+    ("psp", "PSP"),
+    ("nes", "NES"),
+    ("snes", "SNES"),
+    ("n64", "Nintendo 64"),
+    ("gb", "Game Boy"),
+    ("gbc", "Game Boy Color"),
+    ("gba", "Game Boy Advance"),
+    ("nds", "Nintendo DS"),
+    ("3ds", "Nintendo 3DS"),
+    ("gc", "GameCube"),
+    ("wii", "Wii"),
+    ("switch", "Nintendo Switch"),
+    ("genesis", "Sega Genesis"),
+    ("saturn", "Sega Saturn"),
+    ("dreamcast", "Dreamcast"),
+    ("segacd", "Sega CD"),
+    ("mastersystem", "Master System"),
+    ("gamegear", "Game Gear"),
+    ("arcade", "Arcade / MAME"),
+    ("pcengine", "PC Engine / TG16"),
+    ("atari2600", "Atari 2600"),
+    ("atari7800", "Atari 7800"),
+    ("atarilynx", "Atari Lynx"),
+    ("atarijaguar", "Atari Jaguar"),
+    ("3do", "3DO"),
+    ("cdi", "Philips CD-i"),
+    ("xbox", "Xbox"),
+    ("scummvm", "ScummVM"),
+    ("other", "Other / Unsorted"),
+]
+
+# Minimum spacing between page fetches to the same host (seconds)
+_PAGE_INTERVAL = 0.3
+
+# Rate-limit handling: give up on a request after this many 429/503 retries,
+# and never back off (or honor a Retry-After) longer than _MAX_BACKOFF seconds
+_RETRY_LIMIT = 4
+_MAX_BACKOFF = 300.0
+
+
+def _retry_after_seconds(value):
+    """Parse a Retry-After header (delta-seconds or HTTP-date), or None."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return min(float(value), _MAX_BACKOFF)
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return min(max(0.0, when.timestamp() - time.time()), _MAX_BACKOFF)
+
+
+def _segment_ranges(headers, total, segments):
+    """Split a download of `total` bytes into inclusive (start, end) ranges.
+
+    Returns None — stream it in one piece — unless the response advertises
+    byte ranges, the file is at least DOWNLOAD_SEGMENT_MIN_MB, and more than
+    one segment is allowed. Segments are never smaller than 1 MB.
+    """
+    if (headers.get("accept-ranges", "").lower() != "bytes"
+            or total < max(1, DOWNLOAD_SEGMENT_MIN_MB) * 1024 * 1024):
+        return None
+    segments = min(segments, total // (1024 * 1024))
+    if segments < 2:
+        return None
+    size = -(-total // segments)
+    return [(start, min(total, start + size) - 1) for start in range(0, total, size)]
+
+
+def _if_range(headers):
+    """Validator that pins Range requests to the entity headers came from.
+    If-Range only accepts a strong ETag, so weak ones fall back to
+    Last-Modified."""
+    etag = headers.get("etag", "")
+    if etag and not etag.startswith("W/"):
+        return etag
+    return headers.get("last-modified")
+
+
+def _content_range_matches(value, start, end, total):
+    """True if a Content-Range header is exactly bytes start-end/total."""
+    m = re.match(r"\s*bytes\s+(\d+)-(\d+)/(\d+)", value or "")
+    return bool(m) and tuple(map(int, m.groups())) == (start, end, total)
+
+
+# Seconds between saves of an in-progress download's resume point
+_PARTIAL_CHECKPOINT = 30.0
+
+# Mirror failover: a source's speed is judged over windows of this many
+# seconds; one found slow is avoided for _MIRROR_AVOID seconds, and a host
+# whose throttle holds requests back longer than _MIRROR_BLOCKED (it is
+# backing off a 429/503) isn't picked at all
+_MIRROR_WINDOW = 15.0
+_MIRROR_AVOID = 600.0
+_MIRROR_BLOCKED = 30.0
+
+
+def _partial_record(path, headers, total):
+    """Resume record for a `total`-byte download into path (relative to the
+    output dir): its validators plus the byte ranges still to fetch.
+
+    None when the download can't be resumed safely — unknown length, or a
+    Content-Encoding that makes wire offsets differ from file offsets.
+    """
+    if total <= 0 or headers.get("content-encoding", "identity").lower() != "identity":
+        return None
+    return {"path": path, "total": total, "etag": headers.get("etag"),
+            "last_modified": headers.get("last-modified"),
+            "ranges": [[0, total - 1]]}
+
+
+def _record_validator(record):
+    return _if_range({"etag": record.get("etag") or "",
+                      "last-modified": record.get("last_modified")})
+
+
+def _resume_headers(record):
+    """Range/If-Range headers asking for the first range a partial still needs."""
+    start, end = record["ranges"][0]
+    headers = {"Range": f"bytes={start}-{end}"}
+    validator = _record_validator(record)
+    if validator:
+        headers["If-Range"] = validator
+    return headers
+
+
+def _switch_record(record, url, source):
+    """Point url's resume record at another source of the same file. The old
+    host's validators mean nothing to the new one, so only the total in its
+    Content-Range ties the two together (see _resume_accepted). They are
+    kept by source, so going back to one (say after a mirror couldn't
+    resume) sends its If-Range again."""
+    old = record.get("source", url)
+    if old == source:
+        return
+    kept = record.setdefault("validators", {})
+    if record.get("etag") or record.get("last_modified"):
+        kept[old] = [record.get("etag"), record.get("last_modified")]
+    etag, last_modified = kept.pop(source, (None, None))
+    record.update(source=source, etag=etag, last_modified=last_modified)
+
+
+def _resume_accepted(status, headers, record):
+    """True if a response continues a partial download: a 206 for its first
+    pending range of the same-length resource, with the same validators
+    when the server sends them. Anything else means start over."""
+    start, end = record["ranges"][0]
+    if status != 206 or not _content_range_matches(
+            headers.get("content-range"), start, end, record["total"]):
+        return False
+    for header, key in (("etag", "etag"), ("last-modified", "last_modified")):
+        value = headers.get(header)
+        if value and record.get(key) and value != record[key]:
+            return False
+    return True
+
+
+# Digests recorded for every file: sha256 keys the dedup registry, and
+# crc32/md5/sha1 are what No-Intro/Redump DATs list. _MultiHasher adds the
+# "head" signature content dedup matches early (see _HeadWatch)
+HASH_ALGORITHMS = ("sha256", "crc32", "md5", "sha1")
+
+
+class _MultiHasher:
+    """All HASH_ALGORITHMS digests of a byte stream, fed chunk by chunk as
+    it's written, so nobody has to read the file back to hash it.
+
+    "head" is the SHA-256 of the first DEDUP_HEAD_KB only. With the size,
+    it's the signature _HeadWatch matches before the rest has arrived.
+    """
+
+    def __init__(self):
+        self._digests = [hashlib.sha256(), hashlib.md5(), hashlib.sha1()]
+        self._crc = 0
+        self._head = hashlib.sha256()
+        self._head_len = DEDUP_HEAD_KB * 1024
+        self.size = 0  # bytes hashed so far
+
+    def update(self, data):
+        for h in self._digests:
+            h.update(data)
+        if self.size < self._head_len:
+            self._head.update(data[:self._head_len - self.size])
+        self._crc = zlib.crc32(data, self._crc)
+        self.size += len(data)
+
+    def update_file(self, path, start=0, end=None, chunk_size=1024 * 256):
+        """Hash bytes [start, end) of path — data that reached the disk
+        without passing through update()."""
+        with open(path, "rb") as f:
+            f.seek(start)
+            remaining = (end - start) if end is not None else None
+            while remaining is None or remaining > 0:
+                chunk = f.read(chunk_size if remaining is None
+                               else min(chunk_size, remaining))
+                if not chunk:
+                    break
+                self.update(chunk)
+                if remaining is not None:
+                    remaining -= len(chunk)
+
+    def hexdigests(self):
+        sha256, md5, sha1 = (h.hexdigest() for h in self._digests)
+        digests = {"sha256": sha256, "crc32": f"{self._crc:08x}", "md5": md5, "sha1": sha1}
+        if self._head_len:
+            digests["head"] = self.head()
+        return digests
+
+    def head(self):
+        """SHA-256 of the first DEDUP_HEAD_KB hashed (all of it, if less)."""
+        return self._head.hexdigest()
+
+    @classmethod
+    def of_file(cls, path):
+        hasher = cls()
+        hasher.update_file(path)
+        return hasher.hexdigests()
+
+
+class _HashingWriter:
+    """Write-only file wrapper that hashes everything written through it.
+
+    It deliberately can't seek or tell, so zipfile writes it front to back
+    (sizes go in data descriptors instead of being patched into the local
+    headers afterwards) and the hash matches the bytes on disk.
+    """
+
+    def __init__(self, f, hasher):
+        self._f = f
+        self.hasher = hasher
+
+    def write(self, data):
+        self.hasher.update(data)
+        return self._f.write(data)
+
+    def flush(self):
+        self._f.flush()
+
+
+def _archive_members(filepath):
+    """Files inside a .7z or .rar, read from its headers without extracting:
+    [{"name": path in archive, "size": bytes, "date_time": (Y, M, D, h, m, s),
+      "crc": CRC32 or None}]."""
+    if filepath.suffix.lower() == ".7z":
+        with py7zr.SevenZipFile(filepath, "r") as sz:
+            return [{"name": f.filename, "size": f.uncompressed,
+                     "date_time": f.creationtime and f.creationtime.timetuple()[:6],
+                     "crc": f.crc32}
+                    for f in sz.list() if not f.is_directory]
+    with rarfile.RarFile(filepath, "r") as rf:
+        return [{"name": i.filename, "size": i.file_size, "date_time": i.date_time,
+                 "crc": i.CRC}
+                for i in rf.infolist() if not i.is_dir()]
+
+
+class _ZipEntryWriter:
+    """The file object py7zr decompresses one 7z member into (its Py7zIO
+    protocol), writing straight into an open zip entry instead of a file."""
+
+    def __init__(self, entry):
+        self._entry = entry
+        self._size = 0
+
+    def write(self, data):
+        self._entry.write(data)
+        self._size += len(data)
+        return len(data)
+
+    def read(self, size=None):
+        return b""
+
+    def seek(self, offset, whence=0):
+        # py7zr rewinds finished members so they can be read back; a zip
+        # entry can't rewind, and nothing reads it
+        return self._size
+
+    def seekable(self):
+        return False
+
+    def flush(self):
+        pass
+
+    def size(self):
+        return self._size
+
+    def close(self):
+        # Newer py7zr calls this when the member is complete; older ones
+        # don't, and the repacker closes the entry instead
+        self._entry.close()
+
+
+class _ZipRepacker:
+    """py7zr writer factory that repacks a .7z into a zip as it decompresses.
+
+    Each member goes into its own entry, flattened to its file name like a
+    repack from an extraction directory would be. The archive must be
+    opened from a file object so py7zr decompresses one member at a time:
+    create() finishes the previous entry (if py7zr didn't already), and
+    finish() the last one.
+    """
+
+    def __init__(self, zf, members):
+        self._zf = zf
+        self._members = {Path(m["name"]).name: m for m in members}
+        self._entry = None
+
+    def create(self, filename):
+        self.finish()
+        self._entry = _open_zip_entry(self._zf, self._members.get(Path(filename).name)
+                                      or {"name": filename})
+        return _ZipEntryWriter(self._entry)
+
+    def finish(self):
+        if self._entry is not None:
+            self._entry.close()
+            self._entry = None
+
+
+def _open_zip_entry(zf, member):
+    """Open a deflate-9 zip entry for writing one archive member."""
+    # Zip can't store dates before 1980
+    date_time = max(tuple(member.get("date_time") or time.localtime()[:6]),
+                    (1980, 1, 1, 0, 0, 0))
+    info = zipfile.ZipInfo(Path(member["name"]).name, date_time)
+    info.compress_type = zipfile.ZIP_DEFLATED
+    info._compresslevel = 9
+    info.external_attr = 0o644 << 16
+    size = member.get("size")
+    if size:
+        info.file_size = size  # decides up front whether the entry needs zip64
+    return zf.open(info, "w", force_zip64=size is None)
+
+
+class _RateLimited(Exception):
+    """A server answered 429/503. Deliberately not a RequestException, so
+    the generic fetch error handling doesn't swallow it."""
+
+    def __init__(self, status, retry_after=None):
+        super().__init__(f"HTTP {status}")
+        self.status = status
+        self.retry_after = _retry_after_seconds(retry_after)
+
+
+class _HostThrottle:
+    """Per-host token buckets that adapt to how the host is coping.
+
+    Every host starts at one request per `interval` seconds (burst of one).
+    reserve() takes a token and returns how long the caller must wait for
+    it, so reservations queue up fairly without anyone holding a lock while
+    they sleep. A 429/503 halves that host's rate and blocks it until the
+    server's Retry-After (or an exponential backoff) has passed; every
+    `recover_after` successes in a row win back half of the gap to the
+    configured rate. Hosts are independent — a throttled www.example.com
+    doesn't slow down dl.example.com.
+    """
+
+    def __init__(self, interval, recover_after=5):
+        self.interval = max(0.0, interval)
+        self.recover_after = recover_after
+        self._hosts = {}  # host -> {interval, tokens, last, blocked_until, streak, strikes}
+        self._lock = threading.Lock()
+
+    def _host(self, url):
+        host = urllib.parse.urlparse(url).netloc if "://" in url else url
+        h = self._hosts.get(host)
+        if h is None:
+            h = self._hosts[host] = {"interval": self.interval, "tokens": 1.0,
+                                     "last": time.monotonic(), "blocked_until": 0.0,
+                                     "streak": 0, "strikes": 0}
+        return h
+
+    def _wait(self, h, now):
+        """Seconds until h has a token (refilling it first). Lock held."""
+        if h["interval"] > 0:
+            h["tokens"] = min(1.0, h["tokens"] + (now - h["last"]) / h["interval"])
+        else:
+            h["tokens"] = 1.0
+        h["last"] = now
+        wait = 0.0 if h["tokens"] >= 1.0 else (1.0 - h["tokens"]) * h["interval"]
+        return max(wait, h["blocked_until"] - now)
+
+    def ready_in(self, url):
+        """Seconds until a request to url's host may go out (no token taken)."""
+        with self._lock:
+            return self._wait(self._host(url), time.monotonic())
+
+    def reserve(self, url):
+        """Take the next token for url's host; returns seconds to wait first."""
+        with self._lock:
+            h = self._host(url)
+            wait = self._wait(h, time.monotonic())
+            h["tokens"] -= 1.0
+            return wait
+
+    def success(self, url):
+        with self._lock:
+            h = self._host(url)
+            h["strikes"] = 0
+            h["streak"] += 1
+            if h["streak"] >= self.recover_after and h["interval"] > self.interval:
+                h["interval"] = max(self.interval,
+                                    h["interval"] - (h["interval"] - self.interval) / 2)
+                h["streak"] = 0
+
+    def penalize(self, url, retry_after=None):
+        """Back off after a 429/503. Returns how long the host is blocked."""
+        with self._lock:
+            h = self._host(url)
+            now = time.monotonic()
+            h["streak"] = 0
+            # Requests already in flight when the host pushed back will
+            # 429 too — only the first one in a backoff window cuts the rate
+            if now >= h["blocked_until"]:
+                h["strikes"] += 1
+                h["interval"] = min(_MAX_BACKOFF,
+                                    max(h["interval"] * 2, self.interval, 1.0))
+            backoff = retry_after
+            if backoff is None:
+                backoff = min(_MAX_BACKOFF, 2.0 ** h["strikes"])
+            h["blocked_until"] = max(h["blocked_until"], now + backoff)
+            # The block replaces any queued-up token debt
+            h["tokens"] = max(h["tokens"], 0.0)
+            h["last"] = now
+            return self._wait(h, now)
+
+
+class _BandwidthLimit:
+    """Token bucket in bytes/sec for one direction of traffic — downloads,
+    or pushes to the NAS — shared by every job.
+
+    reserve() charges a chunk that was just written and returns how long
+    the writer should sleep to stay under the rate. Debt carries over, so
+    concurrent downloads split the budget between them instead of each
+    getting the full rate. A rate of 0 means unlimited.
+
+    windows (from _parse_schedule) change the rate by time of day; the rate
+    in force is rechecked every second, so configure() at runtime takes
+    effect on the next chunk. Transfers done by an external program (scp)
+    can't be paced chunk by chunk: lease() hands each one its share of the
+    rate to pass on as that program's own limit.
+    """
+
+    def __init__(self, rate, windows=()):
+        self.limit = max(0, rate)  # bytes/sec outside every window
+        self.windows = list(windows)
+        self.window = None         # spec of the window in force
+        self.rate = self.limit     # bytes/sec in force right now
+        self.leases = 0            # external transfers running
+        self._tokens = float(self.rate)  # one second of burst
+        self._last = self._checked = time.monotonic()
+        self._meter_start, self._meter_bytes, self._measured = self._last, 0, 0.0
+        self._lock = threading.Lock()
+        self._apply_window()
+
+    def configure(self, rate=None, windows=None):
+        """Change the cap (bytes/sec) and/or the schedule."""
+        with self._lock:
+            if rate is not None:
+                self.limit = max(0, rate)
+            if windows is not None:
+                self.windows = list(windows)
+            self._apply_window()
+
+    def _apply_window(self):
+        """Set rate from the window covering the current local time. Lock held."""
+        now = time.localtime()
+        minute = now.tm_hour * 60 + now.tm_min
+        rate, self.window = self.limit, None
+        for start, end, amount, is_percent, spec in self.windows:
+            inside = (start <= minute < end) if start <= end else (minute >= start or minute < end)
+            if inside:
+                rate = self.limit * amount // 100 if is_percent else amount * 1024
+                self.window = spec
+                break
+        if rate != self.rate:
+            self.rate = rate
+            self._tokens = min(self._tokens, float(rate))
+        self._checked = time.monotonic()
+
+    def reserve(self, nbytes):
+        with self._lock:
+            now = time.monotonic()
+            if now - self._checked >= 1.0:
+                self._apply_window()
+            self._meter_bytes += nbytes
+            if now - self._meter_start >= 2.0:
+                self._measured = self._meter_bytes / (now - self._meter_start)
+                self._meter_start, self._meter_bytes = now, 0
+            if not self.rate:
+                self._last = now
+                return 0.0
+            self._tokens = min(float(self.rate),
+                               self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            self._tokens -= nbytes
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    @contextlib.contextmanager
+    def lease(self):
+        """Run one external transfer; yields its share of the rate in
+        bytes/sec (0 = unlimited), split evenly with the ones running."""
+        with self._lock:
+            if time.monotonic() - self._checked >= 1.0:
+                self._apply_window()
+            self.leases += 1
+            share = max(1, self.rate // self.leases) if self.rate else 0
+        try:
+            yield share
+        finally:
+            with self._lock:
+                self.leases -= 1
+
+    def stats(self):
+        with self._lock:
+            self._apply_window()
+            idle = time.monotonic() - self._meter_start >= 4.0
+            return {
+                "limit_kbps": self.limit // 1024,
+                "effective_kbps": self.rate // 1024,
+                "window": self.window,
+                "measured_kbps": 0 if idle else round(self._measured / 1024),
+                "transfers": self.leases,
+            }
+
+
+def _scp_limit(rate):
+    """scp arguments capping a transfer at rate bytes/sec (scp -l is Kbit/s)."""
+    return ["-l", str(max(1, rate * 8 // 1000))] if rate else []
+
+
+def _scp_timeout(size, rate):
+    """Seconds to allow an scp of size bytes: 600, or twice what the rate
+    cap makes it take."""
+    return max(600, 2 * size // rate) if rate else 600
+
+
+class _CrawlFrontier:
+    """Priority queue of pages waiting to be crawled.
+
+    Pages pop detail-first, then child nav pages, then pagination — the same
+    order the old recursive crawl used. Within a class the most recently
+    queued page wins, so one listing's games are finished before the crawl
+    wanders off to the next system.
+
+    pop() only hands out a page when its host is under the concurrency cap
+    and the host's throttle has a token free. A page stays "pending" from
+    pop() until the crawl thread calls done() on it (or a worker hands it
+    back with retry_later()), and the frontier counts as drained once
+    nothing is queued or pending.
+    """
+
+    DETAIL, CHILD, PAGINATION = 0, 1, 2
+
+    def __init__(self, host_limit, max_pending=16, throttle=None):
+        self._hosts = {}        # host -> heap of (priority, -seq, url, depth)
+        self._host_active = {}  # host -> pages currently being fetched
+        self._host_limit = max(1, host_limit)
+        self._throttle = throttle or _HostThrottle(_PAGE_INTERVAL)
+        self._popped = {}       # url -> (priority, depth) while pending
+        self._attempts = {}     # url -> times handed back by retry_later()
+        self._max_pending = max(1, max_pending)
+        self._queued = set()
+        self._seq = 0
+        self._size = 0
+        self._pending = 0
+        self._closed = False
+        self._cond = threading.Condition()
+
+    def __len__(self):
+        return self._size
+
+    def push(self, url, depth, priority):
+        """Queue a page. Returns False if it was already queued once."""
+        with self._cond:
+            if self._closed or url in self._queued:
+                return False
+            self._queued.add(url)
+            self._seq += 1
+            host = urllib.parse.urlparse(url).netloc
+            heapq.heappush(self._hosts.setdefault(host, []),
+                           (priority, -self._seq, url, depth))
+            self._size += 1
+            self._cond.notify()
+            return True
+
+    def _take(self):
+        """Hand out the best fetchable page. Caller holds the lock.
+
+        Returns ((url, depth) or None, seconds until a host frees up or None).
+        """
+        wait = None
+        if self._pending >= self._max_pending:
+            return None, None
+        best_host = None
+        for host, heap in self._hosts.items():
+            if not heap or self._host_active.get(host, 0) >= self._host_limit:
+                continue
+            delay = self._throttle.ready_in(host)
+            if delay > 0:
+                wait = delay if wait is None else min(wait, delay)
+                continue
+            if best_host is None or heap[0] < self._hosts[best_host][0]:
+                best_host = host
+        if best_host is None:
+            return None, wait
+        priority, _, url, depth = heapq.heappop(self._hosts[best_host])
+        self._size -= 1
+        self._pending += 1
+        self._host_active[best_host] = self._host_active.get(best_host, 0) + 1
+        self._throttle.reserve(best_host)
+        self._popped[url] = (priority, depth)
+        return (url, depth), None
+
+    def _finished(self):
+        return self._closed or (self._size == 0 and self._pending == 0)
+
+    def pop(self):
+        """Block until a page may be fetched.
+
+        Returns (url, depth), or None once the frontier is closed or drained.
+        """
+        with self._cond:
+            while True:
+                if self._finished():
+                    return None
+                entry, wait = self._take()
+                if entry is not None:
+                    return entry
+                self._cond.wait(wait)
+
+    def poll(self):
+        """Non-blocking pop for the asyncio engine.
+
+        Returns (entry, wait, finished): entry is (url, depth) or None, wait
+        is how long until a host frees up (None = until something changes).
+        """
+        with self._cond:
+            if self._finished():
+                return None, None, True
+            entry, wait = self._take()
+            return entry, wait, False
+
+    def done(self, url, retry=False):
+        """Mark a popped page as fully handled. retry=True lets it be queued again."""
+        with self._cond:
+            host = urllib.parse.urlparse(url).netloc
+            self._host_active[host] = max(0, self._host_active.get(host, 0) - 1)
+            self._pending = max(0, self._pending - 1)
+            self._popped.pop(url, None)
+            if retry:
+                self._queued.discard(url)
+            self._cond.notify_all()
+
+    def retry_later(self, url):
+        """Put a popped page back in the queue after its host rate-limited
+        us; the host's throttle decides when it comes out again. Returns
+        False (leaving the page pending) once it has used up its retries."""
+        with self._cond:
+            attempts = self._attempts.get(url, 0) + 1
+            if attempts > _RETRY_LIMIT or url not in self._popped or self._closed:
+                return False
+            self._attempts[url] = attempts
+            priority, depth = self._popped.pop(url)
+            host = urllib.parse.urlparse(url).netloc
+            self._host_active[host] = max(0, self._host_active.get(host, 0) - 1)
+            self._pending -= 1
+            self._seq += 1
+            heapq.heappush(self._hosts.setdefault(host, []),
+                           (priority, -self._seq, url, depth))
+            self._size += 1
+            self._cond.notify_all()
+            return True
+
+    def drained(self):
+        with self._cond:
+            return self._size == 0 and self._pending == 0
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+
+def _post_referer(url):
+    """Return the source page of a POST synthetic URL, or None."""
+    if not isinstance(url, str) or not url.startswith("POST|"):
+        return None
+    parts = url.split("|", 3)
+    return parts[3] if len(parts) > 3 and parts[3] else None
+
+
+def _post_media_id(url):
+    """Return the mediaId of a POST synthetic URL, or None."""
+    if not isinstance(url, str) or not url.startswith("POST|"):
+        return None
+    parts = url.split("|", 3)
+    if len(parts) < 3:
+        return None
+    return dict(urllib.parse.parse_qsl(parts[2])).get("mediaId")
+
+
+class _DiscoveryIndex:
+    """Insertion-ordered set of discovered download URLs.
+
+    Stands in for the plain list CrawlJob used to keep: iteration order,
+    len() and positional slicing behave the same, but membership is a hash
+    lookup instead of a scan. Also tracks the Vimm mediaId of each POST
+    synthetic URL, so the media-array pass doesn't have to re-parse them,
+    and the size/date a directory listing (or a HEAD probe) gave for a URL.
+    Page workers add while pipeline stages read, so iteration walks a
+    snapshot.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._urls = []
+        self._members = set()
+        self.media_ids = set()
+        self._rows = {}  # url -> listing row text, parsed on first meta()
+        self._meta = {}  # url -> _listing_meta() dict ({} if not a listing row)
+
+    def __contains__(self, url):
+        return url in self._members
+
+    def __len__(self):
+        return len(self._urls)
+
+    def __iter__(self):
+        with self._lock:
+            return iter(self._urls[:])
+
+    def __getitem__(self, index):
+        return self._urls[index]
+
+    def add(self, url, row=None):
+        """Add a URL, with the listing row it was found in. Returns False if
+        it was already discovered."""
+        with self._lock:
+            if url in self._members:
+                return False
+            self._members.add(url)
+            self._urls.append(url)
+        if row:
+            self._rows[url] = row
+        self.note_media_id(url)
+        return True
+
+    def meta(self, url):
+        """Size bounds and mtime for url (see _listing_meta); {} if unknown."""
+        meta = self._meta.get(url)
+        if meta is None:
+            row = self._rows.pop(url, None)
+            meta = self._meta[url] = (_listing_meta(row) if row else None) or {}
+        return meta
+
+    def set_size(self, url, size):
+        """Record an exact size, e.g. from a HEAD request."""
+        self._meta[url] = {**self.meta(url), "size_min": size, "size_max": size}
+
+    def exact_size(self, url):
+        """url's exact size from its listing (or a probe), else 0."""
+        meta = self.meta(url)
+        low = meta.get("size_min")
+        return low if low is not None and low == meta.get("size_max") else 0
+
+    def note_media_id(self, url):
+        """Record the mediaId of a discovered POST URL."""
+        mid = _post_media_id(url)
+        if mid:
+            self.media_ids.add(mid)
+
+
+def _mirror_key(url):
+    """url's filename, normalized for matching the same file across URLs."""
+    return " ".join(urllib.parse.unquote(Path(url).name).casefold().split())
+
+
+class _SlowSource(requests.RequestException):
+    """A download's source is below MIRROR_SLOW_KBPS and a faster one is
+    available. Its resume point has been saved; the download restarts from
+    it on the new source."""
+
+
+class _MirrorIndex:
+    """Every URL each file was discovered at, for mirror failover.
+
+    URLs are grouped by normalized filename (see _mirror_key); their sizes
+    come from the _DiscoveryIndex that found them, when a listing or a HEAD
+    gave one. Shared by all jobs through the job manager, so a file two
+    crawls found on two sites has two sources. Also keeps each host's recent
+    download speed and the sources currently being avoided as too slow.
+    """
+
+    def __init__(self, slow_limit):
+        self.slow_limit = slow_limit  # bytes/sec
+        self._sources = {}  # key -> {url: _DiscoveryIndex that found it}
+        self._speeds = {}   # host -> bytes/sec, smoothed
+        self._avoid = {}    # url -> monotonic time until which it isn't picked
+        self._lock = threading.Lock()
+
+    def add(self, url, index):
+        key = _mirror_key(url)
+        with self._lock:
+            self._sources.setdefault(key, {})[url] = index
+
+    def forget(self, index):
+        """Drop the URLs a (finished, forgotten) job discovered."""
+        with self._lock:
+            for key in list(self._sources):
+                urls = {u: i for u, i in self._sources[key].items() if i is not index}
+                if urls:
+                    self._sources[key] = urls
+                else:
+                    del self._sources[key]
+
+    def alternates(self, url, size, exact=True):
+        """Other URLs of url's file. Any size known for them must equal
+        size; with exact, both sizes must be known."""
+        with self._lock:
+            sources = list(self._sources.get(_mirror_key(url), {}).items())
+        found = []
+        for other, index in sources:
+            if other == url:
+                continue
+            listed = index.exact_size(other)
+            if (listed and size and listed != size) or (exact and not (listed and size)):
+                continue
+            found.append(other)
+        return found
+
+    def note_speed(self, url, speed):
+        host = urllib.parse.urlparse(url).netloc
+        with self._lock:
+            old = self._speeds.get(host)
+            self._speeds[host] = speed if old is None else old * 0.7 + speed * 0.3
+
+    def speed(self, url):
+        """url's host's recent download speed; slow_limit if not yet known."""
+        return self._speeds.get(urllib.parse.urlparse(url).netloc, self.slow_limit)
+
+    def avoid(self, url):
+        with self._lock:
+            self._avoid[url] = time.monotonic() + _MIRROR_AVOID
+
+    def pick(self, url, size, ready_in, exact=True, exclude=(), prefer=None):
+        """The fastest source of url's file: url or one of its alternates,
+        skipping excluded, avoided and throttled-back ones. Ties go to
+        prefer (default url). None if every source was skipped."""
+        prefer = prefer or url
+        now = time.monotonic()
+        best, best_score = None, None
+        for source in [url] + self.alternates(url, size, exact):
+            if (source in exclude or self._avoid.get(source, 0) > now
+                    or ready_in(source) > _MIRROR_BLOCKED):
+                continue
+            score = (self.speed(source), source == prefer)
+            if best_score is None or score > best_score:
+                best, best_score = source, score
+        return best
+
+
+class _SourceWatch:
+    """Judges a download's source while it streams (see _MirrorIndex).
+
+    check() is fed every chunk. Every _MIRROR_WINDOW seconds it works out
+    the speed over the last window and records it for the host. A window
+    in which the bandwidth cap made the download wait isn't judged -- the
+    cap, not the source, set the pace. Below the slow limit, with a faster
+    source to go to, the source is avoided from now on and check() raises
+    _SlowSource.
+    """
+
+    def __init__(self, job, url, source, size):
+        self.job = job
+        self.url = url
+        self.source = source
+        self.size = size
+        self._start = time.monotonic()
+        self._bytes = 0
+        self._waited = False
+        self._lock = threading.Lock()
+
+    def check(self, nbytes, waited=0.0):
+        with self._lock:
+            self._bytes += nbytes
+            self._waited = self._waited or waited > 0
+            now = time.monotonic()
+            if now - self._start < _MIRROR_WINDOW:
+                return
+            speed = self._bytes / (now - self._start)
+            capped = self._waited
+            self._start, self._bytes, self._waited = now, 0, False
+        if capped:
+            return
+        mirrors = self.job.mirrors
+        mirrors.note_speed(self.source, speed)
+        if speed >= mirrors.slow_limit:
+            return
+        alt = mirrors.pick(self.url, self.size, self.job.download_throttle.ready_in,
+                           exact=False, exclude={self.source})
+        if alt is None or mirrors.speed(alt) <= speed:
+            return
+        mirrors.avoid(self.source)
+        raise _SlowSource(
+            f"{urllib.parse.urlparse(self.source).netloc} is down to "
+            f"{speed / 1024:.0f} KB/s -- switching to {urllib.parse.urlparse(alt).netloc}")
+
+
+class _KnownContent(requests.RequestException):
+    """A download turned out to be content the dedup registry already has
+    (see _HeadWatch). The download stops; nothing of it is kept."""
+
+    def __init__(self, key):
+        super().__init__(f"identical to {key}")
+        self.key = key
+
+
+class _ContentIndex:
+    """Dedup registry keys by content, so spotting a file that's already on
+    hand is a lookup instead of a scan of the whole registry.
+
+    An entry is found by the SHA-256 of the file as stored and of the file
+    as downloaded (they differ once post-processing converted it), and by
+    its head signature: the download's size plus the SHA-256 of its first
+    DEDUP_HEAD_KB. Built from the registry when the state loads; the
+    registry itself is what gets persisted. Lookups return candidates --
+    the caller checks them against the current registry entry.
+    """
+
+    def __init__(self):
+        self._by_hash = {}  # sha256 -> {registry key: None}
+        self._by_head = {}  # (size, head) -> {registry key: None}
+        self._sizes = set()  # sizes in _by_head
+
+    def add(self, key, reg):
+        download = reg.get("source") or reg
+        for digest in {reg.get("sha256"), download.get("sha256")} - {None, "unknown"}:
+            self._by_hash.setdefault(digest, {})[key] = None
+        if download.get("head") and reg.get("size"):
+            self._by_head.setdefault((reg["size"], download["head"]), {})[key] = None
+            self._sizes.add(reg["size"])
+
+    def by_hash(self, sha256):
+        return list(self._by_hash.get(sha256, ()))
+
+    def by_head(self, size, head):
+        return list(self._by_head.get((size, head), ()))
+
+    def has_size(self, size):
+        return size in self._sizes
+
+
+class _HeadWatch:
+    """Stops a download as soon as its head signature -- its size plus the
+    SHA-256 of its first DEDUP_HEAD_KB -- matches content in the dedup
+    registry.
+
+    check() is given the download's _MultiHasher whenever bytes from the
+    start of the file have been hashed. Once the head is complete it looks
+    the signature up, once, and raises _KnownContent on a match. A file no
+    bigger than DEDUP_HEAD_KB is matched on its full hash.
+
+    Only a download the exact size of a registered file can match. While
+    one is pending, its other segments hold off, so a match stops the
+    whole download rather than just its first range.
+    """
+
+    def __init__(self, job, size):
+        self.job = job
+        self.size = size
+        self._need = min(size, DEDUP_HEAD_KB * 1024)
+        self._done = False
+        self.pending = job.content.has_size(size)
+
+    def check(self, hasher):
+        if self._done or hasher.size < self._need:
+            return
+        self.settle()
+        key = self.job._identical_to(size=self.size, head=hasher.head())
+        if key:
+            raise _KnownContent(key)
+
+    def settle(self):
+        """Stop waiting for the head: it was checked, or never will be."""
+        self._done = True
+        self.pending = False
+
+
+class _AsyncCrawl:
+    """asyncio crawl engine: one event loop drives every page fetch and file
+    download of a CrawlJob over aiohttp, so hundreds of fetches can be in
+    flight without a thread per connection.
+
+    The loop runs on its own thread. Anything that touches job state or
+    blocks — processing a page, dedup checks, form/Playwright downloads — is
+    shipped back to the job's own thread through _call(). Finished downloads
+    go on to the job's pipeline for post-processing and pushing, exactly as
+    in the threaded engine.
+
+    Stopping is cooperative: request_stop() sets an asyncio.Event and the
+    loop cancels its in-flight tasks rather than each one polling a flag.
+    """
+
+    def __init__(self, job):
+        self.job = job
+        self._calls = queue.Queue()  # (fn, args, future) for the job thread
+        self._loop = None
+        self._stop = None
+        self._changed = None     # notified whenever the frontier may have work
+        self._session = None
+
+    def stop(self):
+        loop, event = self._loop, self._stop
+        if loop is not None and event is not None:
+            try:
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError:
+                pass  # loop already finished
+
+    def run(self, url, depth):
+        """Crawl from url. Blocks the calling (job) thread, which serves
+        _call() requests until the loop finishes."""
+        job = self.job
+        frontier = _CrawlFrontier(job.host_concurrency,
+                                  max_pending=CRAWL_ASYNC_FETCHES,
+                                  throttle=job.page_throttle)
+        if not job._enqueue_page(frontier, url, depth, _CrawlFrontier.CHILD):
+            return
+
+        job._async_crawl = self
+        loop_thread = threading.Thread(target=self._run_loop, args=(frontier,),
+                                       daemon=True)
+        loop_thread.start()
+        try:
+            while loop_thread.is_alive() or not self._calls.empty():
+                try:
+                    fn, args, fut = self._calls.get(timeout=0.2)
+                except queue.Empty:
+                    continue
+                if fut.cancelled():
+                    continue  # the task that asked for it was stopped
+                try:
+                    result, error = fn(*args), None
+                except Exception as e:
+                    result, error = None, e
+                self._settle(fut, result, error)
+        finally:
+            job._async_crawl = None
+            if job._pipeline is not None:
+                job._pipeline.download.external = None
+            frontier.close()
+
+    def _run_loop(self, frontier):
+        try:
+            asyncio.run(self._main(frontier))
+        except Exception as e:
+            self.job._log(f"  asyncio engine error: {e}")
+
+    def _call(self, fn, *args):
+        """Run fn(*args) on the job thread; returns an awaitable future."""
+        fut = self._loop.create_future()
+        self._calls.put((fn, args, fut))
+        return fut
+
+    def _settle(self, fut, result, error):
+        def settle():
+            if fut.cancelled():
+                return
+            if error is not None:
+                fut.set_exception(error)
+            else:
+                fut.set_result(result)
+        try:
+            self._loop.call_soon_threadsafe(settle)
+        except RuntimeError:
+            pass  # loop already closed — nobody is waiting
+
+    async def _notify(self):
+        async with self._changed:
+            self._changed.notify_all()
+
+    async def _main(self, frontier):
+        job = self.job
+        self._loop = asyncio.get_running_loop()
+        self._stop = asyncio.Event()
+        self._changed = asyncio.Condition()
+        if job.stop_requested:
+            return
+
+        connector = aiohttp.TCPConnector(
+            limit=CRAWL_ASYNC_FETCHES + CRAWL_ASYNC_DOWNLOADS,
+            limit_per_host=0,  # the frontier enforces the per-host page cap
+            ssl=False,  # Many ROM sites have broken SSL chains
+            use_dns_cache=DNS_CACHE_TTL > 0,
+            ttl_dns_cache=DNS_CACHE_TTL or None,
+        )
+        timeout = aiohttp.ClientTimeout(total=None, sock_connect=30, sock_read=300)
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout,
+                                         headers=dict(job.session.headers)) as session:
+            self._session = session
+            results = asyncio.Queue()
+            downloads = asyncio.Queue()
+            if job._pipeline is not None:
+                job._pipeline.download.external = downloads.qsize
+            tasks = [asyncio.create_task(self._fetcher(frontier, results))
+                     for _ in range(CRAWL_ASYNC_FETCHES)]
+            tasks.append(asyncio.create_task(
+                self._processor(frontier, results, downloads)))
+            tasks += [asyncio.create_task(self._downloader(downloads))
+                      for _ in range(CRAWL_ASYNC_DOWNLOADS)]
+            finished = asyncio.create_task(self._finished(frontier, results, downloads))
+            stopped = asyncio.create_task(self._stop.wait())
+
+            await asyncio.wait({finished, stopped},
+                               return_when=asyncio.FIRST_COMPLETED)
+            for t in tasks + [finished, stopped]:
+                t.cancel()
+            await asyncio.gather(*tasks, finished, stopped, return_exceptions=True)
+
+    async def _finished(self, frontier, results, downloads):
+        """Complete once every page is processed and every download done."""
+        while not frontier.drained():
+            async with self._changed:
+                try:
+                    await asyncio.wait_for(self._changed.wait(), timeout=1.0)
+                except asyncio.TimeoutError:
+                    pass
+        # Pages hand their downloads over before they're marked done
+        await results.join()
+        await downloads.join()
+
+    async def _fetcher(self, frontier, results):
+        job = self.job
+        while True:
+            entry, wait, finished = frontier.poll()
+            if finished:
+                return
+            if entry is None:
+                # Woken when a page completes; wait caps the sleep when a
+                # host is only rate-limited, and 1s guards a missed wakeup
+                async with self._changed:
+                    try:
+                        await asyncio.wait_for(self._changed.wait(),
+                                               timeout=min(wait or 1.0, 1.0))
+                    except asyncio.TimeoutError:
+                        pass
+                continue
+
+            url, depth = entry
+            short_url = url.replace(job.base_url, "~")
+            job._log(f"Crawl: {short_url} (depth {depth})")
+            page, needs_js = None, False
+            try:
+                page, needs_js = await self._fetch_page(url)
+            except _RateLimited as e:
+                job._rate_limited(job.page_throttle, url, e)
+                if frontier.retry_later(url):
+                    continue
+                job._log(f"  Giving up on page after {_RETRY_LIMIT} retries")
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+                job._log_fetch_error(str(e) or "timed out")
+                needs_js = True
+            if needs_js and job.js_mode:
+                # The pool renders on its own loop; this fetcher just waits
+                html = await job._browser_pool().render_async(url)
+                if html:
+                    page = await self._loop.run_in_executor(
+                        None, _extract_page, html, job.page_parser)
+            await results.put((url, depth, page))
+
+    async def _fetch_page(self, url):
+        """Async twin of CrawlJob._fetch_page_static."""
+        job = self.job
+        cached = job.page_cache.get(url) if job.page_cache else None
+        async with self._session.get(
+                url, headers=_PageCache.conditional_headers(cached),
+                timeout=aiohttp.ClientTimeout(total=30)) as resp:
+            if resp.status in (429, 503):
+                raise _RateLimited(resp.status, resp.headers.get("retry-after"))
+            job.page_throttle.success(url)
+            if resp.status == 304 and cached:
+                job.pages_unchanged += 1
+                page = PageExtract.from_dict(cached["page"])
+                return page, len(page.links) <= 2
+            resp.raise_for_status()
+            if "text/html" not in resp.headers.get("content-type", ""):
+                return None, False
+            body = await resp.read()
+            encoding = resp.charset or "utf-8"
+
+        # Parsing is CPU work — keep it off the loop
+        page = await self._loop.run_in_executor(
+            None, job._page_from_body, url, cached, resp, body,
+            lambda: body.decode(encoding, errors="replace"))
+        return page, len(page.links) <= 2
+
+    async def _processor(self, frontier, results, downloads):
+        job = self.job
+        while True:
+            url, depth, page = await results.get()
+            retry = True
+            try:
+                if page is not None:
+                    # Don't mark failed fetches as visited so a later link
+                    # to the same page can try again
+                    retry = False
+                    new = await self._call(job._process_page, frontier, url,
+                                           depth, page, False)
+                    for dl_url in new:
+                        downloads.put_nowait(dl_url)
+            except Exception as e:
+                job._log(f"  Error processing page: {e}")
+            finally:
+                frontier.done(url, retry=retry)
+                results.task_done()
+            await self._notify()
+
+    async def _downloader(self, downloads):
+        job = self.job
+        while True:
+            dl_url = await downloads.get()
+            try:
+                job.files_total = len(job.discovered_files) - len(job.downloaded_files)
+                job.phase = (f"Downloading ({len(job.downloaded_files)} done, "
+                             f"{job.files_total} remain)")
+                stage = job._pipeline.download if job._pipeline else None
+                try:
+                    with stage.track() if stage else contextlib.nullcontext():
+                        ok = await self._download(dl_url)
+                except Exception as e:
+                    job._log(f"  FAIL: {dl_url} -- {e}")
+                    ok = False
+                if ok:
+                    job.files_downloaded += 1
+                else:
+                    job.files_failed += 1
+            finally:
+                downloads.task_done()
+
+    async def _download(self, url):
+        """Stream one file to disk. Files whose name is in the URL download
+        here; form posts and Content-Disposition-named URLs go through the
+        sync download_file() on the job thread."""
+        job = self.job
+        if url in job.downloaded_files:
+            return True
+        if url.startswith("POST|") or not job._is_downloadable(url):
+            return await self._call(job.download_file, url)
+
+        filepath, result = await self._call(job._plan_direct_download, url)
+        if filepath is None:
+            return result
+        job._log(f"Downloading: {filepath.name}")
+        try:
+            return await self._stream_download(url, filepath)
+        except _SlowSource as e:
+            job._log(f"  {e}")
+        finally:
+            _release_target(filepath)
+        # Pick up the .part from its saved resume point on the faster source
+        return await self._download(url)
+
+    async def _stream_download(self, url, filepath):
+        """GET url into filepath (via .part) under the host throttle,
+        resuming the partial download recorded for url if there is one."""
+        job = self.job
+        name = filepath.name
+        tmp_path = filepath.with_suffix(filepath.suffix + ".part")
+        throttle = job.download_throttle
+        partial = job.partial_downloads.get(url)
+        source = await self._call(job._pick_source, url, partial)
+        record = None
+        try:
+            for attempt in range(_RETRY_LIMIT + 1):
+                # Wait for this host's download token; other hosts carry on
+                await asyncio.sleep(throttle.reserve(source))
+                headers = _resume_headers(partial) if partial else None
+                async with self._session.get(source, headers=headers) as resp:
+                    if resp.status in (429, 503) and attempt < _RETRY_LIMIT:
+                        job._rate_limited(throttle, source, _RateLimited(
+                            resp.status, resp.headers.get("retry-after")))
+                        continue
+                    if partial and resp.status == 416 and attempt < _RETRY_LIMIT:
+                        # The resume point is past the end: start over
+                        await self._call(job._drop_partial, url)
+                        partial = None
+                        continue
+                    resp.raise_for_status()
+                    throttle.success(source)
+                    accepted = partial and _resume_accepted(resp.status, resp.headers, partial)
+                    if partial and not accepted and source != url:
+                        # A mirror that can't continue this exact file: leave it be
+                        job.mirrors.avoid(source)
+                        raise _SlowSource(f"{urllib.parse.urlparse(source).netloc} "
+                                          f"can't resume this download")
+                    if partial and not accepted:
+                        job._log("  Partial download is stale -- starting over")
+                        await self._call(job._drop_partial, url)
+                        partial = None
+                    elif partial and not _record_validator(partial):
+                        # Switched source: pin the rest of the ranges to this one
+                        partial.update(etag=resp.headers.get("etag"),
+                                       last_modified=resp.headers.get("last-modified"))
+                    start_time = time.time()
+                    hasher = _MultiHasher()
+                    if partial:
+                        record, bounds = partial, partial["ranges"]
+                        job._log(f"  Resuming {name}")
+                    else:
+                        total = int(resp.headers.get("content-length", 0))
+                        record = _partial_record(
+                            filepath.relative_to(job.output_dir).as_posix(),
+                            resp.headers, total)
+                        if record:
+                            record["source"] = source
+                        bounds = record and (_segment_ranges(
+                            resp.headers, total, job._segment_count(str(resp.url)))
+                            or [(0, total - 1)])
+                    if record:
+                        watch = (_SourceWatch(job, url, source, record["total"])
+                                 if MIRROR_FAILOVER else None)
+                        downloaded = await self._fetch_segments(
+                            resp, url, bounds, tmp_path, record, start_time, hasher,
+                            fresh=partial is None, watch=watch,
+                            head=job._head_watch(record["total"]))
+                    else:
+                        downloaded = 0
+                        total = total or job._listed_size(url)  # no Content-Length
+                        head = job._head_watch(total)
+                        with open(tmp_path, "wb") as f:
+                            sink = _HashingWriter(f, hasher)
+                            async for chunk in resp.content.iter_chunked(1024 * 256):
+                                await self._loop.run_in_executor(None, sink.write, chunk)
+                                if head:
+                                    head.check(hasher)
+                                downloaded += len(chunk)
+                                wait = job._note_progress(len(chunk), downloaded, total, start_time)
+                                if wait:
+                                    await asyncio.sleep(wait)
+                break
+            hashes = hasher.hexdigests()
+            key = await self._call(job._identical_to, hashes)
+            if key:
+                raise _KnownContent(key)
+            tmp_path.rename(filepath)
+        except _KnownContent as e:
+            return await self._call(job._keep_identical, url, filepath, e.key)
+        except (aiohttp.ClientError, asyncio.TimeoutError, OSError) as e:
+            # OSError: the .part couldn't be written (disk full, say)
+            await self._call(job._download_failed, url, name,
+                             str(e) or "timed out", filepath)
+            return False
+        except asyncio.CancelledError:
+            if record is None:  # resumable downloads keep their .part
+                tmp_path.unlink(missing_ok=True)
+            raise
+        # Off the loop: a full post-process queue blocks until there's room
+        return await self._loop.run_in_executor(
+            None, job._finish_download, filepath, url, downloaded, False, hashes)
+
+    async def _fetch_segments(self, resp, url, bounds, tmp_path, record, start_time,
+                              hasher, fresh=True, watch=None, head=None):
+        """Resumable, optionally segmented download for the asyncio engine
+        (see CrawlJob._open_ranges and _write_segments).
+
+        resp is the open response and serves bounds[0]; every other range
+        gets its own Range request. A fresh download whose extra ranges are
+        refused streams resp alone instead. Resume points are saved every
+        _PARTIAL_CHECKPOINT seconds and when the download fails, is
+        cancelled, its watch raises _SlowSource or its head watch raises
+        _KnownContent. hasher is fed the way _write_segments feeds it.
+        Returns the file size.
+        """
+        job = self.job
+        total = record["total"]
+        validator = _record_validator(record) if not fresh else _if_range(resp.headers)
+        headers = {"If-Range": validator} if validator else {}
+        extra = []
+        progress = [[start, end, 0] for start, end in bounds]  # + bytes written
+
+        def missing():
+            return [[start + n, end] for start, end, n in progress if start + n <= end]
+
+        try:
+            for start, end in bounds[1:]:
+                seg = await self._session.get(resp.url, headers={
+                    **headers, "Range": f"bytes={start}-{end}"})
+                extra.append(seg)
+                if seg.status != 206 or not _content_range_matches(
+                        seg.headers.get("content-range"), start, end, total):
+                    if not fresh:
+                        await self._call(job._drop_partial, url)
+                        raise aiohttp.ClientPayloadError("server stopped honoring ranges")
+                    job._log("  Range requests not honored -- single stream")
+                    progress = [[0, total - 1, 0]]
+                    break
+            if len(progress) > 1 and fresh:
+                job._log(f"  Segmented: {len(progress)} ranges of "
+                         f"{(bounds[0][1] + 1) / 1024 / 1024:.0f} MB")
+
+            def preallocate():
+                with open(tmp_path, "wb") as f:
+                    f.truncate(total)
+
+            if fresh or not tmp_path.exists():
+                await self._loop.run_in_executor(None, preallocate)
+            await self._loop.run_in_executor(
+                None, hasher.update_file, tmp_path, 0, progress[0][0])
+            done = [total - sum(end - start + 1 for start, end, _ in progress)]
+            last_save = [time.monotonic()]
+
+            async def pump(i, seg):
+                start, end, _ = progress[i]
+                want = end - start + 1
+                f = await self._loop.run_in_executor(None, open, tmp_path, "r+b")
+                sink = _HashingWriter(f, hasher) if i == 0 else f
+                try:
+                    if i == 0 and head:
+                        head.check(hasher)  # a resumed .part may hold the head already
+                    while i and head and head.pending:
+                        await asyncio.sleep(0.05)
+                    f.seek(start)
+                    async for chunk in seg.content.iter_chunked(1024 * 256):
+                        chunk = chunk[:want]
+                        await self._loop.run_in_executor(None, sink.write, chunk)
+                        if i == 0 and head:
+                            head.check(hasher)
+                        await self._loop.run_in_executor(None, f.flush)
+                        want -= len(chunk)
+                        progress[i][2] += len(chunk)
+                        done[0] += len(chunk)
+                        wait = job._note_progress(len(chunk), done[0], total, start_time)
+                        if time.monotonic() - last_save[0] >= _PARTIAL_CHECKPOINT:
+                            last_save[0] = time.monotonic()
+                            record["ranges"] = missing()
+                            await self._call(job._save_partial, url, record)
+                        if wait:
+                            await asyncio.sleep(wait)
+                        if watch:
+                            watch.check(len(chunk), wait)
+                        if want <= 0:
+                            return
+                finally:
+                    f.close()
+                    if i == 0 and head:
+                        head.settle()
+                raise aiohttp.ClientPayloadError(
+                    f"segment {start}-{end} ended {want} bytes short")
+
+            tasks = [asyncio.ensure_future(pump(i, seg))
+                     for i, seg in enumerate([resp] + extra[:len(progress) - 1])]
+            try:
+                await asyncio.gather(*tasks)
+            except BaseException as e:
+                # One segment failed (or we were cancelled): stop the rest
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+                record["ranges"] = missing()
+                if isinstance(e, asyncio.CancelledError):
+                    # Don't wait on the job thread while being cancelled
+                    self._call(job._save_partial, url, record)
+                else:
+                    await self._call(job._save_partial, url, record)
+                raise
+            await self._loop.run_in_executor(
+                None, hasher.update_file, tmp_path, hasher.size, total)
+            return total
+        finally:
+            for seg in extra:
+                seg.close()
+
+
+class _Stage:
+    """One stage of the download pipeline: a bounded queue drained by its
+    own pool of worker threads.
+
+    fn(item) does the work and returns the item for next_stage, or None.
+    put() blocks while the queue is full, which is what pushes back on the
+    stage before it. When stopped() turns true, queued items are dropped
+    instead of processed.
+    """
+
+    _CLOSE = object()
+
+    def __init__(self, name, fn, workers, maxsize, log, next_stage=None,
+                 stopped=lambda: False):
+        self.name = name
+        self.fn = fn
+        self.workers = max(1, workers)
+        self.next_stage = next_stage
+        self.stopped = stopped
+        self._log = log
+        self._queue = queue.Queue(maxsize=max(1, maxsize))
+        # Backlog kept elsewhere: the asyncio engine's own download queue
+        self.external = None
+        self.active = 0
+        self.done = 0
+        self.errors = 0
+        self._first = None  # monotonic time of the first item
+        self._lock = threading.Lock()
+        self._threads = [threading.Thread(target=self._work, daemon=True,
+                                          name=f"{name}-{i}")
+                         for i in range(self.workers)]
+        for t in self._threads:
+            t.start()
+
+    def backlog(self):
+        return self._queue.qsize() + (self.external() if self.external else 0)
+
+    def put(self, item):
+        """Queue item, waiting for room. Returns False if stopped first."""
+        while not self.stopped():
+            try:
+                self._queue.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    @contextlib.contextmanager
+    def track(self):
+        """Count one item of work in this stage's stats."""
+        with self._lock:
+            self.active += 1
+            if self._first is None:
+                self._first = time.monotonic()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.active -= 1
+                self.done += 1
+
+    def _work(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is self._CLOSE:
+                    return
+                if self.stopped():
+                    continue
+                with self.track():
+                    out = self.fn(item)
+                if out is not None and self.next_stage is not None:
+                    self.next_stage.put(out)
+            except Exception as e:
+                self.errors += 1
+                self._log(f"  {self.name} error: {e}")
+            finally:
+                self._queue.task_done()
+
+    def join(self):
+        self._queue.join()
+
+    def close(self):
+        for _ in self._threads:
+            self._queue.put(self._CLOSE)
+
+    def stats(self):
+        elapsed = time.monotonic() - self._first if self._first else 0
+        return {
+            "workers": self.workers,
+            "backlog": self.backlog(),
+            "active": self.active,
+            "done": self.done,
+            "errors": self.errors,
+            "per_min": round(self.done / elapsed * 60, 1) if elapsed > 0 else 0.0,
+        }
+
+
+class _Pipeline:
+    """download -> post-process -> push, one worker pool per stage.
+
+    The crawl only discovers; each file then moves through the stages with
+    a bounded queue between them, so one file can download while another
+    converts and a third copies to the NAS. Downloads stop as soon as the
+    job does. Files already downloaded still finish post-processing and
+    pushing, so nothing is left half-recorded.
+    """
 
-    return _system_from_header_bytes(data)
+    def __init__(self, job):
+        self.push = _Stage("push", job._push_stage, PIPELINE_PUSH,
+                           PIPELINE_QUEUE, job._log)
+        self.post = _Stage("post-process", job._post_stage, PIPELINE_POSTPROCESS,
+                           PIPELINE_QUEUE, job._log, next_stage=self.push)
+        # Downloads hand over to post-processing themselves (download_file
+        # knows the final path), so this stage has no next_stage
+        self.download = _Stage("download", job._download_stage, PIPELINE_DOWNLOADS,
+                               PIPELINE_QUEUE, job._log,
+                               stopped=lambda: job.stop_requested)
+        self.stages = (self.download, self.post, self.push)
+
+    def join(self):
+        """Wait until every stage is idle, upstream first."""
+        for stage in self.stages:
+            stage.join()
 
+    def close(self):
+        for stage in self.stages:
+            stage.close()
 
-# ============================================================================
-# CRAWLER ENGINE
-# ============================================================================
+    def stats(self):
+        return {stage.name: stage.stats() for stage in self.stages}
 
-DOWNLOAD_EXTENSIONS = {
-    ".zip", ".7z", ".rar", ".gz", ".tar", ".bz2", ".xz",
-    ".iso", ".bin", ".cue", ".chd", ".img", ".mdf", ".mds",
-    ".nrg", ".ccd", ".sub", ".ecm", ".pbp", ".cso",
-    ".nes", ".unf", ".sfc", ".smc", ".gb", ".gbc", ".gba",
-    ".nds", ".3ds", ".cia", ".cci", ".n64", ".z64", ".v64",
-    ".gcm", ".gcz", ".rvz", ".wbfs", ".wad", ".nsp", ".xci",
-    ".md", ".smd", ".gen", ".gg", ".sms", ".32x",
-    ".cdi", ".gdi", ".a26", ".a52", ".a78", ".lnx", ".jag",
-    ".pce", ".ngp", ".ngc", ".ws", ".wsc", ".vec", ".col", ".sg",
-    ".psf", ".minipsf", ".scummvm",
-}
 
-PAGE_EXTENSIONS = {"", ".html", ".htm", ".php", ".asp", ".aspx", ".jsp", "/"}
+# Serializes state-store commits, and every change to the state a save
+# reads: pipeline workers record downloads while the crawl thread saves,
+# and concurrent jobs share one store per staging dir
+_STATE_LOCK = threading.RLock()
+# Download targets being written right now, across all jobs, so two jobs
+# never stream the same name into one .part file
+_CLAIMED_PATHS = set()
+_CLAIMED_LOCK = threading.Lock()
 
-# Extension -> system slug mapping (for auto-detect)
-EXT_TO_SYSTEM = {
-    ".nes": "nes", ".unf": "nes", ".unif": "nes",
-    ".sfc": "snes", ".smc": "snes",
-    ".gb": "gb", ".gbc": "gbc", ".gba": "gba",
-    ".nds": "nds", ".3ds": "3ds", ".cia": "3ds", ".cci": "3ds",
-    ".n64": "n64", ".z64": "n64", ".v64": "n64",
-    ".gcm": "gc", ".gcz": "gc", ".rvz": "gc",
-    ".wbfs": "wii", ".wad": "wii",
-    ".nsp": "switch", ".xci": "switch",
-    ".pbp": "psx", ".ecm": "psx",
-    ".cso": "psp",
-    ".smd": "genesis", ".gen": "genesis",
-    ".gg": "gamegear", ".sms": "mastersystem",
-    ".32x": "sega32x",
-    ".cdi": "dreamcast", ".gdi": "dreamcast",
-    ".a26": "atari2600", ".a52": "atari5200", ".a78": "atari7800",
-    ".lnx": "atarilynx", ".lyx": "atarilynx", ".jag": "atarijaguar",
-    ".pce": "pcengine",
-    ".ngp": "ngp", ".ngc": "ngpc",
-    ".ws": "wonderswan", ".wsc": "wonderswancolor",
-    ".vec": "vectrex", ".col": "coleco",
-}
 
-# Now compute cartridge extensions (ROM files that should be in .zip, not disc images)
-CARTRIDGE_EXTENSIONS = set(EXT_TO_SYSTEM.keys()) - DISC_IMAGE_EXTENSIONS
+def _claim_target(filepath):
+    """Reserve filepath for a download; a name another download holds gets
+    the next free _N suffix instead. Returns the reserved path."""
+    with _CLAIMED_LOCK:
+        path, counter = filepath, 2
+        while path in _CLAIMED_PATHS or (path != filepath and path.exists()):
+            path = filepath.parent / f"{filepath.stem}_{counter}{filepath.suffix}"
+            counter += 1
+        _CLAIMED_PATHS.add(path)
+        return path
 
-# URL path keywords -> system slug (for detecting system from directory structure)
-# Order matters — more specific patterns first to avoid false matches
-PATH_KEYWORDS = [
-    ("playstation-2", "ps2"), ("playstation2", "ps2"), ("ps2", "ps2"),
-    ("playstation-3", "ps3"), ("playstation3", "ps3"), ("ps3", "ps3"),
-    ("playstation", "psx"), ("psx", "psx"), ("ps1", "psx"),
-    ("psp", "psp"), ("vita", "psvita"),
-    ("super-nintendo", "snes"), ("super_nintendo", "snes"), ("snes", "snes"),
-    ("super-famicom", "snes"), ("super_famicom", "snes"),
-    ("nintendo-64", "n64"), ("nintendo64", "n64"), ("n64", "n64"),
-    ("nintendo-ds", "nds"), ("nds", "nds"), ("ds", "nds"),
-    ("nintendo-3ds", "3ds"), ("3ds", "3ds"),
-    ("gamecube", "gc"), ("game-cube", "gc"), ("game_cube", "gc"), ("ngc", "gc"),
-    ("game-boy-advance", "gba"), ("gameboy-advance", "gba"),
-    ("game_boy_advance", "gba"), ("gba", "gba"),
-    ("game-boy-color", "gbc"), ("gameboy-color", "gbc"),
-    ("game_boy_color", "gbc"), ("gbc", "gbc"),
-    ("game-boy", "gb"), ("gameboy", "gb"), ("game_boy", "gb"),
-    ("nes", "nes"), ("nintendo-entertainment", "nes"), ("famicom", "nes"),
-    ("wii-u", "wiiu"), ("wiiu", "wiiu"),
-    ("wii", "wii"),
-    ("switch", "switch"), ("nsp", "switch"),
-    ("mega-drive", "genesis"), ("megadrive", "genesis"), ("genesis", "genesis"),
-    ("sega-cd", "segacd"), ("segacd", "segacd"), ("mega-cd", "segacd"),
-    ("sega-saturn", "saturn"), ("saturn", "saturn"),
-    ("dreamcast", "dreamcast"), ("dream-cast", "dreamcast"),
-    ("master-system", "mastersystem"), ("mastersystem", "mastersystem"),
-    ("game-gear", "gamegear"), ("gamegear", "gamegear"),
-    ("sega-32x", "sega32x"), ("32x", "sega32x"),
-    ("arcade", "arcade"), ("mame", "arcade"), ("neo-geo", "arcade"), ("neogeo", "arcade"),
-    ("pc-engine", "pcengine"), ("pcengine", "pcengine"),
-    ("turbografx", "pcengine"), ("tg16", "pcengine"), ("tg-16", "pcengine"),
-    ("atari-2600", "atari2600"), ("atari2600", "atari2600"),
-    ("atari-5200", "atari5200"), ("atari5200", "atari5200"),
-    ("atari-7800", "atari7800"), ("atari7800", "atari7800"),
-    ("atari-lynx", "atarilynx"), ("lynx", "atarilynx"),
-    ("atari-jaguar", "atarijaguar"), ("jaguar", "atarijaguar"),
-    ("xbox", "xbox"),
-    ("scummvm", "scummvm"),
-    ("wonderswan-color", "wonderswancolor"), ("wonderswancolor", "wonderswancolor"),
-    ("wonderswan", "wonderswan"),
-    ("neo-geo-pocket", "ngp"), ("neogeopocket", "ngp"),
-    ("vectrex", "vectrex"), ("coleco", "coleco"),
-]
 
-# All system choices for the dropdown
-SYSTEM_CHOICES = [
-    ("auto", "Auto-detect from file type"),
-    ("psx", "PlayStation (PSX)"),
-    ("ps2", "PlayStation 2"),
-    ("ps3", "PlayStation 3"),
-    ("psp", "PSP"),
-    ("nes", "NES"),
-    ("snes", "SNES"),
-    ("n64", "Nintendo 64"),
-    ("gb", "Game Boy"),
-    ("gbc", "Game Boy Color"),
-    ("gba", "Game Boy Advance"),
-    ("nds", "Nintendo DS"),
-    ("3ds", "Nintendo 3DS"),
-    ("gc", "GameCube"),
-    ("wii", "Wii"),
-    ("switch", "Nintendo Switch"),
-    ("genesis", "Sega Genesis"),
-    ("saturn", "Sega Saturn"),
-    ("dreamcast", "Dreamcast"),
-    ("segacd", "Sega CD"),
-    ("mastersystem", "Master System"),
-    ("gamegear", "Game Gear"),
-    ("arcade", "Arcade / MAME"),
-    ("pcengine", "PC Engine / TG16"),
-    ("atari2600", "Atari 2600"),
-    ("atari7800", "Atari 7800"),
-    ("atarilynx", "Atari Lynx"),
-    ("atarijaguar", "Atari Jaguar"),
-    ("3do", "3DO"),
-    ("cdi", "Philips CD-i"),
-    ("xbox", "Xbox"),
-    ("scummvm", "ScummVM"),
-    ("other", "Other / Unsorted"),
-]
+def _release_target(filepath):
+    with _CLAIMED_LOCK:
+        _CLAIMED_PATHS.discard(filepath)
 
 
 class CrawlJob:
     """A single crawl job with progress tracking."""
 
     def __init__(self, base_url, output_dir, max_depth=3, delay=5, system="auto",
-                 js_mode=False):
+                 js_mode=False, page_workers=CRAWL_WORKERS,
+                 host_concurrency=CRAWL_HOST_CONCURRENCY, incremental=False,
+                 engine=CRAWL_ENGINE):
         self.base_url = base_url.rstrip("/")
         self.output_dir = Path(output_dir)
         self.max_depth = max_depth
         self.delay = delay
         self.system = system  # "auto" or a specific system slug
         self.js_mode = js_mode and HAS_PLAYWRIGHT
+        self.incremental = incremental  # skip subtrees of unchanged listings
+        self.engine = engine  # "threads" or "asyncio"
+        self._async_crawl = None  # running _AsyncCrawl, for request_stop()
+        self.page_workers = max(1, page_workers)
+        self.host_concurrency = max(1, host_concurrency)
+        self.page_parser = PAGE_PARSER
+        # Per-host politeness: page fetches start at one per _PAGE_INTERVAL,
+        # downloads at one per `delay` seconds; both back off on 429/503
+        self.page_throttle = _HostThrottle(_PAGE_INTERVAL)
+        self.download_throttle = _HostThrottle(delay)
+        self.page_cache = (_PageCache(self.output_dir / ".crawler-cache")
+                           if PAGE_CACHE else None)
+        # Shared _BandwidthLimits for downloads and NAS pushes, set by the job manager
+        self.bandwidth = None
+        self.push_bandwidth = None
+        # Where else each discovered file can be downloaded from; the job
+        # manager swaps in one index shared by every job
+        self.mirrors = _MirrorIndex(MIRROR_SLOW_KBPS * 1024)
+        # What's already on the NAS (None without NAS dedup); likewise
+        # shared between jobs by the job manager
+        self.nas = (_NASManifest(self.output_dir / ".crawler-state.db")
+                    if NAS_DEDUP and NAS_HOST and NAS_USER and NAS_EXPORT else None)
+        self.job_id = None     # assigned by the job manager
+        self.pages_unchanged = 0  # pages served from the page cache
 
         parsed = urllib.parse.urlparse(self.base_url)
         self.domain = parsed.netloc
         self.scheme = parsed.scheme
 
-        self.session = requests.Session()
+        self.session = _make_session(_download_pool_size())
         self.session.verify = False  # Many ROM sites have broken SSL chains
         self.session.headers.update({
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
@@ -893,11 +4278,28 @@ class CrawlJob:
             "Accept": "text/html,application/xhtml+xml,*/*",
             "Accept-Language": "en-US,en;q=0.9",
         })
-
-        # Playwright browser (lazy-init)
+        # Page fetches and HEADs: with HTTP/2 they multiplex over one
+        # connection per host, while downloads keep HTTP/1.1 connections of
+        # their own. Headers and cookies are shared either way.
+        self.page_session = self.session
+        if _use_http2():
+            self.page_session = _make_session(CRAWL_HOST_CONCURRENCY * 2, http2=True)
+            self.page_session.verify = False
+            self.page_session.headers = self.session.headers
+            self.page_session.cookies = self.session.cookies
+
+        # Playwright browser for browser downloads (lazy-init). Sync
+        # Playwright is bound to the thread that started it, and downloads
+        # run on pipeline workers, so all of it lives on one browser thread.
         self._pw = None
         self._browser = None
-        self._page = None
+        self._browser_thread = None
+        self._browser_thread_lock = threading.Lock()
+        # Download pipeline (see _Pipeline), alive for the length of run()
+        self._pipeline = None
+        # Playwright page pool for JS rendering (lazy-init)
+        self._js_pool = None
+        self._js_pool_lock = threading.Lock()
 
         # Trickle push state
         self._trickle_enabled = TRICKLE_PUSH
@@ -905,17 +4307,46 @@ class CrawlJob:
         self._nas_check_time = 0       # timestamp of last reachability check
 
         # State
-        self.state_file = self.output_dir / ".crawler-state.json"
+        self.store = _StateStore(self.output_dir / ".crawler-state.db",
+                                 legacy=self.output_dir / ".crawler-state.json")
         self.visited_pages = set()
         self.downloaded_files = set()
         self.failed_files = set()
-        self.discovered_files = []
+        self.discovered_files = _DiscoveryIndex()
         # System hints: {synthetic_url -> system_slug} — from page-level metadata
         # (e.g., Vimm page title "Frogger (PS1)" → "psx")
         self._url_system_hints = {}
-        # Dedup registry: {filename -> {url, size, sha256}} — catches same-name collisions
+        # Dedup registry: {filename -> {url, size, sha256, crc32, md5, sha1}}
+        # — catches same-name collisions. Post-processed files also keep the
+        # download's digests under "source"
         self.file_registry = {}
+        # Registry keys by content hash and head signature
+        self.content = _ContentIndex()
+        # Digests of files post-processing wrote: {path -> hexdigests()}
+        self._output_hashes = {}
         self.dupes_skipped = 0
+        # Interrupted downloads: {url -> _partial_record()}. The .part file
+        # stays on disk and the next attempt resumes it with Range requests.
+        self.partial_downloads = {}
+        # Source pages with at least one completed download, so the detail
+        # page skip is a set lookup instead of a scan of the whole history.
+        # Fed by POST referers, the registry's "page" field, and numeric
+        # path segments of direct file URLs. Like the history, it and the
+        # downloaded Vimm mediaIds stay in the state store (see _load_state).
+        self._pages_with_downloads = set()
+        self._downloaded_media = set()
+        # Page each direct download URL was found on (saved in the registry)
+        self._found_on = {}
+        # Listing fingerprints: {page_url -> {fp, seen, depth}} from the last
+        # COMPLETE crawl. depth is the depth budget the subtree was crawled
+        # with. This run's prints are held back until the crawl finishes, so
+        # a stopped crawl never marks a half-walked subtree as done, nor
+        # one with files that didn't download.
+        self.listing_fingerprints = {}
+        self._new_fingerprints = {}
+        # Page -> the listing that queued it, to find a file's listings
+        self._queued_by = {}
+        self.listings_pruned = 0
 
         # Progress (read by UI)
         self.status = "idle"  # idle, crawling, downloading, complete, stopped, error
@@ -935,6 +4366,13 @@ class CrawlJob:
         self.output_dir.mkdir(parents=True, exist_ok=True)
         self._load_state()
 
+    def request_stop(self):
+        """Ask the job to stop. Sync code polls stop_requested; the asyncio
+        engine is woken so it can cancel its in-flight tasks right away."""
+        self.stop_requested = True
+        if self._async_crawl:
+            self._async_crawl.stop()
+
     def _log(self, msg):
         ts = time.strftime("%H:%M:%S")
         line = f"[{ts}] {msg}"
@@ -944,42 +4382,124 @@ class CrawlJob:
             self.log_lines = self.log_lines[-500:]
 
     def _load_state(self):
-        if self.state_file.exists():
-            try:
-                state = json.loads(self.state_file.read_text())
-                # NOTE: visited_pages intentionally NOT restored — each crawl
-                # starts fresh so we re-discover pages and find new files.
-                # Only download history persists (that's the dedup data).
-                self.downloaded_files = set(state.get("downloaded_files", []))
-                self.failed_files = set(state.get("failed_files", []))
-                self.file_registry = state.get("file_registry", {})
-                if self.downloaded_files:
-                    self._log(f"Resumed: {len(self.downloaded_files)} files downloaded, "
-                              f"{len(self.file_registry)} in dedup registry")
-            except (json.JSONDecodeError, KeyError):
-                pass
+        try:
+            state = self.store.load(self.store.MAPS)
+            if self.store.meta("indexed") is None:
+                self._index_history(state["registry"])
+            # Download history, and the pages and mediaIds it came from,
+            # stays on disk behind Bloom filters
+            downloaded = _URLHistory(self.store.path, "downloaded")
+            failed = _URLHistory(self.store.path, "failed")
+            pages = _URLHistory(self.store.path, "page")
+            media = _URLHistory(self.store.path, "media")
+        except (sqlite3.Error, OSError) as e:
+            self._log(f"State store unavailable ({e}) -- starting without history")
+            return
+        if self.store.set_aside:
+            self._log("State store was unreadable -- kept as .crawler-state.db.corrupt, "
+                      "starting a new one")
+        if self.store.migrated:
+            self._log(f"Migrated {self.store.migrated} records from .crawler-state.json "
+                      f"to .crawler-state.db")
+        # NOTE: visited_pages intentionally NOT restored — each crawl
+        # starts fresh so we re-discover pages and find new files.
+        # Only download history persists (that's the dedup data).
+        self.downloaded_files = downloaded
+        self.failed_files = failed
+        self._pages_with_downloads = pages
+        self._downloaded_media = media
+        self.file_registry = state["registry"]
+        self.listing_fingerprints = state["fingerprint"]
+        self.partial_downloads = state["partial"]
+        for key, reg in self.file_registry.items():
+            self.content.add(key, reg)
+        if self.downloaded_files:
+            self._log(f"Resumed: {len(self.downloaded_files)} files downloaded, "
+                      f"{len(self.file_registry)} in dedup registry")
+        if self.partial_downloads:
+            self._log(f"Resumable: {len(self.partial_downloads)} partial downloads")
+
+    def _index_history(self, registry):
+        """Index the source pages and mediaIds of every download so far.
+
+        Stores from before those indexes were kept only have the URLs, so
+        this reads the whole history once; the indexes are committed and
+        the store marked, and later starts don't look at the history.
+        """
+        self.store.each_key("downloaded", self._index_download)
+        for reg in registry.values():
+            self._index_download(reg.get("url", ""), reg.get("page"))
+        self.store.commit(base_url=self.base_url)
+        self.store.set_meta("indexed", "1")
+        self._pages_with_downloads = set()
+        self._downloaded_media = set()
+
+    def _index_download(self, url, page=None):
+        """Remember which page(s) a completed download came from, and its
+        mediaId if it's a Vimm POST. New entries are queued in the store."""
+        pages = [page] if page else []
+        referer = _post_referer(url)
+        if referer:
+            pages.append(referer)
+        elif url and not url.startswith("POST|"):
+            # A file under a numeric path (/vault/1234/file.zip) belongs to
+            # that detail page
+            parsed = urllib.parse.urlparse(url)
+            segs = parsed.path.split("/")
+            for i in range(1, len(segs) - 1):
+                if segs[i].isdigit():
+                    pages.append(f"{parsed.scheme}://{parsed.netloc}{'/'.join(segs[:i + 1])}")
+        for page in pages:
+            if page not in self._pages_with_downloads:
+                self._pages_with_downloads.add(page)
+                self.store.put("page", page)
+        mid = _post_media_id(url)
+        if mid and mid not in self._downloaded_media:
+            self._downloaded_media.add(mid)
+            self.store.put("media", mid)
+
+    def _mark_downloaded(self, url):
+        with _STATE_LOCK:
+            self.downloaded_files.add(url)
+            self.store.put("downloaded", url)
+            self._index_download(url, self._found_on.get(url))
 
     def _save_state(self):
-        state = {
-            "downloaded_files": list(self.downloaded_files),
-            "failed_files": list(self.failed_files),
-            "file_registry": self.file_registry,
-            "base_url": self.base_url,
-            "last_run": time.strftime("%Y-%m-%d %H:%M:%S"),
-        }
-        self.state_file.write_text(json.dumps(state, indent=2))
+        """Commit the state changes queued since the last save."""
+        with _STATE_LOCK:
+            try:
+                self._merge_foreign_state()
+                self.store.commit(base_url=self.base_url)
+            except sqlite3.Error as e:
+                self._log(f"  State save failed ({e}) -- retrying with the next save")
 
-    @staticmethod
-    def _file_sha256(filepath, chunk_size=1024 * 256):
-        """Compute SHA-256 hash of a file."""
-        h = hashlib.sha256()
-        with open(filepath, "rb") as f:
-            while True:
-                chunk = f.read(chunk_size)
-                if not chunk:
-                    break
-                h.update(chunk)
-        return h.hexdigest()
+    def _merge_foreign_state(self):
+        """Fold in state another job committed since we last looked.
+
+        Concurrent jobs share one state store per staging dir. Only rows
+        newer than the last merge are read, and nothing at all when no
+        other job has committed. Lock held.
+        """
+        for kind, key, value in self.store.changes():
+            if kind == "downloaded":
+                # Committed, so it's in the store; our filter may not have it
+                self.downloaded_files.add(key)
+            elif kind == "page":
+                self._pages_with_downloads.add(key)
+            elif kind == "media":
+                self._downloaded_media.add(key)
+            elif kind == "failed":
+                if key not in self.downloaded_files:
+                    self.failed_files.add(key)
+            elif kind == "registry":
+                if key not in self.file_registry:
+                    self.file_registry[key] = value
+                    self.content.add(key, value)
+            elif kind == "fingerprint":
+                self.listing_fingerprints.setdefault(key, value)
+            elif kind == "partial":
+                if key not in self.downloaded_files:
+                    self.partial_downloads.setdefault(key, value)
 
     def _dedup_filepath(self, filepath, url):
         """Check for duplicates, return (final_path, should_download).
@@ -987,20 +4507,34 @@ class CrawlJob:
         Returns (filepath, True) if the file should be downloaded.
         Returns (new_filepath, True) if a name collision exists but content differs.
         Returns (None, False) if the file is a known duplicate.
+        A returned path is claimed (_claim_target); the caller releases it.
         """
         name = filepath.name
         system = filepath.parent.name
 
-        # If file doesn't exist locally, check the registry for content-level dups
-        if not filepath.exists():
-            return filepath, True
+        if filepath.exists():
+            existing_size = filepath.stat().st_size
+            where = ""
+        else:
+            # Not here, but maybe already pushed to the NAS
+            stored = self._on_nas(filepath)
+            if stored is None:
+                return self._claim(filepath), True
+            stored_name, existing_size = stored
+            if stored_name != name:
+                # Post-processing would turn this into a file the NAS has
+                self._log(f"  Dedup: {name} (on the NAS as {stored_name}, skipping)")
+                self._mark_downloaded(url)
+                self.dupes_skipped += 1
+                self._save_state()
+                return None, False
+            where = "on the NAS, "
 
-        # File exists locally — is it the same URL we already downloaded?
+        # File exists already — is it the same URL we already downloaded?
         if url in self.downloaded_files:
             return None, False
 
         # File exists from a different URL — compare sizes first (cheap)
-        existing_size = filepath.stat().st_size
         registry_key = f"{system}/{name}"
 
         if registry_key in self.file_registry:
@@ -1009,36 +4543,217 @@ class CrawlJob:
                 # Same URL, already downloaded
                 return None, False
 
-        # Try a HEAD request to compare content-length before downloading
-        try:
-            head = self.session.head(url, timeout=15, allow_redirects=True)
-            remote_size = int(head.headers.get("content-length", 0))
-        except Exception:
-            remote_size = 0
+        # Compare with the remote size before downloading
+        bounds = self._remote_size(url, existing_size)
 
-        if remote_size > 0 and remote_size == existing_size:
+        if bounds and bounds[0] == bounds[1] == existing_size:
             # Same name, same size — almost certainly the same file
-            self._log(f"  Dedup: {name} (same size {existing_size} bytes, skipping)")
-            self.downloaded_files.add(url)
+            self._log(f"  Dedup: {name} ({where}same size {existing_size} bytes, skipping)")
+            self._mark_downloaded(url)
             self.dupes_skipped += 1
             self._save_state()
             return None, False
 
-        if remote_size > 0 and remote_size != existing_size:
+        if bounds and not bounds[0] <= existing_size <= bounds[1]:
             # Different size — this is a different file with the same name.
             # Give it a unique suffix.
             stem = filepath.stem
             suffix = filepath.suffix
             counter = 2
             new_path = filepath.parent / f"{stem}_{counter}{suffix}"
-            while new_path.exists():
+            while new_path.exists() or self._on_nas(new_path, converted=False):
                 counter += 1
                 new_path = filepath.parent / f"{stem}_{counter}{suffix}"
             self._log(f"  Name collision: {name} -> {new_path.name} (different file)")
-            return new_path, True
+            return self._claim(new_path), True
 
         # Couldn't determine remote size — download and check after
-        return filepath, True
+        return self._claim(filepath), True
+
+    def _on_nas(self, filepath, converted=True):
+        """(name, size) of filepath's copy on the NAS -- the same name or,
+        with `converted`, the .zip/.chd post-processing would make of it --
+        or None. Sizes of converted copies don't compare to the download."""
+        if self.nas is None:
+            return None
+        system = filepath.parent.name
+        names = [filepath.name]
+        ext = filepath.suffix.lower()
+        if converted:
+            if ext in CARTRIDGE_EXTENSIONS or ext in (".7z", ".rar"):
+                names.append(filepath.stem + ".zip")
+            if ext in DISC_IMAGE_EXTENSIONS or ext in (".7z", ".rar"):
+                names.append(filepath.stem + ".chd")
+        for name in names:
+            entry = self.nas.get(system, name, self._log)
+            if entry is not None:
+                return name, entry.get("size")
+        return None
+
+    def _register(self, registry_key, reg):
+        """Add a dedup registry entry for reg["url"], noting the page it was
+        found on. Lock held."""
+        page = self._found_on.get(reg["url"]) or _post_referer(reg["url"])
+        if page:
+            reg["page"] = page
+        self.file_registry[registry_key] = reg
+        self.content.add(registry_key, reg)
+        self.store.put("registry", registry_key, reg)
+
+    def _identical_to(self, hashes=None, size=None, head=None):
+        """Registry key of content already on hand: matching a finished
+        download's hashes, or the (size, head) signature of one still
+        streaming. None if there is none, or DEDUP_IDENTICAL keeps copies."""
+        if DEDUP_IDENTICAL not in ("skip", "link"):
+            return None
+        with _STATE_LOCK:
+            if hashes:
+                for key in self.content.by_hash(hashes["sha256"]):
+                    reg = self.file_registry.get(key, {})
+                    source = reg.get("source") or {}
+                    if hashes["sha256"] in (reg.get("sha256"), source.get("sha256")):
+                        return key
+            elif head:
+                for key in self.content.by_head(size, head):
+                    reg = self.file_registry.get(key, {})
+                    if reg.get("size") == size and (reg.get("source") or reg).get("head") == head:
+                        return key
+        return None
+
+    def _head_watch(self, size):
+        """A _HeadWatch for a download of size bytes, or None when there's
+        nothing to match it against early."""
+        if DEDUP_IDENTICAL in ("skip", "link") and DEDUP_HEAD_KB > 0 and size > 0:
+            return _HeadWatch(self, size)
+        return None
+
+    def _keep_identical(self, url, filepath, key):
+        """Record url as a copy of registry entry key instead of storing the
+        same bytes again; filepath is the name it was downloading to, and
+        its .part goes. With DEDUP_IDENTICAL=link the name becomes a
+        hardlink to the existing file, if that is still in staging."""
+        filepath.with_suffix(filepath.suffix + ".part").unlink(missing_ok=True)
+        self._drop_partial(url)
+        existing = self.output_dir / key
+        note = "skipping"
+        if DEDUP_IDENTICAL == "link" and existing.is_file():
+            # Keep the existing file's format (e.g. .zip or .chd)
+            link = existing.with_name(filepath.stem + existing.suffix)
+            if link.exists():
+                note = f"{link.name} already exists, skipping"
+            else:
+                try:
+                    os.link(existing, link)
+                except OSError as e:
+                    note = f"can't link ({e.strerror}), skipping"
+                else:
+                    note = f"linked as {link.name}"
+                    with _STATE_LOCK:
+                        reg = {k: v for k, v in self.file_registry[key].items()
+                               if k != "page"}
+                        self._register(f"{link.parent.name}/{link.name}", dict(reg, url=url))
+        self._log(f"  Dedup: {filepath.name} (identical to {key}, {note})")
+        with _STATE_LOCK:
+            self._mark_downloaded(url)
+            if url in self.failed_files:
+                self.failed_files.discard(url)
+                self.store.drop("failed", url)
+            self.dupes_skipped += 1
+            self._save_state()
+        return True
+
+    def _remote_size(self, url, local_size):
+        """(min, max) bytes of url's file, or None if unknown.
+
+        The directory listing the URL was found on usually says, without a
+        round trip. A rounded listing size ("1.2M") that can't tell
+        local_size apart, or no listing at all, costs a HEAD request —
+        unless _probe_sizes already made it.
+        """
+        meta = self.discovered_files.meta(url)
+        low, high = meta.get("size_min"), meta.get("size_max")
+        if low is not None and (low == high or not low <= local_size <= high):
+            return low, high
+        size = self._head_size(url)
+        if not size:
+            return None
+        self.discovered_files.set_size(url, size)
+        return size, size
+
+    def _listed_size(self, url):
+        """url's exact size from its listing (or a probe), else 0."""
+        return self.discovered_files.exact_size(url)
+
+    def _pick_source(self, url, partial=None):
+        """The URL to download url's file from (see _MirrorIndex.pick).
+
+        A fresh download only moves to a mirror whose listed size matches
+        url's. A partial one sticks to its source on a tie, and its record
+        is switched over if the pick is another one."""
+        if not MIRROR_FAILOVER:
+            return url
+        if partial:
+            prefer = partial.get("source", url)
+            source = self.mirrors.pick(url, partial["total"], self.download_throttle.ready_in,
+                                       exact=False, prefer=prefer) or url
+            _switch_record(partial, url, source)
+        else:
+            source = self.mirrors.pick(url, self._listed_size(url),
+                                       self.download_throttle.ready_in) or url
+        if source != url:
+            self._log(f"  Source: {urllib.parse.urlparse(source).netloc}")
+        return source
+
+    def _head_size(self, url, throttle=None):
+        """Content-Length from a HEAD request; 0 if the server won't say.
+        With a throttle, the request waits for url's host token and a
+        429/503 backs the host off, as for a download."""
+        if throttle is not None:
+            self._throttle_wait(throttle, url)
+            if self.stop_requested:
+                return 0
+        try:
+            head = self.page_session.head(url, timeout=15, allow_redirects=True)
+            if throttle is not None:
+                if head.status_code in (429, 503):
+                    self._rate_limited(throttle, url, _RateLimited(
+                        head.status_code, head.headers.get("retry-after")))
+                    return 0
+                throttle.success(url)
+            return int(head.headers.get("content-length", 0))
+        except Exception:
+            return 0
+
+    def _probe_sizes(self, urls):
+        """HEAD, in parallel, the new downloads whose names are already taken
+        in staging but whose listing gave no exact size, so _dedup_filepath
+        finds the answer cached instead of blocking on one HEAD at a time."""
+        dirs = [d for d in self.output_dir.iterdir()
+                if d.is_dir() and not d.name.startswith(".")]
+        probe = []
+        for url in urls:
+            if (url.startswith("POST|") or not self._is_downloadable(url)
+                    or self._listed_size(url)):
+                continue
+            name = urllib.parse.unquote(Path(urllib.parse.urlparse(url).path).name)
+            if name and any((d / name).exists() for d in dirs):
+                probe.append(url)
+        if len(probe) < 2:
+            return  # one HEAD costs the same now or at download time
+        # Each HEAD still takes its host's download token
+        with concurrent.futures.ThreadPoolExecutor(
+                max_workers=min(len(probe), CRAWL_HOST_CONCURRENCY * 2)) as pool:
+            sizes = pool.map(lambda url: self._head_size(url, self.download_throttle), probe)
+            for url, size in zip(probe, sizes):
+                if size:
+                    self.discovered_files.set_size(url, size)
+
+    def _claim(self, filepath):
+        path = _claim_target(filepath)
+        if path != filepath:
+            self._log(f"  Name collision: {filepath.name} -> {path.name} "
+                      f"(another download is writing it)")
+        return path
 
     def _is_same_domain(self, url):
         parsed = urllib.parse.urlparse(url)
@@ -1204,6 +4919,19 @@ class CrawlJob:
         label = m.group(1).strip().lower()
         return self._SYSTEM_HINT_MAP.get(label)
 
+    def _system_from_dat_name(self, filename):
+        """System of the DAT game named exactly like the file (extension
+        aside), when the DATs list that name under a single system."""
+        index = _dat_index(self._log)
+        if index is None:
+            return None
+        systems = index.systems_named(Path(filename).stem) - {""}
+        if len(systems) != 1:
+            return None
+        system = systems.pop()
+        self._log(f"  DAT name: '{filename}' -> {system}")
+        return system
+
     def _get_system_for_file(self, filename, url=None):
         """Determine which system folder a file belongs in."""
         if self.system != "auto":
@@ -1216,6 +4944,11 @@ class CrawlJob:
         if system:
             return system
 
+        # 1.5. A game the DATs list under one system, by its exact name
+        system = self._system_from_dat_name(filename)
+        if system:
+            return system
+
         # 2. Check URL path for system keywords (most reliable for archives)
         if url:
             system = self._system_from_url_path(url)
@@ -1288,21 +5021,26 @@ class CrawlJob:
 
         return None
 
-    def _reclassify_archive(self, filepath, url):
+    def _reclassify_archive(self, filepath, url, dat=None):
         """After downloading, reclassify if the file landed in 'other'.
 
-        Tries two strategies:
+        A DAT match (dat, from _dat_check) is authoritative: an auto-detect
+        job moves the file to the DAT's system wherever it landed.
+        Otherwise tries two strategies:
         1. Archive peek: look inside .zip/.7z/.rar for known ROM extensions
         2. Header analysis: read binary headers from .chd/.iso/.bin files
         """
-        if filepath.parent.name != "other":
-            return filepath  # Already classified
-
         ext = filepath.suffix.lower()
-        new_system = None
+        new_system = source = None
+
+        if (dat and dat["system"] and dat["status"] != "mismatch" and self.system == "auto"
+                and dat["system"] != filepath.parent.name):
+            new_system, source = dat["system"], "DAT"
+        elif filepath.parent.name != "other":
+            return filepath  # Already classified
 
         # Strategy 1: peek inside archives
-        if ext in (".zip", ".7z", ".rar"):
+        if not new_system and ext in (".zip", ".7z", ".rar"):
             new_system = self._peek_archive_system(filepath)
 
         # Strategy 2: binary header analysis for disc images
@@ -1323,22 +5061,88 @@ class CrawlJob:
             self._log(f"  Reclassify: {filepath.name} -> {new_system}/ (already exists, kept in other/)")
             return filepath
 
-        source = "header" if ext in (".chd", ".iso", ".bin", ".img") else "archive contents"
+        source = source or ("header" if ext in (".chd", ".iso", ".bin", ".img")
+                            else "archive contents")
         filepath.rename(new_path)
         self._log(f"  Reclassify: {filepath.name} -> {new_system}/ (detected from {source})")
         return new_path
 
+    def _dat_check(self, filepath, hashes):
+        """Look a download up in the DATs by what's in it (see _rom_members).
+
+        Returns {"system", "game", "rom", "status"}, status being "verified",
+        "baddump" (the DATs list that dump as bad) or "mismatch" (named like
+        a DAT game, but the ROM data in it isn't that game's), or None if
+        the DATs don't know the file or it has no ROM data to compare. rom
+        is the matched ROM's name when there is exactly one.
+        """
+        index = _dat_index(self._log)
+        if index is None:
+            return None
+        checked = ((set(EXT_TO_SYSTEM) | {".bin", ".cue", ".iso", ".gdi", ".img"})
+                   - _DAT_UNCOMPARABLE)
+        games, matched, unmatched = None, [], 0
+        for name, size, crc, sha1 in _rom_members(filepath, hashes):
+            records = index.find(size, crc, sha1)
+            if not records:
+                # Readmes and the like aren't in DATs; ROM data should be
+                unmatched += Path(name).suffix.lower() in checked
+                continue
+            found = {(r["system"], r["game"]) for r in records}
+            games = found if games is None else games & found
+            matched.extend(records)
+
+        if games:
+            # A ROM in several DATs: prefer the system it's already filed under
+            system, game = min(games, key=lambda g: (g[0] != filepath.parent.name, g))
+            roms = [r for r in matched if (r["system"], r["game"]) == (system, game)]
+            status = ("baddump" if any(r["bad"] for r in roms)
+                      else "mismatch" if unmatched else "verified")
+            return {"system": system, "game": game, "status": status,
+                    "rom": roms[0]["rom"] if len(roms) == 1 else None}
+
+        # Named like a DAT game but with ROM data that isn't in the DATs. A
+        # file with nothing comparable (a CHD, RVZ, unreadable archive...)
+        # is just unknown
+        systems = index.systems_named(filepath.stem) if unmatched else None
+        if systems:
+            return {"system": systems.pop() if len(systems) == 1 else "",
+                    "game": filepath.stem, "rom": None, "status": "mismatch"}
+        return None
+
+    def _dat_rename(self, filepath, dat):
+        """Give a DAT-matched file its canonical name: the DAT's ROM name for
+        a bare ROM, else the game's name with the file's own extension."""
+        rom = Path(dat["rom"].replace("\\", "/")).name if dat["rom"] else ""
+        if rom and Path(rom).suffix.lower() == filepath.suffix.lower():
+            name = rom
+        else:
+            name = dat["game"] + filepath.suffix
+        if name == filepath.name or "/" in name or not filepath.exists():
+            return filepath
+        target = filepath.with_name(name)
+        with _CLAIMED_LOCK:
+            taken = target in _CLAIMED_PATHS or target.exists()
+            if not taken:
+                filepath.rename(target)
+        if taken:
+            self._log(f"  DAT name: {name} already exists, kept {filepath.name}")
+            return filepath
+        self._log(f"  DAT name: {filepath.name} -> {name}")
+        return target
+
     # ------------------------------------------------------------------
     # Multi-disc detection + .m3u generation
     # ------------------------------------------------------------------
 
     _DISC_RE = re.compile(r"^(.+?)\s*\(Disc\s*(\d+)\)", re.IGNORECASE)
 
-    def _check_multi_disc(self, filepath):
+    def _check_multi_disc(self, filepath, disc1_url):
         """After downloading a Disc 1 file, look for sibling discs and generate .m3u.
 
-        Only triggers on files matching (Disc 1) pattern. Searches discovered_files
-        for matching sibling disc URLs, and tries URL manipulation as fallback.
+        Only triggers on files matching (Disc 1) pattern. disc1_url is the
+        URL the file came from. Searches discovered_files for matching
+        sibling disc URLs, and tries URL manipulation as fallback.
         After all discs are accounted for, generates the .m3u playlist.
         """
         stem = filepath.stem
@@ -1367,11 +5171,13 @@ class CrawlJob:
                     existing_discs[int(dm.group(2))] = f.name
 
         # Check discovered_files for sibling disc URLs not yet downloaded
+        # (taken under the state lock, as other push workers record theirs)
         sibling_urls = []
         base_lower = base_name.lower()
-        for url in self.discovered_files:
-            if url in self.downloaded_files:
-                continue
+        with _STATE_LOCK:
+            pending = [url for url in self.discovered_files
+                       if url not in self.downloaded_files]
+        for url in pending:
             # Extract filename from URL
             url_path = urllib.parse.urlparse(url).path
             url_fname = urllib.parse.unquote(url_path.split("/")[-1])
@@ -1381,16 +5187,7 @@ class CrawlJob:
 
         # Try URL manipulation as fallback for discs 2-4
         if not sibling_urls:
-            # Find the URL that produced this Disc 1 file
-            disc1_url = None
-            for url in self.downloaded_files:
-                url_path = urllib.parse.urlparse(url).path
-                url_fname = urllib.parse.unquote(url_path.split("/")[-1])
-                if url_fname == filepath.name or base_lower in url_fname.lower():
-                    disc1_url = url
-                    break
-
-            if disc1_url:
+            if not disc1_url.startswith("POST|"):
                 for disc_n in range(2, 5):
                     if disc_n in existing_discs:
                         continue
@@ -1414,29 +5211,7 @@ class CrawlJob:
         # source page URL. Fetch it, parse const media=[...], and construct
         # synthetic POST URLs for sibling disc mediaIds.
         if not sibling_urls:
-            # Find disc1 URL if not already found (covers re-crawl scenarios
-            # where the download URL is a POST synthetic URL)
-            if not disc1_url:
-                for u in self.downloaded_files:
-                    if not isinstance(u, str):
-                        continue
-                    if u.startswith("POST|"):
-                        # For POST URLs, check if the referer page name
-                        # contains the game's base name
-                        parts = u.split("|", 3)
-                        referer = parts[3] if len(parts) > 3 else ""
-                        referer_lower = urllib.parse.unquote(referer).lower()
-                        if base_lower in referer_lower:
-                            disc1_url = u
-                            break
-                    else:
-                        u_path = urllib.parse.urlparse(u).path
-                        u_fname = urllib.parse.unquote(u_path.split("/")[-1])
-                        if u_fname == filepath.name or base_lower in u_fname.lower():
-                            disc1_url = u
-                            break
-
-            if disc1_url and "|" in disc1_url:
+            if "|" in disc1_url:
                 parts = disc1_url.split("|", 3)
                 if len(parts) >= 4:
                     source_page = parts[3]
@@ -1446,39 +5221,24 @@ class CrawlJob:
 
                     self._log(f"  Multi-disc: scraping source page for media array...")
                     try:
-                        html = self._fetch_page_html(source_page)
-                        if html:
-                            page_soup = BeautifulSoup(html, "html.parser")
-                            for script in page_soup.find_all("script"):
-                                script_text = script.string or ""
-                                media_match = re.search(
-                                    r'const\s+media\s*=\s*(\[.+?\]);', script_text)
-                                if not media_match:
-                                    continue
-                                try:
-                                    media_list = json.loads(media_match.group(1))
-                                except (json.JSONDecodeError, ValueError):
-                                    continue
-                                if not isinstance(media_list, list) or len(media_list) <= 1:
-                                    continue
-                                for entry in media_list:
-                                    if not isinstance(entry, dict):
-                                        continue
-                                    mid = str(entry.get("ID", ""))
-                                    if not mid or mid == disc1_mid:
-                                        continue
-                                    disc_post = urllib.parse.urlencode({"mediaId": mid})
-                                    disc_url = f"POST|{form_action}|{disc_post}|{source_page}"
-                                    if disc_url not in self.downloaded_files:
-                                        disc_label = entry.get("Label", f"media {mid}")
-                                        self._log(f"  Multi-disc: found {disc_label} (media {mid})")
-                                        # We don't know the exact disc number from the media array,
-                                        # so assign sequentially after disc 1
-                                        next_disc = max(existing_discs.keys(), default=1) + 1
-                                        while next_disc in existing_discs:
-                                            next_disc += 1
-                                        sibling_urls.append((next_disc, disc_url))
-                                break  # Only process first media array
+                        page = self._fetch_page(source_page)
+                        for entry in (page.media if page and page.media else []):
+                            if not isinstance(entry, dict):
+                                continue
+                            mid = str(entry.get("ID", ""))
+                            if not mid or mid == disc1_mid:
+                                continue
+                            disc_post = urllib.parse.urlencode({"mediaId": mid})
+                            disc_url = f"POST|{form_action}|{disc_post}|{source_page}"
+                            if disc_url not in self.downloaded_files:
+                                disc_label = entry.get("Label", f"media {mid}")
+                                self._log(f"  Multi-disc: found {disc_label} (media {mid})")
+                                # We don't know the exact disc number from the media array,
+                                # so assign sequentially after disc 1
+                                next_disc = max(existing_discs.keys(), default=1) + 1
+                                while next_disc in existing_discs:
+                                    next_disc += 1
+                                sibling_urls.append((next_disc, disc_url))
                     except Exception as e:
                         self._log(f"  Multi-disc: scrape failed — {e}")
 
@@ -1487,7 +5247,8 @@ class CrawlJob:
             if disc_n in existing_discs:
                 continue
             self._log(f"  Multi-disc: downloading Disc {disc_n}...")
-            success = self.download_file(url)
+            # inline: the file must be converted before the re-scan below
+            success = self.download_file(url, inline=True)
             if success:
                 # Re-scan directory for the new file
                 for f in system_dir.iterdir():
@@ -1551,7 +5312,7 @@ class CrawlJob:
         m3u_count = 0
 
         for system_dir in self.output_dir.iterdir():
-            if not system_dir.is_dir():
+            if not system_dir.is_dir() or system_dir.name.startswith("."):
                 continue
 
             # Group disc files by base name
@@ -1684,8 +5445,7 @@ class CrawlJob:
 
         self._log(f"  Packing to zip: {filepath.name}")
         try:
-            with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED, compresslevel=9) as zf:
-                zf.write(filepath, filepath.name)
+            self._write_zip(zip_path, [filepath])
 
             orig_size = filepath.stat().st_size
             new_size = zip_path.stat().st_size
@@ -1701,52 +5461,93 @@ class CrawlJob:
                 zip_path.unlink()
             return filepath
 
+    def _write_zip(self, zip_path, files):
+        """Deflate files (flat, by name) into zip_path, hashing the archive
+        as it's written; the digests wait in _output_hashes for _post_stage."""
+        hasher = _MultiHasher()
+        with open(zip_path, "wb") as out:
+            with zipfile.ZipFile(_HashingWriter(out, hasher), "w", zipfile.ZIP_DEFLATED,
+                                 compresslevel=9) as zf:
+                for f in files:
+                    zf.write(f, f.name)
+        self._output_hashes[zip_path] = hasher.hexdigests()
+
+    def _stream_repack(self, filepath, zip_path, members):
+        """Repack a .7z or .rar as zip_path, decompressing each member straight
+        into its zip entry: no extraction directory, one pass over the data.
+        The archive is hashed as it's written (see _write_zip). A .7z needs
+        HAS_PY7ZR_FACTORY."""
+        hasher = _MultiHasher()
+        with open(zip_path, "wb") as out:
+            with zipfile.ZipFile(_HashingWriter(out, hasher), "w") as zf:
+                if filepath.suffix.lower() == ".7z":
+                    repacker = _ZipRepacker(zf, members)
+                    # From a file object, py7zr decompresses serially
+                    try:
+                        with open(filepath, "rb") as fp, py7zr.SevenZipFile(fp, "r") as sz:
+                            sz.extract(factory=repacker)
+                    finally:
+                        # An entry left open would fail the zip's close
+                        # and mask what went wrong
+                        repacker.finish()
+                else:
+                    with rarfile.RarFile(filepath, "r") as rf:
+                        for member in members:
+                            with rf.open(member["name"]) as src, \
+                                    _open_zip_entry(zf, member) as dst:
+                                shutil.copyfileobj(src, dst, 1024 * 1024)
+        self._output_hashes[zip_path] = hasher.hexdigests()
+
     def _reprocess_archive(self, filepath):
-        """Extract a .7z or .rar, convert/repack contents optimally, clean up."""
+        """Convert/repack a .7z or .rar optimally, clean up.
+
+        The contents are classified from the archive's own listing. Disc
+        images with a cue/gdi sheet are extracted for chdman; everything
+        else is streamed member by member into the new zip.
+        """
         ext = filepath.suffix.lower()
         stem = filepath.stem
         parent = filepath.parent
         tmp_dir = parent / f".extract_{stem}"
 
         try:
-            tmp_dir.mkdir(parents=True, exist_ok=True)
-
-            # Extract
-            self._log(f"  Extracting {filepath.name}...")
-            if ext == ".7z":
-                with py7zr.SevenZipFile(filepath, "r") as sz:
-                    sz.extractall(tmp_dir)
-            elif ext == ".rar":
-                with rarfile.RarFile(filepath, "r") as rf:
-                    rf.extractall(tmp_dir)
-            else:
+            if ext not in (".7z", ".rar"):
                 return filepath  # Shouldn't happen
+            members = _archive_members(filepath)
 
-            # Collect extracted files
-            extracted = list(tmp_dir.rglob("*"))
-            extracted_files = [f for f in extracted if f.is_file()]
-
-            if not extracted_files:
+            if not members:
                 self._log(f"  Archive was empty, keeping original")
-                shutil.rmtree(tmp_dir, ignore_errors=True)
                 return filepath
 
             # Classify contents
-            has_disc = any(f.suffix.lower() in DISC_IMAGE_EXTENSIONS for f in extracted_files)
-            has_cue = any(f.suffix.lower() == ".cue" for f in extracted_files)
-            has_gdi = any(f.suffix.lower() == ".gdi" for f in extracted_files)
-
-            if has_disc and (has_cue or has_gdi):
-                # Disc image with cue/gdi sheet — convert to CHD
-                cue_file = next((f for f in extracted_files if f.suffix.lower() in (".cue", ".gdi")), None)
+            suffixes = {Path(m["name"]).suffix.lower() for m in members}
+            has_disc = bool(suffixes & DISC_IMAGE_EXTENSIONS)
+            has_sheet = bool(suffixes & {".cue", ".gdi"})
+
+            extracted_files = None
+            to_chd = has_disc and has_sheet and os.path.isfile(CHDMAN_BIN)
+            if to_chd or (ext == ".7z" and not HAS_PY7ZR_FACTORY):
+                # Disc image with cue/gdi sheet — chdman needs real files,
+                # and so does repacking a .7z with a py7zr older than 1.0
+                tmp_dir.mkdir(parents=True, exist_ok=True)
+                self._log(f"  Extracting {filepath.name}...")
+                if ext == ".7z":
+                    with py7zr.SevenZipFile(filepath, "r") as sz:
+                        sz.extractall(tmp_dir)
+                else:
+                    with rarfile.RarFile(filepath, "r") as rf:
+                        rf.extractall(tmp_dir)
+                extracted_files = [f for f in tmp_dir.rglob("*") if f.is_file()]
+            if to_chd:
+                cue_file = next((f for f in extracted_files
+                                 if f.suffix.lower() in (".cue", ".gdi")), None)
                 if cue_file:
                     chd_name = stem + ".chd"
                     chd_path = parent / chd_name
                     self._log(f"  Converting disc image to CHD...")
                     try:
-                        cmd_type = "createcd" if cue_file.suffix.lower() in (".cue", ".gdi") else "createdvd"
                         result = subprocess.run(
-                            [CHDMAN_BIN, cmd_type, "-i", str(cue_file), "-o", str(chd_path)],
+                            [CHDMAN_BIN, "createcd", "-i", str(cue_file), "-o", str(chd_path)],
                             capture_output=True, text=True, timeout=600,
                         )
                         if result.returncode == 0:
@@ -1763,13 +5564,14 @@ class CrawlJob:
                         self._log(f"  CHD convert error: {e}")
                     # Fallthrough — CHD failed, repack as zip instead
 
-            # Repack all extracted files as .zip (RetroArch can't handle .7z LZMA2)
+            # Repack all files as .zip (RetroArch can't handle .7z LZMA2)
             zip_path = parent / (stem + ".zip")
             self._log(f"  Repacking as zip...")
             try:
-                with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED, compresslevel=9) as zf:
-                    for f in extracted_files:
-                        zf.write(f, f.name)
+                if extracted_files:
+                    self._write_zip(zip_path, extracted_files)
+                else:
+                    self._stream_repack(filepath, zip_path, members)
 
                 orig_size = filepath.stat().st_size
                 new_size = zip_path.stat().st_size
@@ -1778,7 +5580,7 @@ class CrawlJob:
                 filepath.unlink()
                 shutil.rmtree(tmp_dir, ignore_errors=True)
                 return zip_path
-            except (OSError, zipfile.BadZipFile) as e:
+            except _ARCHIVE_ERRORS as e:  # includes corrupt data found mid-stream
                 self._log(f"  zip repack error: {e}")
                 if zip_path.exists():
                     zip_path.unlink()
@@ -1837,13 +5639,14 @@ class CrawlJob:
             self._nas_unreachable_warned = False
         return self._nas_reachable
 
-    def _trickle_push(self, filepath):
+    def _trickle_push(self, filepath, sha256=None):
         """Push a single downloaded file directly to the NAS via SCP.
 
         - Checks NAS reachability (cached for 60s)
         - Uses SCP to push the file directly to NAS_EXPORT/NAS_ROM_SUBDIR/<system>/
         - Sets file permissions so SSHFS on device can read it
         - Deletes the local file on success
+        - Notes the file (with its sha256, if known) in the NAS manifest
         - Logs success/failure
 
         Returns True if the file was pushed and deleted, False otherwise.
@@ -1910,13 +5713,16 @@ class CrawlJob:
             # internally, so remote paths are used as-is — no shell escaping)
             scp_dst = f"{ssh_target}:{target_dir}/{filename}"
 
-            result = subprocess.run(
-                ["scp", "-i", ssh_key,
-                 "-o", "StrictHostKeyChecking=accept-new",
-                 "-o", "ConnectTimeout=10",
-                 str(filepath), scp_dst],
-                capture_output=True, text=True, timeout=600,
-            )
+            with (self.push_bandwidth.lease() if self.push_bandwidth
+                  else contextlib.nullcontext(0)) as rate:
+                result = subprocess.run(
+                    ["scp", "-i", ssh_key, *_scp_limit(rate),
+                     "-o", "StrictHostKeyChecking=accept-new",
+                     "-o", "ConnectTimeout=10",
+                     str(filepath), scp_dst],
+                    capture_output=True, text=True,
+                    timeout=_scp_timeout(filepath.stat().st_size, rate),
+                )
 
             if result.returncode == 0:
                 # Set permissions so SSHFS on device can read the file
@@ -1927,6 +5733,9 @@ class CrawlJob:
                      f"chmod a+r \"{target_dir}/{filename}\""],
                     capture_output=True, text=True, timeout=10,
                 )
+                if self.nas is not None:
+                    self.nas.note(str(rel_path.parent), filename, filepath.stat().st_size,
+                                  sha256 if sha256 != "unknown" else None)
                 # Delete local file on success
                 filepath.unlink()
                 self._log(f"[TRICKLE] Pushed and cleaned: {rel_path}")
@@ -1978,9 +5787,9 @@ class CrawlJob:
     """
 
     def _init_browser(self):
-        """Lazy-init Playwright browser for JS rendering and downloads.
+        """Lazy-init the Playwright browser used for browser downloads.
         Also recovers if the browser process died unexpectedly.
-        Applies stealth patches to avoid headless browser detection."""
+        (JS rendering uses the page pool — see _browser_pool.)"""
         # Allow init for downloads even if js_mode is off — downloads
         # need a browser when direct POST is blocked by bot protection.
         if not self.js_mode and not HAS_PLAYWRIGHT:
@@ -1994,7 +5803,6 @@ class CrawlJob:
                 self._log("  Browser process died, reinitializing...")
                 self._pw = None
                 self._browser = None
-                self._page = None
         if self._pw is None:
             self._pw = sync_playwright().start()
             self._browser = self._pw.chromium.launch(
@@ -2003,16 +5811,46 @@ class CrawlJob:
                     "--disable-blink-features=AutomationControlled",
                     "--no-sandbox",
                 ],
+                # Downloads land on the staging filesystem, so finished
+                # ones can be renamed into place rather than copied
+                downloads_path=str(self._incoming_dir()),
             )
-            self._page = self._browser.new_page()
-            self._page.add_init_script(self._STEALTH_JS)
-            self._page.set_extra_http_headers({
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                              "AppleWebKit/537.36 Chrome/131.0.0.0 Safari/537.36",
-            })
+
+    def _incoming_dir(self):
+        """<output_dir>/.incoming: where browser downloads are written.
+
+        Shared by every job on this staging dir, so it is never wiped; only
+        files nobody has written to for a day (left by a crash) are removed.
+        """
+        incoming = self.output_dir / ".incoming"
+        incoming.mkdir(parents=True, exist_ok=True)
+        cutoff = time.time() - 86400
+        for entry in incoming.iterdir():
+            try:
+                if entry.stat().st_mtime < cutoff:
+                    if entry.is_dir():
+                        shutil.rmtree(entry, ignore_errors=True)
+                    else:
+                        entry.unlink()
+            except OSError:
+                pass
+        return incoming
 
     def _close_browser(self):
         """Clean up Playwright. Safe to call even if browser is already dead."""
+        with self._browser_thread_lock:
+            executor, self._browser_thread = self._browser_thread, None
+        if executor is not None:
+            executor.submit(self._stop_playwright).result()
+            executor.shutdown()
+        else:
+            self._stop_playwright()
+        with self._js_pool_lock:
+            pool, self._js_pool = self._js_pool, None
+        if pool is not None:
+            pool.close()
+
+    def _stop_playwright(self):
         try:
             if self._browser:
                 self._browser.close()
@@ -2025,94 +5863,225 @@ class CrawlJob:
             pass
         self._pw = None
         self._browser = None
-        self._page = None
 
-    def _fetch_page_html(self, url):
-        """Fetch page HTML. Uses requests first (fast), falls back to
-        Playwright only if JS mode is on AND the requests fetch fails or
-        returns a page with no links (sign of JS-rendered content)."""
+    def _fetch_page_static(self, url):
+        """Fetch and extract a page with requests. Safe to call from page workers.
 
-        # Always try requests first — it's 10x faster than a headless browser
-        html = None
+        Returns (PageExtract or None, needs_js). needs_js is True when the
+        fetch failed or the page has so few links it's probably rendered
+        client-side — the caller may retry it in Playwright if JS mode is on.
+        """
+        cached = self.page_cache.get(url) if self.page_cache else None
         try:
-            resp = self.session.get(url, timeout=30, allow_redirects=True)
+            resp = self.page_session.get(url, timeout=30, allow_redirects=True,
+                                         headers=_PageCache.conditional_headers(cached))
+            if resp.status_code in (429, 503):
+                raise _RateLimited(resp.status_code, resp.headers.get("retry-after"))
+            self.page_throttle.success(url)
+            if resp.status_code == 304 and cached:
+                self.pages_unchanged += 1
+                page = PageExtract.from_dict(cached["page"])
+                return page, len(page.links) <= 2
             resp.raise_for_status()
             if "text/html" not in resp.headers.get("content-type", ""):
-                return None
-            html = resp.text
+                return None, False
+            body = resp.content
         except requests.RequestException as e:
-            msg = str(e)
-            if "SSLError" in msg or "SSL" in msg:
-                msg = "SSL certificate error -- site has a broken cert chain"
-            elif len(msg) > 120:
-                msg = msg[:120] + "..."
-            self._log(f"  Error fetching page: {msg}")
-
-        # If requests got HTML, check if it has links — if yes, no need for JS
-        if html:
-            soup = BeautifulSoup(html, "html.parser")
-            link_count = len(soup.find_all("a", href=True))
-            if link_count > 2:
-                return html  # Normal page, no need for browser rendering
-            # Very few links — might be JS-rendered, fall through to Playwright
-
-        # Fall back to Playwright if JS mode is on
-        if self.js_mode:
-            self._init_browser()
+            self._log_fetch_error(e)
+            return None, True
+
+        page = self._page_from_body(url, cached, resp, body,
+                                    lambda: resp.text)
+        # Very few links — might be JS-rendered
+        return page, len(page.links) <= 2
+
+    def _log_fetch_error(self, e):
+        msg = str(e)
+        if "SSLError" in msg or "SSL" in msg:
+            msg = "SSL certificate error -- site has a broken cert chain"
+        elif len(msg) > 120:
+            msg = msg[:120] + "..."
+        self._log(f"  Error fetching page: {msg}")
+
+    def _page_from_body(self, url, cached, resp, body, get_text):
+        """Extract a freshly fetched page, or reuse the cached extraction if
+        the body is byte-identical (server ignored the validators). Shared
+        by both crawl engines; resp only needs a case-insensitive .headers.
+        get_text decodes the body — only called when a parse is needed."""
+        digest = hashlib.sha256(body).hexdigest()
+        if cached and cached.get("digest") == digest:
+            self.pages_unchanged += 1
+            page = PageExtract.from_dict(cached["page"])
+        else:
+            page = _extract_page(get_text(), self.page_parser)
+        if self.page_cache:
+            self.page_cache.put(url, resp, digest, page)
+        return page
+
+    def _browser_pool(self):
+        """The JS render pool, started on first use (one page per worker)."""
+        with self._js_pool_lock:
+            if self._js_pool is None:
+                self._js_pool = _BrowserPool(
+                    self.page_workers, self._STEALTH_JS,
+                    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+                    "AppleWebKit/537.36 Chrome/131.0.0.0 Safari/537.36",
+                    self._log)
+            return self._js_pool
+
+    def _render_page_js(self, url):
+        """Render a page in Playwright and return its PageExtract, or None on
+        errors. Safe to call from any thread — renders run in the pool."""
+        html = self._browser_pool().render(url)
+        return _extract_page(html, self.page_parser) if html else None
+
+    def _fetch_page(self, url):
+        """Fetch a page and return its PageExtract (or None). Uses requests
+        first (fast), falls back to Playwright only if JS mode is on AND the
+        requests fetch fails or returns a page with no links (sign of
+        JS-rendered content)."""
+        for _ in range(_RETRY_LIMIT + 1):
+            self._throttle_wait(self.page_throttle, url)
             try:
-                self._page.goto(url, timeout=60000, wait_until="domcontentloaded")
-                # Wait a bit for JS to render, but don't wait for every asset
-                self._page.wait_for_timeout(3000)
-                return self._page.content()
-            except Exception as e:
-                msg = str(e)
-                if len(msg) > 120:
-                    msg = msg[:120] + "..."
-                self._log(f"  JS render error: {msg}")
-                return html  # Return whatever requests got, even if sparse
+                page, needs_js = self._fetch_page_static(url)
+                break
+            except _RateLimited as e:
+                self._rate_limited(self.page_throttle, url, e)
+        else:
+            return None
+        if needs_js and self.js_mode:
+            return self._render_page_js(url) or page
+        return page
 
-        return html
+    def _page_worker(self, frontier, results):
+        """Page-fetch worker: pop pages off the frontier, fetch and parse them.
 
-    def crawl_page(self, url, depth=0):
-        if self.stop_requested:
-            return
+        Pages that look JS-rendered are rendered right here through the
+        browser pool when JS mode is on, so renders overlap across workers.
+        """
+        while True:
+            entry = frontier.pop()
+            if entry is None:
+                return
+            url, depth = entry
+            if self.stop_requested:
+                results.put((url, depth, None))
+                continue
+
+            short_url = url.replace(self.base_url, "~")
+            self._log(f"Crawl: {short_url} (depth {depth})")
+
+            page = None
+            try:
+                page, needs_js = self._fetch_page_static(url)
+                if needs_js and self.js_mode and not self.stop_requested:
+                    # Keep whatever requests got if the render fails
+                    page = self._render_page_js(url) or page
+            except _RateLimited as e:
+                # Back off this host and hand the page back to the frontier,
+                # which holds it until the host's throttle lets it through
+                self._rate_limited(self.page_throttle, url, e)
+                if frontier.retry_later(url):
+                    continue
+                self._log(f"  Giving up on page after {_RETRY_LIMIT} retries")
+            except Exception as e:
+                self._log(f"  Error fetching page: {e}")
+            results.put((url, depth, page))
+
+    def _rate_limited(self, throttle, url, error):
+        """Record a 429/503 from url's host and log the backoff."""
+        wait = throttle.penalize(url, error.retry_after)
+        host = urllib.parse.urlparse(url).netloc
+        self._log(f"  Rate limited by {host} ({error}), backing off {wait:.0f}s")
+
+    def _throttle_wait(self, throttle, url):
+        """Block until url's host has a free token. Returns early on stop."""
+        deadline = time.monotonic() + throttle.reserve(url)
+        while not self.stop_requested:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            time.sleep(min(remaining, 0.5))
+
+    def _enqueue_page(self, frontier, url, depth, priority):
+        """Queue a page on the frontier if it's in scope and not yet crawled."""
         if depth > self.max_depth:
-            return
+            return False
         if url in self.visited_pages:
-            return
+            return False
         if not self._is_same_domain(url):
-            return
+            return False
 
         # Skip detail pages (game pages) if we already have a download from this URL.
         # This saves ~20-30s per game page on re-crawls.
         url_path = urllib.parse.urlparse(url).path.rstrip("/")
         last_seg = url_path.split("/")[-1] if url_path else ""
-        if last_seg.isdigit() and self.downloaded_files:
-            # Check if any already-downloaded file references this page URL
-            already_have = any(url in dl for dl in self.downloaded_files)
-            if already_have:
-                self.visited_pages.add(url)
-                self.pages_crawled = len(self.visited_pages)
-                return
+        if last_seg.isdigit() and url in self._pages_with_downloads:
+            self.visited_pages.add(url)
+            self.pages_crawled = len(self.visited_pages)
+            return False
+
+        return frontier.push(url, depth, priority)
+
+    def crawl_page(self, url, depth=0):
+        """Crawl the site starting at url.
 
-        short_url = url.replace(self.base_url, "~")
-        self._log(f"Crawl: {short_url} (depth {depth})")
+        A pool of page workers fetches and parses pages off a priority
+        frontier while this thread records what each page yields, downloads
+        its files, and queues the links it found. Runs until the frontier
+        drains or a stop is requested.
+        """
+        if self.engine == "asyncio":
+            if HAS_AIOHTTP:
+                _AsyncCrawl(self).run(url, depth)
+                return
+            self._log("asyncio engine needs aiohttp (pip install aiohttp) "
+                      "-- using threads")
 
-        html = self._fetch_page_html(url)
-        if html is None:
-            # Don't mark as visited so retries can try again
+        frontier = _CrawlFrontier(self.host_concurrency,
+                                  max_pending=self.page_workers * 4,
+                                  throttle=self.page_throttle)
+        if not self._enqueue_page(frontier, url, depth, _CrawlFrontier.CHILD):
             return
 
-        self.visited_pages.add(url)
-        self.pages_crawled = len(self.visited_pages)
+        results = queue.Queue()
+        workers = [
+            threading.Thread(target=self._page_worker, args=(frontier, results),
+                             daemon=True)
+            for _ in range(self.page_workers)
+        ]
+        for w in workers:
+            w.start()
 
-        soup = BeautifulSoup(html, "html.parser")
-        links = set()
-        pre_scan_count = len(self.discovered_files)  # track what's new on THIS page
+        try:
+            while not self.stop_requested:
+                try:
+                    page_url, page_depth, page = results.get(timeout=0.5)
+                except queue.Empty:
+                    if frontier.drained():
+                        break
+                    continue
 
-        # --- Scan <a href> links ---
-        for tag in soup.find_all("a", href=True):
-            href = tag["href"].strip()
+                retry = True
+                try:
+                    if page is not None and not self.stop_requested:
+                        # Don't mark failed fetches as visited so a later
+                        # link to the same page can try again
+                        retry = False
+                        self._process_page(frontier, page_url, page_depth, page)
+                finally:
+                    frontier.done(page_url, retry=retry)
+        finally:
+            frontier.close()
+
+    def _scan_links(self, page, url):
+        """Scan a page's <a href> links.
+
+        Downloadable links are added to discovered_files; returns the set of
+        same-domain page links not yet visited.
+        """
+        links = set()
+        for href in page.links:
             if not href or href.startswith("#") or href.startswith("mailto:"):
                 continue
             if href.startswith("javascript:"):
@@ -2123,33 +6092,63 @@ class CrawlJob:
                 continue
 
             if self._is_downloadable(full_url):
-                if full_url not in self.downloaded_files and full_url not in [f for f in self.discovered_files]:
+                if full_url not in self.downloaded_files and full_url not in self.discovered_files:
                     name = urllib.parse.unquote(Path(full_url).name)
                     self._log(f"  Found: {name}")
-                    self.discovered_files.append(full_url)
+                    self.discovered_files.add(full_url, page.listing.get(href))
+                    if MIRROR_FAILOVER:
+                        self.mirrors.add(full_url, self.discovered_files)
+                    self._found_on[full_url] = url
                     self.files_found = len(self.discovered_files) + len(self.downloaded_files)
             elif self._is_page(full_url):
                 if full_url not in self.visited_pages:
                     links.add(full_url)
+        return links
+
+    def _listing_fingerprint(self, page, url):
+        """Content fingerprint of a listing: its resolved links, file entries
+        and visible text. The text catches the size/date columns of directory
+        listings, which change when anything below them does."""
+        links = sorted({self._normalize_url(href, url) for href in page.links
+                        if href and not href.startswith(("#", "mailto:", "javascript:"))})
+        forms = sorted(f"{action}|{urllib.parse.urlencode(sorted(data.items()))}"
+                       for action, data in page.forms)
+        media = sorted(str(e.get("ID", "")) for e in (page.media or [])
+                       if isinstance(e, dict))
+        blob = json.dumps([links, forms, media, sorted(page.js_urls), page.text_hash])
+        return hashlib.sha256(blob.encode()).hexdigest()
+
+    def _listing_unchanged(self, url, depth, fp):
+        """Record this listing's fingerprint; True if its subtree can be
+        pruned (incremental mode, same fingerprint, and last crawled at least
+        as deep as we would go now)."""
+        budget = self.max_depth - depth
+        prev = self.listing_fingerprints.get(url)
+        unchanged = bool(prev and prev.get("fp") == fp
+                         and prev.get("depth", -1) >= budget)
+        if unchanged:
+            budget = prev["depth"]
+        self._new_fingerprints[url] = {
+            "fp": fp, "seen": time.strftime("%Y-%m-%d %H:%M:%S"), "depth": budget,
+        }
+        return unchanged and self.incremental
 
-        # --- Scan <form> tags for download actions ---
-        for form in soup.find_all("form"):
-            action = form.get("action", "").strip()
-            if not action or action == "#":
-                continue
-            method = (form.get("method", "GET") or "GET").upper()
-            if method != "POST":
-                continue
+    def _process_page(self, frontier, url, depth, page, download=True):
+        """Record one fetched page: discover its files, download them, and
+        queue the pages it links to.
 
-            action_url = self._normalize_url(action, url)
+        With download=False the page's new files are returned instead of
+        downloaded inline — the asyncio engine downloads them itself.
+        """
+        self.visited_pages.add(url)
+        self.pages_crawled = len(self.visited_pages)
 
-            # Collect hidden inputs as POST data
-            form_data = {}
-            for inp in form.find_all("input"):
-                name = inp.get("name")
-                val = inp.get("value", "")
-                if name:
-                    form_data[name] = val
+        pre_scan_count = len(self.discovered_files)  # track what's new on THIS page
+        links = self._scan_links(page, url)
+
+        # --- Scan POST forms for download actions ---
+        for action, form_data in page.forms:
+            action_url = self._normalize_url(action, url)
 
             # Heuristic: if form has mediaId, downloadId, fileId, or similar,
             # it's likely a download form
@@ -2163,12 +6162,9 @@ class CrawlJob:
             synthetic_url = f"POST|{action_url}|{post_params}|{url}"
 
             if synthetic_url not in self.downloaded_files and \
-               synthetic_url not in [f for f in self.discovered_files]:
-                # Try to get a name from the page title or form context
-                title_tag = soup.find("title")
-                page_title = title_tag.get_text(strip=True) if title_tag else ""
-                h1 = soup.find("h1")
-                game_name = h1.get_text(strip=True) if h1 else page_title
+               synthetic_url not in self.discovered_files:
+                # Try to get a name from the page title
+                game_name = page.title
                 # Strip common site name prefixes from titles
                 for prefix in ["The Vault:", "The Vault", "Vimm's Lair:",
                                "Vimm's Lair", "CoolROM.com -"]:
@@ -2180,7 +6176,7 @@ class CrawlJob:
                     game_name = f"download_{form_data.get('mediaId', form_data.get('id', 'unknown'))}"
 
                 self._log(f"  Found (form): {game_name}")
-                self.discovered_files.append(synthetic_url)
+                self.discovered_files.add(synthetic_url)
                 self.files_found = len(self.discovered_files) + len(self.downloaded_files)
 
                 # Extract system hint from page-level game name
@@ -2190,58 +6186,28 @@ class CrawlJob:
                     self._url_system_hints[synthetic_url] = hint_system
 
         # --- Scan Vimm's JS media array for additional disc mediaIds ---
-        # Vimm embeds all disc data in: const media=[{"ID":5122,...},{"ID":13604,...}]
         # The form scanner captures only the default disc's mediaId.
-        # This pass discovers additional discs for multi-disc games.
-        for script in soup.find_all("script"):
-            script_text = script.string or ""
-            media_match = re.search(r'const\s+media\s*=\s*(\[.+?\]);', script_text)
-            if not media_match:
-                continue
-            try:
-                media_list = json.loads(media_match.group(1))
-            except (json.JSONDecodeError, ValueError):
-                continue
-            if not isinstance(media_list, list) or len(media_list) <= 1:
-                continue  # Single disc — already handled by form scanner
-
-            # Find the form action URL from any download form on this page
-            form_action = None
-            for form in soup.find_all("form"):
-                action = form.get("action", "").strip()
-                method = (form.get("method", "GET") or "GET").upper()
-                if action and action != "#" and method == "POST":
-                    form_action = self._normalize_url(action, url)
-                    break
-            if not form_action:
-                continue
+        # This pass discovers additional discs for multi-disc games, using
+        # the action URL of the page's first POST form.
+        if page.media and page.forms:
+            form_action = self._normalize_url(page.forms[0][0], url)
 
-            # Collect mediaIds already discovered by the form scanner
-            existing_ids = set()
-            for disc_url in self.discovered_files + list(self.downloaded_files):
-                if not isinstance(disc_url, str) or not disc_url.startswith("POST|"):
-                    continue
-                disc_params = dict(urllib.parse.parse_qsl(disc_url.split("|", 3)[2]))
-                mid = disc_params.get("mediaId")
-                if mid:
-                    existing_ids.add(mid)
+            # mediaIds already discovered by the form scanner
+            existing_ids = self.discovered_files.media_ids
 
             # Get game name for logging
-            title_tag = soup.find("title")
-            h1 = soup.find("h1")
-            game_name = h1.get_text(strip=True) if h1 else (
-                title_tag.get_text(strip=True) if title_tag else "")
+            game_name = page.title
             for prefix in ["The Vault:", "The Vault", "Vimm's Lair:",
                            "Vimm's Lair"]:
                 if game_name.startswith(prefix):
                     game_name = game_name[len(prefix):]
             game_name = re.sub(r'[<>:"/\\|?*]', '', game_name).strip()
 
-            for entry in media_list:
+            for entry in page.media:
                 if not isinstance(entry, dict):
                     continue
                 mid = str(entry.get("ID", ""))
-                if not mid or mid in existing_ids:
+                if not mid or mid in existing_ids or mid in self._downloaded_media:
                     continue
                 # Build synthetic POST URL for this disc
                 disc_params = urllib.parse.urlencode({"mediaId": mid})
@@ -2250,79 +6216,58 @@ class CrawlJob:
                    disc_synthetic not in self.discovered_files:
                     disc_label = entry.get("Label", f"Disc (media {mid})")
                     self._log(f"  Found (media): {game_name} — {disc_label}")
-                    self.discovered_files.append(disc_synthetic)
+                    self.discovered_files.add(disc_synthetic)
                     self.files_found = len(self.discovered_files) + len(self.downloaded_files)
 
                     # Carry system hint to multi-disc entries
                     hint_system = self._extract_system_hint(game_name)
                     if hint_system:
                         self._url_system_hints[disc_synthetic] = hint_system
-            break  # Only process the first media array found
-
-        # --- Scan inline <script> for JS-embedded download URLs ---
-        # Sites like CoolROM hide download URLs in JavaScript (e.g.,
-        # window.location.href = "https://dl.coolrom.com.au/dl/ID/TOKEN/TS/")
-        # instead of <a href> or <form> tags.
-        if not self.discovered_files[pre_scan_count:]:
-            for script in soup.find_all("script"):
-                script_text = script.string or ""
-                # Match URLs pointing to a download subdomain or /dl/ path
-                for m in re.finditer(
-                    r'(?:window\.(?:location\.href|open)\s*[=(]\s*["\'])'
-                    r'(https?://dl\.[^"\']+)',
-                    script_text
-                ):
-                    dl_url = m.group(1)
-                    if dl_url in self.downloaded_files or dl_url in self.discovered_files:
-                        continue
-                    # Derive a filename from the page title
-                    title_tag = soup.find("title")
-                    h1 = soup.find("h1")
-                    game_name = (h1.get_text(strip=True) if h1
-                                 else title_tag.get_text(strip=True) if title_tag
-                                 else "")
-                    for prefix in ["CoolROM.com -", "CoolROM -"]:
-                        if game_name.startswith(prefix):
-                            game_name = game_name[len(prefix):].strip()
-                    game_name = re.sub(r'[<>:"/\\|?*]', '', game_name).strip()
-                    if game_name:
-                        self._log(f"  Found (js): {game_name}")
-                    else:
-                        self._log(f"  Found (js): {dl_url}")
-                    self.discovered_files.append(dl_url)
-                    self.files_found = len(self.discovered_files) + len(self.downloaded_files)
-                    break  # one download URL per page is enough
-                if self.discovered_files[pre_scan_count:]:
-                    break
 
-        # --- Download immediately: files found on THIS page ---
+        # --- JS-embedded download URLs (CoolROM-style) ---
+        # Only when the page had no <a href> or <form> downloads.
+        if len(self.discovered_files) == pre_scan_count:
+            for dl_url in page.js_urls:
+                if dl_url in self.downloaded_files or dl_url in self.discovered_files:
+                    continue
+                # Derive a display name from the page title
+                game_name = page.title
+                for prefix in ["CoolROM.com -", "CoolROM -"]:
+                    if game_name.startswith(prefix):
+                        game_name = game_name[len(prefix):].strip()
+                game_name = re.sub(r'[<>:"/\\|?*]', '', game_name).strip()
+                if game_name:
+                    self._log(f"  Found (js): {game_name}")
+                else:
+                    self._log(f"  Found (js): {dl_url}")
+                self.discovered_files.add(dl_url)
+                self._found_on[dl_url] = url
+                self.files_found = len(self.discovered_files) + len(self.downloaded_files)
+                break  # one download URL per page is enough
+
+        # --- Download right away: files found on THIS page ---
         # Instead of queuing everything up for a post-crawl download phase,
-        # we download as we go. Each system's games are downloaded before
-        # moving on to the next system.
+        # files go to the download pipeline as they're found, so each
+        # system's games download while the crawl moves on.
         page_downloads = self.discovered_files[pre_scan_count:]  # only new finds
-        if page_downloads:
-            self.status = "downloading"
+        if page_downloads and download:
+            if not self.stop_requested:
+                self._probe_sizes(page_downloads)
             for dl_url in page_downloads:
                 if self.stop_requested:
-                    return
-                self.files_total = len(self.discovered_files) - len(self.downloaded_files)
-                dl_num = len(self.downloaded_files) + 1
-                self.phase = f"Downloading ({dl_num} done, {self.files_total} remain)"
-
-                if self.download_file(dl_url):
-                    self.files_downloaded += 1
+                    return []
+                if self._pipeline is not None:
+                    self._pipeline.download.put(dl_url)
                 else:
-                    self.files_failed += 1
-
-                # Politeness delay between downloads
-                if not self.stop_requested:
-                    time.sleep(self.delay)
-
-            self.status = "crawling"
-            self.phase = "Crawling for files..."
+                    self._download_stage(dl_url)
+            page_downloads = []
 
         self._save_state()
+        self._queue_links(frontier, url, depth, page, links)
+        return page_downloads
 
+    def _queue_links(self, frontier, url, depth, page, links):
+        """Classify a page's links and queue the ones worth crawling."""
         # Split links into detail pages (likely have downloads), child nav pages
         # (deeper in the hierarchy), and pagination pages (same level, different
         # query params).  Process detail pages FIRST so we find files before
@@ -2348,28 +6293,45 @@ class CrawlJob:
                     else:
                         pagination_pages.append(link)
 
-        # Crawl detail/game pages first (they have download forms)
-        for link in detail_pages:
-            if self.stop_requested:
-                return
-            time.sleep(0.3)  # Light politeness delay for crawling (not downloading)
-            self.crawl_page(link, self.max_depth)
+        if not (detail_pages or child_pages or pagination_pages):
+            return
 
-        # Crawl child nav pages (one level deeper in the hierarchy)
-        for link in child_pages:
-            if self.stop_requested:
-                return
-            time.sleep(0.3)
-            self.crawl_page(link, depth + 1)
+        # Incremental mode: a listing whose links haven't changed since the
+        # last complete crawl has nothing new below it
+        if self._listing_unchanged(url, depth, self._listing_fingerprint(page, url)):
+            self.listings_pruned += 1
+            skipped = len(detail_pages) + len(child_pages) + len(pagination_pages)
+            self._log(f"  Unchanged listing, skipping {skipped} pages below it")
+            return
 
-        # Crawl pagination pages at SAME depth (different slice of same content)
-        for link in pagination_pages:
-            if self.stop_requested:
-                return
-            time.sleep(0.3)
-            self.crawl_page(link, depth)
+        # Queue detail/game pages first (they have download forms), then child
+        # nav pages one level deeper, then pagination at the SAME depth
+        # (different slice of same content). The frontier pops the most
+        # recently queued page first within a class, so push in reverse to
+        # keep sorted order.
+        for links, link_depth, priority in (
+                (pagination_pages, depth, _CrawlFrontier.PAGINATION),
+                (child_pages, depth + 1, _CrawlFrontier.CHILD),
+                (detail_pages, self.max_depth, _CrawlFrontier.DETAIL)):
+            for link in reversed(links):
+                if self._enqueue_page(frontier, link, link_depth, priority):
+                    self._queued_by.setdefault(link, url)
+
+    def _on_browser_thread(self, fn, *args):
+        """Run fn(*args) on the job's browser thread and return its result."""
+        with self._browser_thread_lock:
+            if self._browser_thread is None:
+                self._browser_thread = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=1, thread_name_prefix="browser")
+            executor = self._browser_thread
+        return executor.submit(fn, *args).result()
 
     def _browser_download(self, page_url, form_action=None, form_data=None):
+        """_browser_download_here() on the browser thread (see _pw)."""
+        return self._on_browser_thread(self._browser_download_here, page_url,
+                                       form_action, form_data)
+
+    def _browser_download_here(self, page_url, form_action=None, form_data=None):
         """Use Playwright to navigate to a page and trigger a download.
 
         Returns (filepath, filename) on success, or (None, None) on failure.
@@ -2387,7 +6349,7 @@ class CrawlJob:
 
         self._init_browser()
         import tempfile
-        dl_dir = tempfile.mkdtemp(prefix="crawler_dl_")
+        dl_dir = tempfile.mkdtemp(prefix="crawler_dl_", dir=self._incoming_dir())
 
         try:
             context = self._browser.new_context(accept_downloads=True)
@@ -2502,6 +6464,7 @@ class CrawlJob:
                 if not download_btn:
                     self._log("  Browser: no download button found")
                     context.close()
+                    shutil.rmtree(dl_dir, ignore_errors=True)
                     return None, None
 
                 self._log("  Browser: clicking download button...")
@@ -2512,18 +6475,24 @@ class CrawlJob:
             filename = download.suggested_filename
             save_path = os.path.join(dl_dir, filename)
 
-            # save_as() waits for the download to complete — no timeout.
+            # path() waits for the download to complete — no timeout.
             # For large files on throttled servers this can take 60+ minutes.
+            # The browser writes it into .incoming, so taking it is a rename
+            # on the same filesystem (save_as() would copy it). Playwright
+            # deletes its downloads when the context closes, so move it first.
             self._log(f"  Browser: downloading {filename}...")
-            download.save_as(save_path)
+            browser_path = download.path()
 
-            # Check if it actually succeeded (save_as raises on failure,
+            # Check if it actually succeeded (path() raises on failure,
             # but double-check the file exists and has content)
-            if not os.path.exists(save_path) or os.path.getsize(save_path) == 0:
+            if (not browser_path or not os.path.exists(browser_path)
+                    or os.path.getsize(browser_path) == 0):
                 fail = download.failure()
                 self._log(f"  Browser: download failed — {fail or 'empty file'}")
                 context.close()
+                shutil.rmtree(dl_dir, ignore_errors=True)
                 return None, None
+            os.replace(browser_path, save_path)
 
             size_mb = os.path.getsize(save_path) / (1024 * 1024)
             self._log(f"  Browser: downloaded {filename} ({size_mb:.1f} MB)")
@@ -2539,16 +6508,190 @@ class CrawlJob:
                 context.close()
             except Exception:
                 pass
+            shutil.rmtree(dl_dir, ignore_errors=True)
             if "closed" in msg.lower() or "crashed" in msg.lower():
                 self._close_browser()
             return None, None
 
-    def _do_download_request(self, url):
+    def _throttled_request(self, method, url, retry_statuses=(429, 503), **kwargs):
+        """session.request() with per-host download politeness.
+
+        Waits for the host's download token first. On a rate-limit status it
+        backs off (honoring Retry-After) and retries, up to _RETRY_LIMIT
+        times; the last response is returned either way.
+        """
+        for attempt in range(_RETRY_LIMIT + 1):
+            self._throttle_wait(self.download_throttle, url)
+            resp = self.session.request(method, url, **kwargs)
+            if resp.status_code not in retry_statuses:
+                if resp.status_code < 400:
+                    self.download_throttle.success(url)
+                return resp
+            if attempt == _RETRY_LIMIT or self.stop_requested:
+                return resp
+            resp.close()
+            self._rate_limited(self.download_throttle, url, _RateLimited(
+                resp.status_code, resp.headers.get("retry-after")))
+        return resp
+
+    def _segment_count(self, url):
+        host = (urllib.parse.urlparse(url).hostname or "").lower()
+        return max(1, DOWNLOAD_SEGMENTS_PER_HOST.get(host, DOWNLOAD_SEGMENTS))
+
+    def _open_segments(self, resp, total):
+        """Open the extra Range requests for a segmented download.
+
+        resp is the full GET that's already open; it becomes the first
+        segment. Returns a list of (start, end, response), or None to stream
+        resp on its own — the file is too small, ranges aren't advertised,
+        or the server doesn't answer a range with the matching 206.
+        """
+        if not isinstance(resp, requests.Response) or resp.request.method != "GET":
+            return None  # POST form responses and browser downloads
+        bounds = _segment_ranges(resp.headers, total, self._segment_count(resp.url))
+        if not bounds:
+            return None
+        segments = self._open_ranges(resp, bounds, total, _if_range(resp.headers))
+        if segments is None:
+            self._log("  Range requests not honored -- single stream")
+        else:
+            self._log(f"  Segmented: {len(segments)} ranges of "
+                      f"{(bounds[0][1] + 1) / 1024 / 1024:.0f} MB")
+        return segments
+
+    def _open_ranges(self, resp, bounds, total, validator):
+        """Pair each (start, end) in bounds with a response serving it.
+
+        resp already serves bounds[0]; the rest are Range requests against
+        its final URL, pinned to the same entity with If-Range. Returns the
+        (start, end, response) list, or None — closing what it opened — if
+        any range isn't answered with the matching 206.
+        """
+        headers = {"If-Range": validator} if validator else {}
+        referer = resp.request.headers.get("Referer")
+        if referer:
+            headers["Referer"] = referer
+
+        segments = [(*bounds[0], resp)]
+        for start, end in bounds[1:]:
+            try:
+                seg = self.session.get(resp.url, stream=True, timeout=300,
+                                       headers={**headers, "Range": f"bytes={start}-{end}"})
+            except requests.RequestException:
+                seg = None
+            if seg is None or seg.status_code != 206 or not _content_range_matches(
+                    seg.headers.get("content-range"), start, end, total):
+                if seg is not None:
+                    seg.close()
+                for _, _, other in segments[1:]:
+                    other.close()
+                return None
+            segments.append((start, end, seg))
+        return segments
+
+    def _write_segments(self, segments, tmp_path, url, record, start_time, hasher,
+                        fresh=True, watch=None, head=None):
+        """Stream every segment into its slice of a preallocated .part file.
+
+        Each segment writes through its own handle at its own offset, so the
+        file is whole the moment the last segment ends — nothing to stitch
+        together afterwards. Every _PARTIAL_CHECKPOINT seconds, and when the
+        job stops or a segment fails, the ranges still missing are saved in
+        record so a later run can resume. fresh=False continues an existing
+        .part. Returns the file size, or None if the job was stopped; the
+        first error from any segment is re-raised.
+
+        The first segment feeds hasher as it streams. Bytes before it (from
+        an earlier run) are hashed up front, and the later segments, which
+        can't be hashed out of order, straight after — while they're still
+        in the page cache. A _SourceWatch raising _SlowSource fails it like
+        any segment error, so the resume point is saved first. So does a
+        _HeadWatch (head) raising _KnownContent, checked as the first
+        segment is hashed.
+        """
+        total = record["total"]
+        if fresh or not tmp_path.exists():
+            with open(tmp_path, "wb") as f:
+                f.truncate(total)
+        hasher.update_file(tmp_path, 0, segments[0][0])
+        lock = threading.Lock()
+        progress = [[start, end, 0] for start, end, _ in segments]  # + bytes written
+        done = [total - sum(end - start + 1 for start, end, _ in segments)]
+        last_save = [time.monotonic()]
+        errors = []
+
+        def missing():
+            return [[start + n, end] for start, end, n in progress if start + n <= end]
+
+        def fetch(i, resp):
+            start, end, _ = progress[i]
+            want = end - start + 1
+            try:
+                if i == 0 and head:
+                    head.check(hasher)  # a resumed .part may hold the head already
+                while i and head and head.pending and not (errors or self.stop_requested):
+                    time.sleep(0.05)
+                with open(tmp_path, "r+b") as f:
+                    f.seek(start)
+                    for chunk in resp.iter_content(chunk_size=1024 * 64):
+                        if self.stop_requested or errors:
+                            return
+                        chunk = chunk[:want]
+                        f.write(chunk)
+                        f.flush()  # a saved resume point must be on disk
+                        if i == 0:
+                            hasher.update(chunk)
+                            if head:
+                                head.check(hasher)
+                        want -= len(chunk)
+                        with lock:
+                            progress[i][2] += len(chunk)
+                            done[0] += len(chunk)
+                            wait = self._note_progress(len(chunk), done[0], total, start_time)
+                            checkpoint = time.monotonic() - last_save[0] >= _PARTIAL_CHECKPOINT
+                            if checkpoint:
+                                last_save[0] = time.monotonic()
+                                record["ranges"] = missing()
+                        if checkpoint:
+                            self._save_partial(url, record)
+                        if wait:
+                            time.sleep(wait)
+                        if watch:
+                            watch.check(len(chunk), wait)
+                        if want <= 0:
+                            return
+                raise requests.RequestException(
+                    f"segment {start}-{end} ended {want} bytes short")
+            except (requests.RequestException, OSError) as e:
+                errors.append(e)
+            finally:
+                resp.close()
+                if i == 0 and head:
+                    head.settle()
+
+        threads = [threading.Thread(target=fetch, args=(i, seg[2]), daemon=True)
+                   for i, seg in enumerate(segments) if i]
+        for t in threads:
+            t.start()
+        fetch(0, segments[0][2])
+        for t in threads:
+            t.join()
+        if errors or (self.stop_requested and missing()):
+            record["ranges"] = missing()
+            self._save_partial(url, record)
+            if errors:
+                raise errors[0]
+            return None
+        hasher.update_file(tmp_path, hasher.size, total)
+        return total
+
+    def _do_download_request(self, url, extra_headers=None):
         """Initiate a download request — handles both GET URLs and POST form entries.
 
         Returns (response, filename_hint, referer_url) or raises on error.
         For form downloads, tries requests first, falls back to Playwright
-        if the site has bot protection (400/403 response).
+        if the site has bot protection (400/403 response). extra_headers
+        (e.g. Range for a resume) go on every HTTP attempt.
         """
         if url.startswith("POST|"):
             parts = url.split("|", 3)
@@ -2557,7 +6700,7 @@ class CrawlJob:
             referer = parts[3] if len(parts) > 3 else ""
             form_data = dict(urllib.parse.parse_qsl(params_str))
 
-            headers = {}
+            headers = dict(extra_headers or {})
             if referer:
                 headers["Referer"] = referer
 
@@ -2569,8 +6712,8 @@ class CrawlJob:
                 sep = "&" if "?" in action_url else "?"
                 get_url = action_url + sep + urllib.parse.urlencode(form_data)
             try:
-                resp = self.session.get(get_url, headers=headers,
-                                        stream=True, timeout=300)
+                resp = self._throttled_request("GET", get_url, retry_statuses=(429,),
+                                               headers=headers, stream=True, timeout=300)
                 if resp.status_code < 400:
                     ct = resp.headers.get("content-type", "")
                     if "text/html" not in ct:
@@ -2589,8 +6732,11 @@ class CrawlJob:
 
             # Try the direct POST (works on most sites)
             try:
-                resp = self.session.post(action_url, data=form_data,
-                                         headers=headers, stream=True, timeout=300)
+                # Only 429 is retried here: a 503 on a form POST is usually a
+                # bot-protection page, which the browser fallback handles
+                resp = self._throttled_request("POST", action_url,
+                                               retry_statuses=(429,), data=form_data,
+                                               headers=headers, stream=True, timeout=300)
                 if resp.status_code in (400, 403, 429, 503):
                     resp.close()
                     raise requests.RequestException(
@@ -2626,7 +6772,8 @@ class CrawlJob:
                     raise requests.RequestException(
                         "Browser download also failed")
         else:
-            resp = self.session.get(url, stream=True, timeout=300)
+            resp = self._throttled_request("GET", url, headers=extra_headers,
+                                           stream=True, timeout=300)
             resp.raise_for_status()
 
             cd = resp.headers.get("content-disposition", "")
@@ -2638,7 +6785,74 @@ class CrawlJob:
 
             return resp, filename, url
 
-    def download_file(self, url):
+    def _claim_partial(self, url):
+        """Claim the target of url's partial download so it can resume.
+
+        Returns the target path, or None if there is nothing to resume or
+        another download now holds that name (its .part is no longer ours).
+        A record with nothing left to resume is dropped along with its .part.
+        """
+        record = self.partial_downloads.get(url)
+        if record is None:
+            return None
+        filepath = self.output_dir / record["path"]
+        claimed = _claim_target(filepath)
+        if claimed != filepath:
+            _release_target(claimed)
+            self._drop_partial(url)
+            return None
+        tmp_path = filepath.with_suffix(filepath.suffix + ".part")
+        if record.get("ranges") and tmp_path.exists():
+            return filepath
+        tmp_path.unlink(missing_ok=True)
+        _release_target(filepath)
+        self._drop_partial(url)
+        return None
+
+    def _save_partial(self, url, record):
+        """Persist where an interrupted download got to."""
+        with _STATE_LOCK:
+            record["at"] = time.strftime("%Y-%m-%d %H:%M:%S")
+            self.partial_downloads[url] = record
+            self.store.put("partial", url, record)
+            self._save_state()
+
+    def _drop_partial(self, url):
+        with _STATE_LOCK:
+            if self.partial_downloads.pop(url, None) is not None:
+                self.store.drop("partial", url)
+
+    def _plan_direct_download(self, url):
+        """Pick the target path for a URL whose filename is in the URL.
+
+        Returns (filepath, None) to go ahead, or (None, result) when there is
+        nothing to download — result is True for a known duplicate, False
+        for a URL with no usable filename. A resumable partial download
+        keeps the path it started with.
+        """
+        filepath = self._claim_partial(url)
+        if filepath is not None:
+            self.current_file = filepath.name
+            self.current_progress = 0
+            return filepath, None
+
+        filepath = self._url_to_filepath(url)
+        if filepath is None:
+            return None, False
+
+        self.current_file = filepath.name
+        self.current_progress = 0
+        filepath.parent.mkdir(parents=True, exist_ok=True)
+
+        # --- Dedup check ---
+        filepath, should_download = self._dedup_filepath(filepath, url)
+        if not should_download:
+            return None, True
+        return filepath, None
+
+    def download_file(self, url, inline=False):
+        """Download url. With a pipeline running, post-processing and
+        recording happen later on its stages unless inline is set."""
         if url in self.downloaded_files:
             return True
 
@@ -2650,32 +6864,48 @@ class CrawlJob:
                             and not self._is_downloadable(url))
 
         if not is_form_download and not is_extensionless:
-            filepath = self._url_to_filepath(url)
+            filepath, result = self._plan_direct_download(url)
             if filepath is None:
-                return False
-
-            name = filepath.name
-            self.current_file = name
-            self.current_progress = 0
-            filepath.parent.mkdir(parents=True, exist_ok=True)
-
-            # --- Dedup check ---
-            filepath, should_download = self._dedup_filepath(filepath, url)
-            if not should_download:
-                return True
+                return result
             name = filepath.name
         else:
-            name = "form download..."
+            # Named once the server responds, unless a partial download
+            # already settled the name
+            filepath = self._claim_partial(url)
+            name = filepath.name if filepath else "form download..."
             self.current_file = name
             self.current_progress = 0
 
-        self._log(f"Downloading: {name}")
+        partial = self.partial_downloads.get(url) if filepath is not None else None
+        self._log(f"Downloading: {name}" + (" (resuming)" if partial else ""))
+        # Only direct URLs have mirrors (see _scan_links)
+        source = (url if is_form_download or is_extensionless
+                  else self._pick_source(url, partial))
 
         try:
-            resp, server_filename, referer = self._do_download_request(url)
+            resp, server_filename, referer = self._do_download_request(
+                source, _resume_headers(partial) if partial else None)
+
+            resumed = (partial is not None and isinstance(resp, requests.Response)
+                       and _resume_accepted(resp.status_code, resp.headers, partial))
+            if partial and not resumed and source != url:
+                # A mirror that can't continue this exact file: leave it be
+                resp.close()
+                self.mirrors.avoid(source)
+                raise _SlowSource(f"{urllib.parse.urlparse(source).netloc} "
+                                  f"can't resume this download")
+            if partial and not resumed:
+                # Changed on the server, or ranges refused: this is a full response
+                self._log("  Partial download is stale -- starting over")
+                self._drop_partial(url)
+                partial = None
+            elif resumed and not _record_validator(partial):
+                # Switched source: pin the rest of the ranges to this one
+                partial.update(etag=resp.headers.get("etag"),
+                               last_modified=resp.headers.get("last-modified"))
 
             # For form/extensionless downloads, determine filepath from server response
-            if is_form_download or is_extensionless:
+            if filepath is None:
                 if server_filename:
                     fname = server_filename
                 elif is_form_download:
@@ -2716,91 +6946,243 @@ class CrawlJob:
                     return True
                 name = filepath.name
 
-            total = int(resp.headers.get("content-length", 0))
+            if isinstance(resp, _FileResponse):
+                # Browser download: already complete on this filesystem
+                key = self._identical_to(resp.digests())
+                if key:
+                    resp.close()
+                    raise _KnownContent(key)
+                downloaded, hashes = resp.move_to(filepath)
+                return self._finish_download(filepath, url, downloaded, inline, hashes)
+
             downloaded = 0
             start_time = time.time()
             tmp_path = filepath.with_suffix(filepath.suffix + ".part")
-
-            with open(tmp_path, "wb") as f:
-                for chunk in resp.iter_content(chunk_size=1024 * 64):
-                    if self.stop_requested:
-                        tmp_path.unlink(missing_ok=True)
-                        return False
-                    if chunk:
-                        f.write(chunk)
-                        downloaded += len(chunk)
-                        self.bytes_downloaded += len(chunk)
-
-                        if total > 0:
-                            self.current_progress = int(downloaded / total * 100)
-                            elapsed = time.time() - start_time
-                            if elapsed > 0:
-                                speed = downloaded / elapsed
-                                if speed > 1024 * 1024:
-                                    self.current_speed = f"{speed/1024/1024:.1f} MB/s"
-                                else:
-                                    self.current_speed = f"{speed/1024:.0f} KB/s"
-
+            hasher = _MultiHasher()
+
+            if resumed:
+                record = partial
+                segments = self._open_ranges(resp, record["ranges"], record["total"],
+                                             _record_validator(record))
+                if segments is None:
+                    self._drop_partial(url)
+                    raise requests.RequestException("server stopped honoring ranges")
+            else:
+                total = int(resp.headers.get("content-length", 0))
+                record = (_partial_record(filepath.relative_to(self.output_dir).as_posix(),
+                                          resp.headers, total)
+                          if isinstance(resp, requests.Response) else None)
+                segments = None
+                if record:
+                    record["source"] = source
+                    segments = self._open_segments(resp, total) or [(0, total - 1, resp)]
+
+            if segments:
+                # Resumable: a stop or failure keeps the .part and its resume point
+                watch = (_SourceWatch(self, url, source, record["total"])
+                         if MIRROR_FAILOVER else None)
+                downloaded = self._write_segments(segments, tmp_path, url, record,
+                                                  start_time, hasher, fresh=not resumed,
+                                                  watch=watch,
+                                                  head=self._head_watch(record["total"]))
+                if downloaded is None:
+                    return False
+            else:
+                total = total or self._listed_size(url)  # no Content-Length
+                head = self._head_watch(total)
+                with open(tmp_path, "wb") as f:
+                    for chunk in resp.iter_content(chunk_size=1024 * 64):
+                        if self.stop_requested:
+                            tmp_path.unlink(missing_ok=True)
+                            return False
+                        if chunk:
+                            f.write(chunk)
+                            hasher.update(chunk)
+                            if head:
+                                head.check(hasher)
+                            downloaded += len(chunk)
+                            wait = self._note_progress(len(chunk), downloaded, total, start_time)
+                            if wait:
+                                time.sleep(wait)
+
+            hashes = hasher.hexdigests()
+            key = self._identical_to(hashes)
+            if key:
+                raise _KnownContent(key)
             tmp_path.rename(filepath)
-            size_mb = downloaded / 1024 / 1024
-            self._log(f"  Done: {name} ({size_mb:.1f} MB)")
-            self.current_progress = 100
-
-            # If this archive landed in "other", peek inside to reclassify
-            filepath = self._reclassify_archive(filepath, url)
-
-            # Post-process: convert to optimal format (CHD for disc, 7z ultra for ROMs)
-            filepath = self._post_process(filepath)
-            name = filepath.name
+            return self._finish_download(filepath, url, downloaded, inline, hashes)
+
+        except _KnownContent as e:
+            resp.close()
+            return self._keep_identical(url, filepath, e.key)
+        except _SlowSource as e:
+            self._log(f"  {e}")
+        except (requests.RequestException, OSError) as e:
+            if getattr(getattr(e, "response", None), "status_code", None) == 416:
+                self._drop_partial(url)  # the resume point is past the end
+            self._download_failed(url, name, e, filepath)
+            return False
+        finally:
+            if filepath is not None:
+                _release_target(filepath)
+        # Pick up the .part from its saved resume point on the faster source
+        return self.download_file(url, inline)
 
-            # Compute hash BEFORE trickle push (file may be deleted after push)
-            system = filepath.parent.name
-            registry_key = f"{system}/{name}"
-            if filepath.exists():
-                file_hash = self._file_sha256(filepath)
-            else:
-                file_hash = "unknown"
+    def _note_progress(self, chunk_len, downloaded, total, start_time):
+        """Update the UI progress/speed fields after writing a chunk.
 
-            # Trickle push: send to NAS immediately if enabled
-            self._trickle_push(filepath)
+        Returns how long to sleep to stay under the shared bandwidth cap.
+        """
+        self.bytes_downloaded += chunk_len
+        if total > 0:
+            self.current_progress = int(downloaded / total * 100)
+            elapsed = time.time() - start_time
+            if elapsed > 0:
+                speed = downloaded / elapsed
+                if speed > 1024 * 1024:
+                    self.current_speed = f"{speed/1024/1024:.1f} MB/s"
+                else:
+                    self.current_speed = f"{speed/1024:.0f} KB/s"
+        return self.bandwidth.reserve(chunk_len) if self.bandwidth else 0.0
+
+    def _download_failed(self, url, name, error, filepath=None):
+        msg = str(error)
+        if len(msg) > 150:
+            msg = msg[:150] + "..."
+        self._log(f"  FAIL: {name} -- {msg}")
+        with _STATE_LOCK:
+            self.failed_files.add(url)
+            self.store.put("failed", url)
+            self._save_state()
+        if url in self.partial_downloads:
+            self._log(f"  Kept partial download of {name} to resume")
+            return
+        # filepath is None when a form download failed before naming the file
+        if filepath is not None:
+            tmp_path = filepath.with_suffix(filepath.suffix + ".part")
+            if tmp_path.exists():
+                tmp_path.unlink()
 
-            # Multi-disc: if this is Disc 1, look for sibling discs + generate .m3u
-            self._check_multi_disc(filepath)
+    def _finish_download(self, filepath, url, downloaded, inline=False, hashes=None):
+        """Hand a completed download on for post-processing and recording.
 
-            # Register in dedup registry with hash
-            # (even if trickle-push deleted the local copy, we still record it)
-            self.file_registry[registry_key] = {
-                "url": url,
-                "size": downloaded,
-                "sha256": file_hash,
-            }
+        filepath is the final (renamed) file; downloaded is its byte count
+        and hashes its _MultiHasher digests, taken while it was written.
+        With a pipeline running the file is queued for its post-process
+        stage; inline=True (or no pipeline) does all of it right here.
+        """
+        self._drop_partial(url)
+        self._log(f"  Done: {filepath.name} ({downloaded / 1024 / 1024:.1f} MB)")
+        self.current_progress = 100
+        item = {"url": url, "filepath": filepath, "size": downloaded, "hashes": hashes}
+        if self._pipeline is not None and not inline:
+            self._pipeline.post.put(item)
+            return True
+        return self._push_stage(self._post_stage(item))
+
+    def _post_stage(self, item):
+        """Pipeline stage: reclassify, convert and hash a downloaded file."""
+        url = item["url"]
+        # A file the DATs know needs no guessing about its system or name
+        dat = self._dat_check(item["filepath"], item["hashes"])
+        if dat and dat["status"] == "verified":
+            self._log(f"  DAT: {item['filepath'].name} is {dat['game']} "
+                      f"({dat['system'] or 'unknown system'}, verified)")
+        # If this archive landed in "other", peek inside to reclassify
+        filepath = self._reclassify_archive(item["filepath"], url, dat)
+
+        # Post-process: convert to optimal format (CHD for disc, 7z ultra for ROMs)
+        processed = self._post_process(filepath)
+        item["filepath"] = processed
+
+        # Hashes of the file as stored: the download's own if post-processing
+        # left it alone, else whatever the converter hashed while writing.
+        # Only output written by an external tool (chdman) is read back.
+        # Must happen BEFORE trickle push (file may be deleted after push).
+        if processed == filepath and item["hashes"]:
+            hashes = item["hashes"]
+        else:
+            hashes = self._output_hashes.pop(processed, None)
+            if hashes is None and processed.exists():
+                hashes = _MultiHasher.of_file(processed)
+            # What went in, e.g. the bare ROM now inside a .zip
+            item["source_hashes"] = item["hashes"]
+        item["hashes"] = hashes or {}
+        item["sha256"] = item["hashes"].get("sha256", "unknown")
+
+        if dat:
+            if DAT_RENAME and dat["status"] != "mismatch":
+                item["filepath"] = self._dat_rename(processed, dat)
+            item["dat"] = dat
+        return item
+
+    def _push_stage(self, item):
+        """Pipeline stage: push to the NAS, complete multi-disc sets, and
+        record the download in the state."""
+        url, filepath, file_hash = item["url"], item["filepath"], item["sha256"]
+        name = filepath.name
+        system = filepath.parent.name
+        registry_key = f"{system}/{name}"
 
+        # Trickle push: send to NAS immediately if enabled -- unless the DATs
+        # say it's a bad dump or not the game its name claims
+        dat = item.get("dat")
+        if dat and dat["status"] != "verified":
+            problem = ("a known bad dump" if dat["status"] == "baddump"
+                       else f"named like {dat['game']} but doesn't match the DAT")
+            held = DAT_HOLD_BAD and self._trickle_enabled
+            self._log(f"  DAT: {name} is {problem}"
+                      + (", held in staging" if held else ""))
+        if not (dat and dat["status"] != "verified" and DAT_HOLD_BAD):
+            self._trickle_push(filepath, file_hash)
+
+        # Multi-disc: if this is Disc 1, look for sibling discs + generate .m3u
+        self._check_multi_disc(filepath, url)
+
+        with _STATE_LOCK:
             # Check if this exact content already exists under a different name
             if file_hash not in ("unknown",):
-                for reg_key, reg_val in self.file_registry.items():
+                for reg_key in self.content.by_hash(file_hash):
+                    reg_val = self.file_registry.get(reg_key, {})
                     if reg_key != registry_key and reg_val.get("sha256") == file_hash:
                         self._log(f"  Note: identical content to {reg_key}")
                         break
 
-            self.downloaded_files.add(url)
-            self.failed_files.discard(url)
+            # Register in dedup registry with hash
+            # (even if trickle-push deleted the local copy, we still record it)
+            reg = {
+                "url": url,
+                "size": item["size"],
+                "sha256": file_hash,
+                **item["hashes"],
+            }
+            if item.get("source_hashes"):
+                reg["source"] = item["source_hashes"]
+            if item.get("dat"):
+                reg["dat"] = item["dat"]["status"]
+            self._register(registry_key, reg)
+
+            self._mark_downloaded(url)
+            if url in self.failed_files:
+                self.failed_files.discard(url)
+                self.store.drop("failed", url)
             self._save_state()
-            return True
+        return True
 
-        except requests.RequestException as e:
-            msg = str(e)
-            if len(msg) > 150:
-                msg = msg[:150] + "..."
-            self._log(f"  FAIL: {name} -- {msg}")
-            self.failed_files.add(url)
-            self._save_state()
-            try:
-                tmp_path = filepath.with_suffix(filepath.suffix + ".part")
-                if tmp_path.exists():
-                    tmp_path.unlink()
-            except (NameError, UnboundLocalError):
-                pass  # filepath was never set (form download failed early)
-            return False
+    def _download_stage(self, url):
+        """Pipeline stage: download one discovered file."""
+        if url in self.downloaded_files:
+            return None
+        self.files_total = len(self.discovered_files) - len(self.downloaded_files)
+        self.phase = (f"Downloading ({len(self.downloaded_files)} done, "
+                      f"{self.files_total} remain)")
+        ok = self.download_file(url)
+        with _STATE_LOCK:
+            if ok:
+                self.files_downloaded += 1
+            else:
+                self.files_failed += 1
+        return None
 
     def run(self):
         self.status = "crawling"
@@ -2812,46 +7194,69 @@ class CrawlJob:
         if self._trickle_enabled:
             self._log(f"Trickle push: ENABLED (files push to NAS as they download)")
 
+        if self.incremental:
+            self._log(f"Incremental: skipping listings unchanged since the last "
+                      f"complete crawl ({len(self.listing_fingerprints)} known)")
+
+        self._pipeline = _Pipeline(self)
+        try:
+            self._run_pipeline()
+        finally:
+            self._pipeline.close()
+            self._pipeline = None
+            self._close_browser()
+            self.page_session.close()
+            self._save_state()
+            with _STATE_LOCK:
+                self.store.close()
+                for history in (self.downloaded_files, self.failed_files,
+                                self._pages_with_downloads, self._downloaded_media):
+                    if isinstance(history, _URLHistory):
+                        history.close()
+
+    def _run_pipeline(self):
+        """Crawl, let the pipeline drain, then mop up. run() owns the pipeline."""
         self.crawl_page(self.base_url)
+        # Files the crawl queued are downloaded and recorded before the
+        # mop-up decides what's still missing
+        self._drain_pipeline()
 
         if self.stop_requested:
             self.status = "stopped"
             self._log("Stopped by user.")
-            self._close_browser()
             return
 
         # Mop-up pass: any discovered files that weren't downloaded during the crawl
-        # (safety net — most downloads happen inline during crawl_page now)
+        # (safety net — most downloads happen during crawl_page)
         remaining = []
         seen = set()
-        for url in self.discovered_files:
-            if url not in seen and url not in self.downloaded_files:
-                remaining.append(url)
-                seen.add(url)
-
-        self.files_found = len(self.discovered_files) + len(self.downloaded_files)
+        with _STATE_LOCK:
+            for url in self.discovered_files:
+                if url not in seen and url not in self.downloaded_files:
+                    remaining.append(url)
+                    seen.add(url)
+            self.files_found = len(self.discovered_files) + len(self.downloaded_files)
 
         self._log(f"Crawl complete: {self.pages_crawled} pages, {self.files_found} files found, "
                   f"{self.files_downloaded} downloaded during crawl")
+        if self.pages_unchanged:
+            self._log(f"Page cache: {self.pages_unchanged} pages unchanged since last crawl")
+        if self.listings_pruned:
+            self._log(f"Incremental: pruned {self.listings_pruned} unchanged listings")
 
         if remaining:
             self._log(f"Mop-up: {len(remaining)} files still need downloading")
             self.status = "downloading"
-            for i, url in enumerate(remaining, 1):
-                if self.stop_requested:
-                    self.status = "stopped"
-                    self._log("Stopped by user.")
-                    return
-
-                self.phase = f"Mop-up {i}/{len(remaining)}"
-
-                if self.download_file(url):
-                    self.files_downloaded += 1
-                else:
-                    self.files_failed += 1
+            for url in remaining:
+                if not self._pipeline.download.put(url):
+                    break
+            self._drain_pipeline()
+            if self.stop_requested:
+                self.status = "stopped"
+                self._log("Stopped by user.")
+                return
 
-                if i < len(remaining) and not self.stop_requested:
-                    time.sleep(self.delay)
+        self._commit_fingerprints()
 
         # Post-crawl: sweep local staging for any multi-disc games needing .m3u
         self._sweep_m3u()
@@ -2863,11 +7268,50 @@ class CrawlJob:
             summary += f", {self.dupes_skipped} duplicates skipped"
         self._log(summary)
         self.current_file = ""
-        self._close_browser()
+
+    def _commit_fingerprints(self):
+        """Keep this run's listing fingerprints, now the traversal and its
+        downloads are done. A listing with a file below it that didn't
+        download (failed, partial, or never tried) keeps its old print, if
+        any, so the next incremental crawl walks it again. Merge rather
+        than replace: pruned subtrees keep theirs."""
+        with _STATE_LOCK:
+            incomplete = set()
+            for url in self.discovered_files:
+                if url in self.downloaded_files:
+                    continue
+                page = self._found_on.get(url) or _post_referer(url)
+                while page and page not in incomplete:
+                    incomplete.add(page)
+                    page = self._queued_by.get(page)
+            kept = {page_url: fp for page_url, fp in self._new_fingerprints.items()
+                    if page_url not in incomplete}
+            if len(kept) < len(self._new_fingerprints):
+                self._log(f"Incremental: {len(self._new_fingerprints) - len(kept)} listings "
+                          f"with files still missing will be crawled again")
+            self.listing_fingerprints.update(kept)
+            for page_url, fp in kept.items():
+                self.store.put("fingerprint", page_url, fp)
+            self._new_fingerprints = {}
+            self._save_state()
+
+    def _drain_pipeline(self):
+        """Wait for the pipeline to go idle. After a stop, downloads are
+        dropped but files already downloaded still get recorded."""
+        post = self._pipeline.post
+        if self.stop_requested and (post.backlog() or post.active):
+            self._log("Stopping: finishing files that are already downloaded...")
+        self._pipeline.join()
 
     def get_progress(self):
+        pipeline = self._pipeline
+        status = self.status
+        if status == "crawling" and pipeline and pipeline.download.active:
+            status = "downloading"  # the crawl goes on while files download
         return {
-            "status": self.status,
+            "job_id": self.job_id,
+            "url": self.base_url,
+            "status": status,
             "phase": self.phase,
             "pages_crawled": self.pages_crawled,
             "files_found": self.files_found,
@@ -2879,6 +7323,7 @@ class CrawlJob:
             "current_progress": self.current_progress,
             "current_speed": self.current_speed,
             "bytes_total": self.bytes_downloaded,
+            "pipeline": pipeline.stats() if pipeline else None,
             "log": self.log_lines[-80:],
         }
 
@@ -2977,12 +7422,215 @@ def _ensure_emulators(systems, log):
     log("[EMU] Emulator check complete")
 
 
+# ============================================================================
+# JOB MANAGER
+# ============================================================================
+
+class _JobManager:
+    """Runs several CrawlJobs at once under global limits.
+
+    At most `max_jobs` crawls run concurrently and their page workers come
+    out of one `total_workers` budget — each job gets up to CRAWL_WORKERS,
+    fewer if that's all that is left. Jobs submitted past either limit wait
+    in FIFO order and start as soon as a running job finishes. Downloads of
+    every job share one bandwidth cap, NAS pushes another, both following
+    the same time-of-day schedule. All jobs also share one mirror index, so
+    a file found by two crawls can be downloaded from either site, and one
+    manifest of the NAS, listed once for all of them.
+    """
+
+    def __init__(self, output_dir, max_jobs=MAX_JOBS, total_workers=CRAWL_TOTAL_WORKERS,
+                 bandwidth_kbps=MAX_BANDWIDTH_KBPS, push_kbps=MAX_PUSH_KBPS,
+                 schedule=BANDWIDTH_SCHEDULE, keep_finished=20):
+        self.output_dir = output_dir
+        self.max_jobs = max(1, max_jobs)
+        self.total_workers = max(1, total_workers)
+        try:
+            windows = _parse_schedule(schedule)
+        except ValueError:
+            windows, schedule = [], ""  # reported by _validate_config
+        self.schedule = schedule
+        self.bandwidth = _BandwidthLimit(bandwidth_kbps * 1024, windows)
+        self.push_bandwidth = _BandwidthLimit(push_kbps * 1024, windows)
+        self.mirrors = _MirrorIndex(MIRROR_SLOW_KBPS * 1024)
+        self.nas = (_NASManifest(Path(output_dir) / ".crawler-state.db")
+                    if NAS_DEDUP and NAS_HOST and NAS_USER and NAS_EXPORT else None)
+        self.keep_finished = keep_finished
+        self._jobs = {}       # job_id -> CrawlJob, in start order
+        self._running = set()  # job_ids whose thread hasn't returned yet
+        self._queued = []     # [{job_id, url, options}] waiting for a slot
+        self._starting = {}   # job_id -> workers reserved while CrawlJob() runs
+        self._failed = {}     # job_id -> progress stub of a job that failed to start
+        self._next_id = 1
+        self._lock = threading.Lock()
+
+    def submit(self, url, **options):
+        """Queue a crawl (CrawlJob keyword options); it starts right away if
+        there is room. Returns (job_id, "started", "queued" or "error")."""
+        with self._lock:
+            job_id = str(self._next_id)
+            self._next_id += 1
+            self._queued.append({"job_id": job_id, "url": url, "options": options})
+        self._start_queued()
+        if job_id in self._failed:
+            return job_id, "error"
+        return job_id, ("started" if job_id in self._jobs else "queued")
+
+    def _start_queued(self):
+        """Start queued jobs while slots and workers remain.
+
+        An entry is claimed (and its workers reserved) under the lock, but
+        CrawlJob() — which opens the state store and may hit the disk for a
+        while — runs outside it. A job whose constructor raises is kept as
+        an "error" stub rather than lost.
+        """
+        while True:
+            with self._lock:
+                if not self._queued or len(self._running) + len(self._starting) >= self.max_jobs:
+                    return
+                free = (self.total_workers
+                        - sum(self._jobs[i].page_workers for i in self._running)
+                        - sum(self._starting.values()))
+                if free < 1:
+                    return
+                entry = self._queued.pop(0)
+                workers = min(CRAWL_WORKERS, free)
+                self._starting[entry["job_id"]] = workers
+            try:
+                job = CrawlJob(entry["url"], self.output_dir,
+                               page_workers=workers, **entry["options"])
+            except Exception as e:
+                with self._lock:
+                    del self._starting[entry["job_id"]]
+                    self._failed[entry["job_id"]] = {
+                        "job_id": entry["job_id"], "url": entry["url"], "status": "error",
+                        "phase": "Failed to start", "log": [f"ERROR: {e}"]}
+                    while len(self._failed) > self.keep_finished:
+                        del self._failed[next(iter(self._failed))]
+                continue
+            job.job_id = entry["job_id"]
+            job.bandwidth = self.bandwidth
+            job.push_bandwidth = self.push_bandwidth
+            job.mirrors = self.mirrors
+            job.nas = self.nas
+            job.status = "crawling"  # active from the moment it holds a slot
+            with self._lock:
+                del self._starting[job.job_id]
+                self._jobs[job.job_id] = job
+                self._running.add(job.job_id)
+            threading.Thread(target=self._run, args=(job,), daemon=True).start()
+
+    def _run(self, job):
+        try:
+            job.run()
+        except Exception as e:
+            job.status = "error"
+            job._log(f"ERROR: {e}")
+        finally:
+            with self._lock:
+                self._running.discard(job.job_id)
+                # Forget the oldest finished jobs beyond keep_finished
+                finished = [i for i in self._jobs if i not in self._running]
+                for i in finished[:max(0, len(finished) - self.keep_finished)]:
+                    self.mirrors.forget(self._jobs[i].discovered_files)
+                    del self._jobs[i]
+            self._start_queued()
+
+    def get(self, job_id):
+        return self._jobs.get(job_id)
+
+    def latest(self):
+        """The most recently started job, or None."""
+        with self._lock:
+            return next(reversed(self._jobs.values()), None)
+
+    def busy(self):
+        """True while any job is running or waiting for a slot."""
+        with self._lock:
+            return bool(self._running or self._queued or self._starting)
+
+    def progress(self, job_id):
+        """get_progress() for a started job, a stub for a queued one, or None."""
+        job = self._jobs.get(job_id)
+        if job:
+            return job.get_progress()
+        for entry in list(self._queued):
+            if entry["job_id"] == job_id:
+                return {"job_id": job_id, "url": entry["url"], "status": "queued",
+                        "phase": "Waiting for a free job slot", "log": []}
+        if job_id in self._starting:
+            return {"job_id": job_id, "status": "queued", "phase": "Starting", "log": []}
+        failed = self._failed.get(job_id)
+        return dict(failed) if failed else None
+
+    def summary(self):
+        """One line of stats per job, queued jobs last."""
+        with self._lock:
+            rows = [{
+                "job_id": job.job_id,
+                "url": job.base_url,
+                "status": job.status,
+                "phase": job.phase,
+                "pages_crawled": job.pages_crawled,
+                "files_downloaded": job.files_downloaded,
+                "files_failed": job.files_failed,
+                "current_speed": job.current_speed if job.status == "downloading" else "",
+                "workers": job.page_workers,
+            } for job in self._jobs.values()]
+            rows += [{"job_id": e["job_id"], "url": e["url"], "status": "error"}
+                     for e in self._failed.values()]
+            rows += [{"job_id": e["job_id"], "url": e["url"], "status": "queued"}
+                     for e in self._queued]
+        return rows
+
+    def stop(self, job_id):
+        """Stop a running job or drop a queued one. Returns the outcome."""
+        with self._lock:
+            for i, entry in enumerate(self._queued):
+                if entry["job_id"] == job_id:
+                    del self._queued[i]
+                    return "cancelled"
+            job = self._jobs.get(job_id)
+        if job and job.status in ("crawling", "downloading"):
+            job.request_stop()
+            return "stopping"
+        return "not_running"
+
+    def bandwidth_status(self):
+        return {
+            "download": self.bandwidth.stats(),
+            "push": self.push_bandwidth.stats(),
+            "schedule": self.schedule,
+        }
+
+    def set_bandwidth(self, download_kbps=None, push_kbps=None, schedule=None):
+        """Change the caps and/or schedule of running and future transfers.
+        Raises ValueError on a bad value, changing nothing."""
+        download = None if download_kbps is None else int(download_kbps) * 1024
+        push = None if push_kbps is None else int(push_kbps) * 1024
+        windows = None if schedule is None else _parse_schedule(schedule)
+        if windows is not None:
+            self.schedule = schedule
+        self.bandwidth.configure(download, windows)
+        self.push_bandwidth.configure(push, windows)
+
+
 # ============================================================================
 # WEB SERVER
 # ============================================================================
 
-current_job = None
-job_thread = None
+job_manager = _JobManager(STAGING_BASE)
+
+
+def _job_options(params):
+    """CrawlJob keyword options from a start request's JSON params."""
+    return {
+        "max_depth": int(params.get("depth", DEFAULT_DEPTH)),
+        "delay": int(params.get("delay", DEFAULT_DELAY)),
+        "system": params.get("system", "auto"),
+        "js_mode": bool(params.get("js_mode", False)),
+        "incremental": bool(params.get("incremental", False)),
+    }
 
 
 def _human_bytes(b):
@@ -2999,7 +7647,20 @@ class GUIHandler(http.server.BaseHTTPRequestHandler):
         if parsed.path == "/":
             self._serve_html()
         elif parsed.path == "/api/status":
-            self._serve_status()
+            query = urllib.parse.parse_qs(parsed.query)
+            self._serve_status(query.get("job", [None])[0])
+        elif parsed.path == "/api/jobs":
+            self._json({
+                "jobs": job_manager.summary(),
+                "limits": {
+                    "max_jobs": job_manager.max_jobs,
+                    "total_workers": job_manager.total_workers,
+                    "bandwidth_kbps": job_manager.bandwidth.limit // 1024,
+                    "push_kbps": job_manager.push_bandwidth.limit // 1024,
+                },
+            })
+        elif parsed.path == "/api/bandwidth":
+            self._json(job_manager.bandwidth_status())
         else:
             self.send_error(404)
 
@@ -3011,9 +7672,11 @@ class GUIHandler(http.server.BaseHTTPRequestHandler):
         if parsed.path == "/api/start":
             self._handle_start(body)
         elif parsed.path == "/api/stop":
-            self._handle_stop()
+            self._handle_stop(body)
         elif parsed.path == "/api/push-nas":
             self._handle_push_nas()
+        elif parsed.path == "/api/bandwidth":
+            self._handle_bandwidth(body)
         else:
             self.send_error(404)
 
@@ -3024,10 +7687,18 @@ class GUIHandler(http.server.BaseHTTPRequestHandler):
         self.end_headers()
         self.wfile.write(json.dumps(data).encode())
 
-    def _serve_status(self):
-        global current_job
-        if current_job is None:
-            self._json({
+    def _serve_status(self, job_id=None):
+        """Progress of job_id, or of the most recently started job."""
+        if job_id:
+            data = job_manager.progress(job_id)
+            if data is None:
+                self._json({"error": "Unknown job"}, 404)
+                return
+        else:
+            job = job_manager.latest()
+            data = job.get_progress() if job else None
+        if data is None:
+            data = {
                 "status": "idle",
                 "log": [],
                 "config": {
@@ -3036,17 +7707,12 @@ class GUIHandler(http.server.BaseHTTPRequestHandler):
                     "nas_configured": bool(NAS_HOST and NAS_EXPORT),
                     "issues": _CONFIG_ISSUES,
                 },
-            })
-        else:
-            self._json(current_job.get_progress())
+            }
+        data["jobs"] = job_manager.summary()
+        data["bandwidth"] = job_manager.bandwidth_status()
+        self._json(data)
 
     def _handle_start(self, body):
-        global current_job, job_thread
-
-        if current_job and current_job.status in ("crawling", "downloading"):
-            self._json({"error": "Job already running"}, 409)
-            return
-
         try:
             params = json.loads(body)
         except json.JSONDecodeError:
@@ -3061,8 +7727,9 @@ class GUIHandler(http.server.BaseHTTPRequestHandler):
             url = "https://" + url
 
         # If the source file has been modified since this process started,
-        # restart the process to pick up code changes.
-        if os.path.getmtime(__file__) > _SCRIPT_MTIME:
+        # restart the process to pick up code changes — unless other jobs are
+        # still running, which a restart would kill.
+        if os.path.getmtime(__file__) > _SCRIPT_MTIME and not job_manager.busy():
             os.environ["CRAWLER_AUTOSTART"] = json.dumps(params)
             self._json({"status": "restarting"})
             def _restart():
@@ -3071,35 +7738,32 @@ class GUIHandler(http.server.BaseHTTPRequestHandler):
             threading.Thread(target=_restart, daemon=False).start()
             return
 
-        depth = int(params.get("depth", DEFAULT_DEPTH))
-        delay = int(params.get("delay", DEFAULT_DELAY))
-        system = params.get("system", "auto")
-        js_mode = bool(params.get("js_mode", False))
-
-        current_job = CrawlJob(
-            url, STAGING_BASE, max_depth=depth, delay=delay,
-            system=system, js_mode=js_mode,
-        )
-
-        def run_job():
-            try:
-                current_job.run()
-            except Exception as e:
-                current_job.status = "error"
-                current_job._log(f"ERROR: {e}")
-
-        job_thread = threading.Thread(target=run_job, daemon=True)
-        job_thread.start()
+        job_id, state = job_manager.submit(url, **_job_options(params))
+        self._json({"status": state, "job_id": job_id, "output_dir": STAGING_BASE})
 
-        self._json({"status": "started", "output_dir": STAGING_BASE})
+    def _handle_bandwidth(self, body):
+        """Change caps (KB/s, 0 = unlimited) and/or the schedule at runtime:
+        {"download_kbps": 2048, "push_kbps": 0, "schedule": "07:00-23:00=30%"}."""
+        try:
+            params = json.loads(body) if body else {}
+            job_manager.set_bandwidth(params.get("download_kbps"),
+                                      params.get("push_kbps"),
+                                      params.get("schedule"))
+        except (json.JSONDecodeError, AttributeError, TypeError, ValueError) as e:
+            self._json({"error": f"Invalid bandwidth settings: {e}"}, 400)
+            return
+        self._json(job_manager.bandwidth_status())
 
-    def _handle_stop(self):
-        global current_job
-        if current_job and current_job.status in ("crawling", "downloading"):
-            current_job.stop_requested = True
-            self._json({"status": "stopping"})
-        else:
-            self._json({"status": "not_running"})
+    def _handle_stop(self, body):
+        """Stop the job named in the body, or the most recently started one."""
+        try:
+            job_id = json.loads(body).get("job") if body else None
+        except (json.JSONDecodeError, AttributeError):
+            job_id = None
+        if job_id is None:
+            job = job_manager.latest()
+            job_id = job.job_id if job else None
+        self._json({"status": job_manager.stop(str(job_id)) if job_id else "not_running"})
 
     def _handle_push_nas(self):
         """Push staged files to NAS.
@@ -3109,7 +7773,7 @@ class GUIHandler(http.server.BaseHTTPRequestHandler):
         built-in push logic using config values.
         """
         def push():
-            job = current_job
+            job = job_manager.latest()
             log = job._log if job else lambda m: None
             staging = Path(STAGING_BASE)
 
@@ -3119,7 +7783,7 @@ class GUIHandler(http.server.BaseHTTPRequestHandler):
 
             # Find system subdirectories with files
             system_dirs = [d for d in staging.iterdir()
-                          if d.is_dir() and d.name != ".crawler-state.json"
+                          if d.is_dir() and not d.name.startswith(".")
                           and any(d.iterdir())]
             if not system_dirs:
                 log("[NAS] No files to push")
@@ -3178,7 +7842,7 @@ class GUIHandler(http.server.BaseHTTPRequestHandler):
 
             # Re-scan system dirs (m3u files may have been added)
             system_dirs = [d for d in staging.iterdir()
-                          if d.is_dir() and d.name != ".crawler-state.json"
+                          if d.is_dir() and not d.name.startswith(".")
                           and any(d.iterdir())]
 
             # Push each system directory via SCP
@@ -3187,7 +7851,7 @@ class GUIHandler(http.server.BaseHTTPRequestHandler):
                 system = sdir.name
                 files = [f for f in sdir.iterdir() if f.is_file()
                          and not f.name.endswith(".part")
-                         and f.name != ".crawler-state.json"]
+                         and not f.name.startswith(".crawler-state.")]
                 if not files:
                     continue
 
@@ -3223,13 +7887,15 @@ class GUIHandler(http.server.BaseHTTPRequestHandler):
                     # SCP the file directly (modern SCP uses SFTP — no shell escaping)
                     scp_dst = f"{ssh_target}:{target_dir}/{filename}"
 
-                    result = subprocess.run(
-                        ["scp", "-i", ssh_key,
-                         "-o", "StrictHostKeyChecking=accept-new",
-                         "-o", "ConnectTimeout=10",
-                         str(filepath), scp_dst],
-                        capture_output=True, text=True, timeout=600,
-                    )
+                    with job_manager.push_bandwidth.lease() as rate:
+                        result = subprocess.run(
+                            ["scp", "-i", ssh_key, *_scp_limit(rate),
+                             "-o", "StrictHostKeyChecking=accept-new",
+                             "-o", "ConnectTimeout=10",
+                             str(filepath), scp_dst],
+                            capture_output=True, text=True,
+                            timeout=_scp_timeout(filepath.stat().st_size, rate),
+                        )
                     if result.returncode == 0:
                         # Set permissions so SSHFS on device can read the file
                         subprocess.run(
@@ -3239,6 +7905,8 @@ class GUIHandler(http.server.BaseHTTPRequestHandler):
                              f"chmod a+r \"{target_dir}/{filename}\""],
                             capture_output=True, timeout=10,
                         )
+                        if job_manager.nas is not None:
+                            job_manager.nas.note(system, filename, filepath.stat().st_size)
                         filepath.unlink()
                         pushed += 1
                     else:
@@ -3318,12 +7986,22 @@ HTML = r"""<!DOCTYPE html>
 
   .progress-section { max-width: 700px; margin: 0 auto; padding: 0 16px; }
 
+  .jobs { max-width: 700px; margin: 0 auto 16px; padding: 0 16px; }
+  .job-row { display: flex; gap: 10px; align-items: center; padding: 8px 12px;
+    background: #12122a; border: 1px solid #1e1e3a; border-radius: 8px;
+    margin-bottom: 6px; cursor: pointer; font-size: 0.85em; }
+  .job-row.selected { border-color: #7c3aed; }
+  .job-row .job-url { flex: 1; white-space: nowrap; overflow: hidden;
+    text-overflow: ellipsis; color: #ccc; }
+  .job-row .job-meta { color: #888; }
+
   .stats { display: grid; grid-template-columns: repeat(5, 1fr); gap: 10px;
            margin-bottom: 16px; }
   .stat-card { background: #12122a; border-radius: 10px; padding: 14px;
     text-align: center; border: 1px solid #1e1e3a; }
   .stat-val { font-size: 1.6em; font-weight: 700; color: #a78bfa; }
   .stat-label { font-size: 0.75em; color: #666; margin-top: 2px; }
+  .pipeline { text-align: center; font-size: 0.75em; color: #777; margin-bottom: 12px; }
 
   .current-dl { background: #12122a; border-radius: 10px; padding: 16px;
     margin-bottom: 16px; border: 1px solid #1e1e3a; }
@@ -3432,6 +8110,12 @@ HTML = r"""<!DOCTYPE html>
       JavaScript Mode &mdash; renders pages in a headless browser (slower, but handles dynamic sites)
     </label>
   </div>
+  <div class="input-group" style="margin-top:4px">
+    <label style="display:inline-flex; align-items:center; gap:8px; cursor:pointer; color:#ccc">
+      <input type="checkbox" id="incremental" style="width:18px;height:18px;accent-color:#7c3aed">
+      Incremental &mdash; skip listings unchanged since the last complete crawl (fast "what's new" runs)
+    </label>
+  </div>
   <div class="btn-row">
     <button class="btn btn-primary" id="startBtn" onclick="startCrawl()">Start Crawl</button>
     <button class="btn btn-danger" id="stopBtn" onclick="stopCrawl()" disabled>Stop</button>
@@ -3439,6 +8123,8 @@ HTML = r"""<!DOCTYPE html>
   </div>
 </div>
 
+<div class="jobs" id="jobList"></div>
+
 <div class="progress-section">
   <div style="text-align:center; margin-bottom: 12px;">
     <span class="phase-badge phase-idle" id="phaseBadge">Idle</span>
@@ -3466,6 +8152,8 @@ HTML = r"""<!DOCTYPE html>
       <div class="stat-label">Dupes Skipped</div>
     </div>
   </div>
+  <div class="pipeline" id="pipelineStats"></div>
+  <div class="pipeline" id="bandwidthStats"></div>
 
   <div class="current-dl" id="currentDl" style="display:none">
     <div class="filename" id="dlFilename">&mdash;</div>
@@ -3486,6 +8174,8 @@ HTML = r"""<!DOCTYPE html>
 <script>
 let polling = null;
 let lastLogLen = 0;
+let selectedJob = null;
+const ACTIVE = ['crawling', 'downloading', 'queued'];
 
 function startCrawl() {
   const url = document.getElementById('urlInput').value.trim();
@@ -3495,19 +8185,18 @@ function startCrawl() {
   const delay = document.getElementById('delayInput').value;
   const system = document.getElementById('systemInput').value;
   const jsMode = document.getElementById('jsMode').checked;
+  const incremental = document.getElementById('incremental').checked;
 
   document.getElementById('startBtn').disabled = true;
-  document.getElementById('stopBtn').disabled = false;
   document.getElementById('nasBtn').disabled = true;
-  document.getElementById('logBox').innerHTML = '';
-  lastLogLen = 0;
 
   fetch('/api/start', {
     method: 'POST',
     headers: {'Content-Type': 'application/json'},
-    body: JSON.stringify({url, depth: parseInt(depth), delay: parseInt(delay), system, js_mode: jsMode})
+    body: JSON.stringify({url, depth: parseInt(depth), delay: parseInt(delay), system, js_mode: jsMode, incremental})
   }).then(r => r.json()).then(data => {
-    if (data.error) { alert(data.error); resetButtons(); return; }
+    document.getElementById('startBtn').disabled = false;
+    if (data.error) { alert(data.error); return; }
     if (data.status === 'restarting') {
       document.getElementById('phaseBadge').textContent = 'Reloading\u2026';
       document.getElementById('phaseBadge').className = 'phase-badge phase-crawling';
@@ -3515,6 +8204,7 @@ function startCrawl() {
         setTimeout(() => {
           fetch('/api/status').then(r => r.json()).then(d => {
             if (d.status === 'crawling' || d.status === 'downloading') {
+              selectJob(d.job_id);
               startPolling();
             } else { waitForRestart(); }
           }).catch(() => waitForRestart());
@@ -3522,15 +8212,52 @@ function startCrawl() {
       })();
       return;
     }
+    selectJob(data.job_id);
     startPolling();
-  }).catch(e => { alert('Failed: ' + e); resetButtons(); });
+  }).catch(e => { alert('Failed: ' + e); document.getElementById('startBtn').disabled = false; });
 }
 
 function stopCrawl() {
-  fetch('/api/stop', {method: 'POST'}).then(r => r.json());
+  fetch('/api/stop', {
+    method: 'POST',
+    headers: {'Content-Type': 'application/json'},
+    body: JSON.stringify({job: selectedJob})
+  }).then(r => r.json());
   document.getElementById('stopBtn').disabled = true;
 }
 
+function selectJob(id) {
+  if (id === selectedJob) return;
+  selectedJob = id;
+  document.getElementById('logBox').innerHTML = '';
+  lastLogLen = 0;
+  updateStatus();
+}
+
+function renderJobs(jobs) {
+  const list = document.getElementById('jobList');
+  list.innerHTML = '';
+  if (jobs.length < 2) return;  // a lone job needs no picker
+  for (const job of jobs) {
+    const row = document.createElement('div');
+    row.className = 'job-row' + (job.job_id === selectedJob ? ' selected' : '');
+    row.onclick = () => selectJob(job.job_id);
+    const badge = document.createElement('span');
+    badge.className = 'phase-badge phase-' + (job.status === 'queued' ? 'idle' : job.status);
+    badge.style.marginBottom = '0';
+    badge.textContent = job.status;
+    const url = document.createElement('span');
+    url.className = 'job-url';
+    url.textContent = '#' + job.job_id + ' ' + job.url;
+    const meta = document.createElement('span');
+    meta.className = 'job-meta';
+    meta.textContent = job.status === 'queued' ? '' :
+      (job.files_downloaded || 0) + ' files ' + (job.current_speed || '');
+    row.append(badge, url, meta);
+    list.appendChild(row);
+  }
+}
+
 function pushNAS() {
   document.getElementById('nasBtn').disabled = true;
   document.getElementById('nasBtn').textContent = 'Pushing...';
@@ -3548,7 +8275,12 @@ function startPolling() {
 }
 
 function updateStatus() {
-  fetch('/api/status').then(r => r.json()).then(data => {
+  const q = selectedJob ? '?job=' + encodeURIComponent(selectedJob) : '';
+  fetch('/api/status' + q).then(r => r.json()).then(data => {
+    if (data.error) { selectedJob = null; return; }  // job aged out of the list
+    if (!selectedJob && data.job_id) selectedJob = data.job_id;
+    renderJobs(data.jobs || []);
+
     // Stats
     document.getElementById('statPages').textContent = data.pages_crawled || 0;
     document.getElementById('statFound').textContent = data.files_found || 0;
@@ -3556,6 +8288,20 @@ function updateStatus() {
     document.getElementById('statFailed').textContent = data.files_failed || 0;
     document.getElementById('statDupes').textContent = data.dupes_skipped || 0;
 
+    // Pipeline stages: active/workers, queued, throughput
+    const stages = Object.entries(data.pipeline || {});
+    document.getElementById('pipelineStats').textContent = stages.map(([name, s]) =>
+      `${name} ${s.active}/${s.workers} \u00b7 ${s.backlog} queued \u00b7 ${s.per_min}/min`
+    ).join('   \u2192   ');
+
+    // Bandwidth in force (schedule window, if any) and actual download rate
+    const bw = data.bandwidth;
+    const cap = b => b.effective_kbps ? b.effective_kbps + ' KB/s' : 'unlimited';
+    document.getElementById('bandwidthStats').textContent = bw ?
+      `Downloads ${bw.download.measured_kbps} KB/s (cap ${cap(bw.download)})` +
+      `   NAS push cap ${cap(bw.push)}` +
+      (bw.download.window ? `   \u00b7 window ${bw.download.window}` : '') : '';
+
     // Phase badge
     const badge = document.getElementById('phaseBadge');
     badge.textContent = data.phase || data.status || 'Idle';
@@ -3593,27 +8339,21 @@ function updateStatus() {
       lastLogLen = data.log.length;
     }
 
-    // Job complete?
-    if (data.status === 'complete' || data.status === 'stopped' || data.status === 'error') {
+    // Selected job finished? Keep polling while any other job is busy.
+    document.getElementById('stopBtn').disabled = !ACTIVE.includes(data.status);
+    if (data.status === 'complete' && data.files_downloaded > 0) {
+      document.getElementById('nasBtn').disabled = false;
+    }
+    if (!(data.jobs || []).some(j => ACTIVE.includes(j.status))) {
       clearInterval(polling);
-      resetButtons();
-      if (data.status === 'complete' && data.files_downloaded > 0) {
-        document.getElementById('nasBtn').disabled = false;
-      }
+      polling = null;
     }
   }).catch(() => {});
 }
 
-function resetButtons() {
-  document.getElementById('startBtn').disabled = false;
-  document.getElementById('stopBtn').disabled = true;
-}
-
 // Check if a job is already running on page load
 fetch('/api/status').then(r => r.json()).then(data => {
-  if (data.status === 'crawling' || data.status === 'downloading') {
-    document.getElementById('startBtn').disabled = true;
-    document.getElementById('stopBtn').disabled = false;
+  if ((data.jobs || []).some(j => ACTIVE.includes(j.status))) {
     startPolling();
   } else if (data.status === 'complete' && data.files_downloaded > 0) {
     document.getElementById('nasBtn').disabled = false;
@@ -3662,22 +8402,7 @@ if __name__ == "__main__":
             if url:
                 if not url.startswith("http"):
                     url = "https://" + url
-                depth = int(params.get("depth", DEFAULT_DEPTH))
-                delay = int(params.get("delay", DEFAULT_DELAY))
-                system = params.get("system", "auto")
-                js_mode = bool(params.get("js_mode", False))
-                current_job = CrawlJob(
-                    url, STAGING_BASE, max_depth=depth, delay=delay,
-                    system=system, js_mode=js_mode,
-                )
-                def run_job():
-                    try:
-                        current_job.run()
-                    except Exception as e:
-                        current_job.status = "error"
-                        current_job._log(f"ERROR: {e}")
-                job_thread = threading.Thread(target=run_job, daemon=True)
-                job_thread.start()
+                job_manager.submit(url, **_job_options(params))
                 print(f"Auto-started crawl: {url}")
         except Exception as e:
             print(f"Autostart failed: {e}")
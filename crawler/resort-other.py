@@ -92,6 +92,8 @@ _MIN_PATTERN_LEN = 5  # Substring matching on shorter patterns causes mass false
 
 _igdb_token = None
 _igdb_token_expires = 0
+# Every IGDB call reuses one kept-alive connection
+_igdb_session = requests.Session()
 
 
 def load_title_database():
@@ -168,7 +170,7 @@ def igdb_authenticate():
     if not IGDB_CLIENT_ID or not IGDB_CLIENT_SECRET:
         return None
     try:
-        resp = requests.post("https://id.twitch.tv/oauth2/token", data={
+        resp = _igdb_session.post("https://id.twitch.tv/oauth2/token", data={
             "client_id": IGDB_CLIENT_ID,
             "client_secret": IGDB_CLIENT_SECRET,
             "grant_type": "client_credentials",
@@ -189,7 +191,7 @@ def igdb_lookup(title):
         return None
     time.sleep(0.3)
     try:
-        resp = requests.post(
+        resp = _igdb_session.post(
             "https://api.igdb.com/v4/games",
             headers={
                 "Client-ID": IGDB_CLIENT_ID,
@@ -7,12 +7,14 @@ Pass 2 — shortcuts.vdf: Steam grid art for games with Steam shortcuts.
 
 Skips games that already have art. Safe to re-run.
 """
+import http.client
 import io
 import os
 import re
 import struct
-import urllib.request
+import urllib.error
 import urllib.parse
+import urllib.request
 
 STEAM_USERDATA = os.path.expanduser("~/.local/share/Steam/userdata")
 EMUDECK_MEDIA = os.path.expanduser("~/Emulation/tools/downloaded_media")
@@ -89,6 +91,11 @@ SYSTEM_LABEL = {
 }
 
 THUMB_BASE = "https://thumbnails.libretro.com"
+THUMB_HOST = urllib.parse.urlsplit(THUMB_BASE).netloc
+
+# One kept-alive HTTPS connection for every thumbnail request (see thumb_get)
+_thumb_conn = None
+_REDIRECTS = (301, 302, 303, 307, 308)
 
 # ROM title prefixes that differ from libretro-thumbnails naming.
 # Maps the No-Intro title (before region tags) to the libretro equivalent.
@@ -245,6 +252,52 @@ def generate_placeholder(game_name, system, size=None):
     return buf.getvalue()
 
 
+def _thumb_request(path):
+    """One GET on the shared keep-alive connection.
+
+    Saves a TCP+TLS handshake per thumbnail. If the server dropped the idle
+    connection, reconnects and tries once more. Returns (status, location,
+    body).
+    """
+    global _thumb_conn
+    for attempt in range(2):
+        if _thumb_conn is None:
+            _thumb_conn = http.client.HTTPSConnection(THUMB_HOST, timeout=10)
+        try:
+            _thumb_conn.request("GET", path, headers={"User-Agent": "Mozilla/5.0"})
+            resp = _thumb_conn.getresponse()
+            # read it all so the connection can be reused
+            return resp.status, resp.getheader("Location"), resp.read()
+        except (http.client.HTTPException, OSError):
+            _thumb_conn.close()
+            _thumb_conn = None
+            if attempt:
+                raise
+
+
+def thumb_get(path):
+    """GET a path on THUMB_HOST over the shared keep-alive connection,
+    following redirects the way urlopen did: a Location on THUMB_HOST
+    reuses the connection, any other host gets a one-off urllib request.
+    Returns (status, body).
+    """
+    for _ in range(5):
+        status, location, body = _thumb_request(path)
+        if status not in _REDIRECTS or not location:
+            return status, body
+        url = urllib.parse.urljoin(THUMB_BASE + path, location)
+        parts = urllib.parse.urlsplit(url)
+        if parts[:2] != urllib.parse.urlsplit(THUMB_BASE)[:2]:
+            req = urllib.request.Request(url, headers={"User-Agent": "Mozilla/5.0"})
+            try:
+                with urllib.request.urlopen(req, timeout=10) as resp:
+                    return resp.status, resp.read()
+            except urllib.error.HTTPError as e:
+                return e.code, b""
+        path = parts.path + (f"?{parts.query}" if parts.query else "")
+    return status, body
+
+
 def fetch_image(system, game_name):
     """Download boxart PNG from libretro-thumbnails. Returns bytes or None."""
     libretro_sys = LIBRETRO_SYSTEM.get(system)
@@ -265,13 +318,11 @@ def fetch_image(system, game_name):
         safe_name = name.replace("&", "_").replace("/", "_")
         encoded = urllib.parse.quote(safe_name, safe="")
         sys_encoded = urllib.parse.quote(libretro_sys, safe="")
-        url = f"{THUMB_BASE}/{sys_encoded}/Named_Boxarts/{encoded}.png"
+        path = f"/{sys_encoded}/Named_Boxarts/{encoded}.png"
 
         try:
-            req = urllib.request.Request(url, headers={"User-Agent": "Mozilla/5.0"})
-            resp = urllib.request.urlopen(req, timeout=10)
-            data = resp.read()
-            if len(data) >= 1000:
+            status, data = thumb_get(path)
+            if status == 200 and len(data) >= 1000:
                 return data
         except Exception:
             continue
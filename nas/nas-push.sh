@@ -51,8 +51,9 @@ if [ ! -d "$STAGING_DIR" ]; then
     exit 1
 fi
 
-# Count files to push (exclude state files, partial downloads, and directories)
-FILE_COUNT=$(find "$STAGING_DIR" -type f ! -name ".crawler-state.json" ! -name "*.part" ! -name "*.7z" ! -name "*.rar" | wc -l)
+# Count files to push (exclude state files, page cache, browser downloads still
+# in .incoming, partial downloads, and directories)
+FILE_COUNT=$(find "$STAGING_DIR" -type f ! -path "*/.crawler-cache/*" ! -path "*/.incoming/*" ! -name ".crawler-state.*" ! -name "*.part" ! -name "*.7z" ! -name "*.rar" | wc -l)
 
 if [ "$FILE_COUNT" -eq 0 ]; then
     log "${YELLOW}No files to push.${NC}"
@@ -108,10 +109,11 @@ while IFS= read -r -d '' file; do
         ERRORS=$((ERRORS + 1))
         log "  ${RED}Failed: ${rel_path}${NC}"
     fi
-done < <(find "$STAGING_DIR" -type f ! -name ".crawler-state.json" ! -name "*.part" ! -name "*.7z" ! -name "*.rar" -print0)
+done < <(find "$STAGING_DIR" -type f ! -path "*/.crawler-cache/*" ! -path "*/.incoming/*" ! -name ".crawler-state.*" ! -name "*.part" ! -name "*.7z" ! -name "*.rar" -print0)
 
-# Remove empty directories (but not the staging root)
-find "$STAGING_DIR" -mindepth 1 -type d -empty -delete 2>/dev/null
+# Remove empty directories (but not the staging root, or .incoming, which a
+# running crawler's browser downloads into)
+find "$STAGING_DIR" -mindepth 1 -type d -empty ! -name ".incoming" ! -path "*/.incoming/*" -delete 2>/dev/null
 
 if [ "$ERRORS" -eq 0 ]; then
     log "${GREEN}All done: $PUSHED files pushed to NAS.${NC}"
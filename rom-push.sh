@@ -110,7 +110,7 @@ echo ""
 info "Source: $SOURCE_DIR"
 
 # Skip patterns: crawler state, partial downloads, m3u playlists, unconverted archives
-SKIP_PATTERN='\.crawler-state\.json$|\.part$|\.m3u$|\.7z$|\.rar$'
+SKIP_PATTERN='\.crawler-state\.|\.part$|\.m3u$|\.7z$|\.rar$'
 
 # Find system subdirectories containing pushable files
 declare -a SYSTEMS=()